@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from analytics.records import rebuild_personal_bests, replay_personal_records
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the PersonalBest index from the full SetLog history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--replay',
+            action='store_true',
+            help='Also regenerate PersonalRecord history and SetLog.is_pr in chronological order',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        self.stdout.write('Rebuilding personal bests...')
+        total = rebuild_personal_bests(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} personal bests'))
+
+        if options['replay']:
+            self.stdout.write('Replaying set history...')
+            pairs = replay_personal_records(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f'Replayed records for {pairs} user/exercise pairs'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_alter_bodymeasurement_created_at_and_more'),
+        ('exercises', '0003_exercise_category_exercise_equipment_exercise_force_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalBest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_weight_kg', models.FloatField(default=0)),
+                ('best_reps', models.PositiveIntegerField(default=0)),
+                ('best_volume', models.FloatField(default=0, help_text='weight * reps')),
+                ('best_estimated_1rm', models.FloatField(default=0, help_text='Epley: weight * (1 + reps / 30)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_bests', to='exercises.exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_bests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'exercise')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_personalbest'),
+        ('exercises', '0003_exercise_category_exercise_equipment_exercise_force_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personalrecord',
+            index=models.Index(fields=['user', 'exercise', 'achieved_at'], name='analytics_p_user_id_35f4d4_idx'),
+        ),
+    ]
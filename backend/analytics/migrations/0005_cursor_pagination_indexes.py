@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_personalrecord_user_index'),
+        ('exercises', '0003_exercise_category_exercise_equipment_exercise_force_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personalrecord',
+            index=models.Index(fields=['user', 'achieved_at'], name='analytics_p_user_id_89b4a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='progressphoto',
+            index=models.Index(fields=['user', 'created_at'], name='analytics_p_user_id_e835a6_idx'),
+        ),
+    ]
@@ -22,9 +22,31 @@ class PersonalRecord(models.Model):
     improvement_percent = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now) 
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'exercise', 'achieved_at']),
+            models.Index(fields=['user', 'achieved_at']),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s {self.record_type} for {self.exercise.name} on {self.achieved_at}"
 
+class PersonalBest(models.Model):
+    """Running best values per (user, exercise), kept in sync with SetLog writes"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='personal_bests')
+    exercise = models.ForeignKey('exercises.Exercise', on_delete=models.CASCADE, related_name='personal_bests')
+    best_weight_kg = models.FloatField(default=0)
+    best_reps = models.PositiveIntegerField(default=0)
+    best_volume = models.FloatField(default=0, help_text='weight * reps')
+    best_estimated_1rm = models.FloatField(default=0, help_text='Epley: weight * (1 + reps / 30)')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'exercise']
+
+    def __str__(self):
+        return f"{self.user.username}'s bests for {self.exercise.name}"
+
 class BodyMeasurement(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='progress_records')
     date = models.DateField()
@@ -69,6 +91,9 @@ class ProgressPhoto(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.photo_type} - {self.created_at}"
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""
+Maintenance of the per-(user, exercise) PersonalBest index.
+
+Only working sets count towards records, matching ExerciseLogViewSet.exercise_pr.
+"""
+
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Max, When
+
+from tracking.models import ExerciseLog, SetLog
+from .models import PersonalBest, PersonalRecord
+
+PR_SET_TYPE = 'WORK'
+
+# PersonalRecord.record_type -> PersonalBest field holding the current best
+RECORD_FIELDS = [
+    ('WEIGHT', 'best_weight_kg'),
+    ('REPS', 'best_reps'),
+    ('VOLUME', 'best_volume'),
+    ('1RM', 'best_estimated_1rm'),
+]
+
+
+def calculate_1rm(weight, reps):
+    if reps > 1:
+        return weight * (1 + reps / 30.0)
+    return weight
+
+
+def set_metrics(weight, reps):
+    return {
+        'best_weight_kg': weight,
+        'best_reps': reps,
+        'best_volume': weight * reps,
+        'best_estimated_1rm': calculate_1rm(weight, reps),
+    }
+
+
+def best_aggregates():
+    """Aggregate expressions over SetLog rows matching the PersonalBest fields"""
+    volume = ExpressionWrapper(F('weight') * F('repetitions'), output_field=FloatField())
+    estimated_1rm = Case(
+        When(repetitions__gt=1, then=ExpressionWrapper(
+            F('weight') * (1 + F('repetitions') / 30.0), output_field=FloatField()
+        )),
+        default=F('weight'),
+        output_field=FloatField(),
+    )
+    return {
+        'best_weight_kg': Max('weight'),
+        'best_reps': Max('repetitions'),
+        'best_volume': Max(volume),
+        'best_estimated_1rm': Max(estimated_1rm),
+    }
+
+
+def record_sets(user_id, exercise_id):
+    return SetLog.objects.filter(
+        exercise_log__session__user_id=user_id,
+        exercise_log__exercise_id=exercise_id,
+        set_type=PR_SET_TYPE,
+    )
+
+
+def aggregate_bests(queryset):
+    values = queryset.aggregate(**best_aggregates())
+    return {field: value or 0 for field, value in values.items()}
+
+
+def improvement(previous, current):
+    if not previous:
+        return None
+    return (current - previous) / previous * 100
+
+
+def get_set_context(set_log):
+    return ExerciseLog.objects.filter(pk=set_log.exercise_log_id).values(
+        'exercise_id', 'session__user_id', 'session__date'
+    ).first()
+
+
+def empty_bests():
+    return {field: 0 for _, field in RECORD_FIELDS}
+
+
+def fold_set(weight, reps, stored, others, **record_kwargs):
+    """
+    Compare one working set against the current bests.
+
+    ``others`` holds the bests of every other set and is raised in place;
+    ``stored`` holds the indexed values, and only beating those produces
+    PersonalRecord rows. Returns (is_pr, records).
+    """
+    metrics = set_metrics(weight, reps)
+    is_pr = False
+    records = []
+    for record_type, field in RECORD_FIELDS:
+        value = metrics[field]
+        if value > others[field]:
+            is_pr = True
+        if value > stored[field]:
+            previous = stored[field] or None
+            records.append(PersonalRecord(
+                record_type=record_type,
+                weight_kg=weight,
+                reps=reps,
+                volume=metrics['best_volume'],
+                estimated_1rm=metrics['best_estimated_1rm'],
+                previous_value=previous,
+                improvement_percent=improvement(previous, value),
+                **record_kwargs,
+            ))
+        others[field] = max(others[field], value)
+    return is_pr, records
+
+
+@transaction.atomic
+def record_set_log(set_log, created=True):
+    """
+    Fold a saved SetLog into its PersonalBest row.
+
+    New bests produce PersonalRecord rows and flag the set as a PR. On updates
+    the other sets are re-aggregated first so an edited set is never compared
+    against its own previous values, and a set moved to another exercise log
+    also refreshes the (user, exercise) pair it left.
+    """
+    context = get_set_context(set_log)
+    if context is None:
+        return None
+    user_id, exercise_id = context['session__user_id'], context['exercise_id']
+
+    best, _ = PersonalBest.objects.select_for_update().get_or_create(user_id=user_id, exercise_id=exercise_id)
+    stored = {field: getattr(best, field) for _, field in RECORD_FIELDS}
+    if created:
+        others = stored
+    else:
+        others = aggregate_bests(record_sets(user_id, exercise_id).exclude(pk=set_log.pk))
+
+    is_pr = False
+    records = []
+    if set_log.set_type == PR_SET_TYPE:
+        is_pr, records = fold_set(
+            set_log.weight, set_log.repetitions, stored, others,
+            user_id=user_id, exercise_id=exercise_id, achieved_at=context['session__date'],
+        )
+
+    for _, field in RECORD_FIELDS:
+        setattr(best, field, others[field])
+    best.save()
+    PersonalRecord.objects.bulk_create(records)
+
+    if set_log.is_pr != is_pr:
+        SetLog.objects.filter(pk=set_log.pk).update(is_pr=is_pr)
+        set_log.is_pr = is_pr
+
+    previous_log_id = getattr(set_log, '_loaded_exercise_log_id', None)
+    if not created and previous_log_id not in (None, set_log.exercise_log_id):
+        # The pair the set moved away from loses it
+        previous = ExerciseLog.objects.filter(pk=previous_log_id).values('exercise_id', 'session__user_id').first()
+        if previous and (previous['session__user_id'], previous['exercise_id']) != (user_id, exercise_id):
+            refresh_personal_best(previous['session__user_id'], previous['exercise_id'])
+    return best
+
+
+@transaction.atomic
+def record_new_sets(user_id, achieved_at, set_logs):
+    """
+    Batch version of record_set_log for unsaved SetLog instances.
+
+    Meant to run right before SetLog.objects.bulk_create (which sends no
+    signals): it sets ``is_pr`` on the instances and writes the PersonalBest
+    and PersonalRecord rows with a fixed number of queries.
+    """
+    set_logs = [s for s in set_logs if s.set_type == PR_SET_TYPE]
+    exercise_ids = {s.exercise_log.exercise_id for s in set_logs}
+    if not exercise_ids:
+        return
+
+    bests = {
+        best.exercise_id: best
+        for best in PersonalBest.objects.select_for_update().filter(user_id=user_id, exercise_id__in=exercise_ids)
+    }
+    missing = [
+        PersonalBest(user_id=user_id, exercise_id=exercise_id)
+        for exercise_id in exercise_ids if exercise_id not in bests
+    ]
+    PersonalBest.objects.bulk_create(missing)
+    bests.update({best.exercise_id: best for best in missing})
+
+    current = {
+        exercise_id: {field: getattr(best, field) for _, field in RECORD_FIELDS}
+        for exercise_id, best in bests.items()
+    }
+    records = []
+    for set_log in set_logs:
+        exercise_id = set_log.exercise_log.exercise_id
+        values = current[exercise_id]
+        set_log.is_pr, new_records = fold_set(
+            set_log.weight, set_log.repetitions, values, values,
+            user_id=user_id, exercise_id=exercise_id, achieved_at=achieved_at,
+        )
+        records.extend(new_records)
+
+    for exercise_id, best in bests.items():
+        for _, field in RECORD_FIELDS:
+            setattr(best, field, current[exercise_id][field])
+    PersonalBest.objects.bulk_update(bests.values(), [field for _, field in RECORD_FIELDS])
+    PersonalRecord.objects.bulk_create(records)
+
+
+@transaction.atomic
+def refresh_personal_best(user_id, exercise_id):
+    """
+    Recompute one PersonalBest and the is_pr flags of its sets from history,
+    dropping it when no sets are left. Flags are replayed in chronological
+    order, so removing a record set promotes the later sets that beat the
+    remaining ones.
+    """
+    sets = record_sets(user_id, exercise_id).order_by(
+        'exercise_log__session__date', 'created_at', 'id'
+    ).values_list('id', 'weight', 'repetitions', 'is_pr')
+
+    current = empty_bests()
+    flags = {True: [], False: []}
+    count = 0
+    for set_id, weight, reps, was_pr in sets:
+        count += 1
+        is_pr, _ = fold_set(weight, reps, current, current)
+        if is_pr != was_pr:
+            flags[is_pr].append(set_id)
+    for is_pr, set_ids in flags.items():
+        if set_ids:
+            SetLog.objects.filter(pk__in=set_ids).update(is_pr=is_pr)
+
+    if not count:
+        PersonalBest.objects.filter(user_id=user_id, exercise_id=exercise_id).delete()
+        return None
+    best, _ = PersonalBest.objects.update_or_create(
+        user_id=user_id, exercise_id=exercise_id, defaults=current
+    )
+    return best
+
+
+def rebuild_personal_bests(batch_size=1000):
+    """Recreate the whole PersonalBest table with a single grouped aggregate"""
+    rows = SetLog.objects.filter(set_type=PR_SET_TYPE).values(
+        'exercise_log__session__user_id', 'exercise_log__exercise_id'
+    ).annotate(**best_aggregates()).order_by()
+
+    with transaction.atomic():
+        PersonalBest.objects.all().delete()
+        batch = []
+        total = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(PersonalBest(
+                user_id=row.pop('exercise_log__session__user_id'),
+                exercise_id=row.pop('exercise_log__exercise_id'),
+                **{field: value or 0 for field, value in row.items()},
+            ))
+            if len(batch) >= batch_size:
+                PersonalBest.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        PersonalBest.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def replay_personal_records(batch_size=1000):
+    """
+    Rebuild PersonalRecord history and SetLog.is_pr by replaying every working
+    set in chronological order. Much slower than rebuild_personal_bests.
+    """
+    sets = SetLog.objects.filter(set_type=PR_SET_TYPE).order_by(
+        'exercise_log__session__date', 'created_at', 'id'
+    ).values_list(
+        'id', 'weight', 'repetitions',
+        'exercise_log__session__user_id', 'exercise_log__exercise_id', 'exercise_log__session__date',
+    )
+
+    with transaction.atomic():
+        PersonalRecord.objects.all().delete()
+        SetLog.objects.filter(is_pr=True).update(is_pr=False)
+
+        bests = {}
+        records = []
+        pr_ids = []
+        for set_id, weight, reps, user_id, exercise_id, achieved_at in sets.iterator(chunk_size=batch_size):
+            current = bests.setdefault((user_id, exercise_id), empty_bests())
+            is_pr, new_records = fold_set(
+                weight, reps, current, current,
+                user_id=user_id, exercise_id=exercise_id, achieved_at=achieved_at,
+            )
+            records.extend(new_records)
+            if is_pr:
+                pr_ids.append(set_id)
+
+            if len(records) >= batch_size:
+                PersonalRecord.objects.bulk_create(records)
+                records = []
+            if len(pr_ids) >= batch_size:
+                SetLog.objects.filter(pk__in=pr_ids).update(is_pr=True)
+                pr_ids = []
+
+        PersonalRecord.objects.bulk_create(records)
+        SetLog.objects.filter(pk__in=pr_ids).update(is_pr=True)
+    return len(bests)
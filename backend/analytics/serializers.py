@@ -1,4 +1,4 @@
-from .models import PersonalRecord, BodyMeasurement, ProgressPhoto
+from .models import PersonalRecord, PersonalBest, BodyMeasurement, ProgressPhoto
 from rest_framework import serializers
 
 class PersonalRecordSerializer(serializers.ModelSerializer):
@@ -20,6 +20,21 @@ class PersonalRecordSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'created_at', 'previous_value', 'improvement_percent', 'id']
 
+class PersonalBestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PersonalBest
+        fields = [
+            'user',
+            'exercise',
+            'best_weight_kg',
+            'best_reps',
+            'best_volume',
+            'best_estimated_1rm',
+            'updated_at',
+            'id',
+        ]
+        read_only_fields = fields
+
 class BodyMeasurementSerializer(serializers.ModelSerializer):
     class Meta:
         model = BodyMeasurement
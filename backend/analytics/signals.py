@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from tracking.models import SetLog
+from analytics.records import record_set_log, refresh_personal_best, get_set_context
+from core.signals import dedupe_refreshes, first_refresh
+
+dedupe_refreshes(SetLog)
+
+
+@receiver(post_save, sender=SetLog)
+def update_personal_best_on_set_saved(sender, instance, created, raw=False, **kwargs):
+    """Fold new or edited sets into the PersonalBest index"""
+    if raw:
+        return
+    record_set_log(instance, created=created)
+
+
+@receiver(post_delete, sender=SetLog)
+def update_personal_best_on_set_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Recompute the affected PersonalBest once a set is removed. A queryset or
+    cascading delete looks up each exercise log and refreshes each
+    (user, exercise) pair only once.
+    """
+    if not first_refresh(origin, ('exercise_log', instance.exercise_log_id)):
+        return
+    context = get_set_context(instance)
+    if context is None:
+        return
+    user_id, exercise_id = context['session__user_id'], context['exercise_id']
+    if first_refresh(origin, ('personal_best', user_id, exercise_id)):
+        refresh_personal_best(user_id, exercise_id)
@@ -1,4 +1,156 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
-from .models import PersonalRecord, BodyMeasurement, ProgressPhoto
+from django.test.utils import CaptureQueriesContext
+from .models import PersonalRecord, PersonalBest, BodyMeasurement, ProgressPhoto
 from rest_framework import viewsets
-from .serializers import PersonalRecordSerializer, BodyMeasurementSerializer, ProgressPhotoSerializer
\ No newline at end of file
+from .serializers import PersonalRecordSerializer, BodyMeasurementSerializer, ProgressPhotoSerializer
+from exercises.models import Exercise
+from student.models import Student
+from teachers.models import Teacher
+from tracking.models import WorkoutSession, ExerciseLog, SetLog
+from training.models import Training, Workout
+from users.models import User
+
+
+class PersonalBestIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='athlete', email='athlete@example.com', is_student=True)
+        teacher = Teacher.objects.create(user=User.objects.create(username='coach', email='coach@example.com'))
+        training = Training.objects.create(
+            student=Student.objects.create(user=self.user), teacher=teacher, goal='STR', name='A', description=''
+        )
+        workout = Workout.objects.create(training_plan=training, name='Legs', day_of_week='1')
+        self.exercise = Exercise.objects.create(name='Squat', description='', muscle_group='quadriceps')
+        session = WorkoutSession.objects.create(user=self.user, workout=workout, date=date(2025, 3, 1))
+        self.log = ExerciseLog.objects.create(session=session, exercise=self.exercise, order=0)
+
+    def add_set(self, weight, reps, set_type='WORK'):
+        number = self.log.set_logs.count() + 1
+        return SetLog.objects.create(
+            exercise_log=self.log, set_number=number, repetitions=reps, weight=weight, set_type=set_type
+        )
+
+    def best(self):
+        return PersonalBest.objects.get(user=self.user, exercise=self.exercise)
+
+    def test_new_bests_are_indexed_and_recorded(self):
+        first = self.add_set(100, 5)
+        second = self.add_set(110, 3)
+        first.refresh_from_db()
+        second.refresh_from_db()
+
+        best = self.best()
+        self.assertEqual(best.best_weight_kg, 110)
+        self.assertEqual(best.best_reps, 5)
+        self.assertEqual(best.best_volume, 500)
+        self.assertAlmostEqual(best.best_estimated_1rm, 110 * (1 + 3 / 30.0))
+        self.assertTrue(first.is_pr)
+        self.assertTrue(second.is_pr)
+
+        weight_record = PersonalRecord.objects.filter(record_type='WEIGHT').latest('id')
+        self.assertEqual(weight_record.previous_value, 100)
+        self.assertAlmostEqual(weight_record.improvement_percent, 10)
+
+    def test_warmups_and_weaker_sets_are_not_prs(self):
+        self.add_set(100, 5)
+        warmup = self.add_set(140, 8, set_type='WARM')
+        weaker = self.add_set(80, 4)
+        warmup.refresh_from_db()
+        weaker.refresh_from_db()
+
+        self.assertFalse(warmup.is_pr)
+        self.assertFalse(weaker.is_pr)
+        self.assertEqual(self.best().best_weight_kg, 100)
+
+    def test_update_and_delete_recompute_bests(self):
+        self.add_set(100, 5)
+        top = self.add_set(120, 2)
+
+        top.weight = 90
+        top.save()
+        self.assertEqual(self.best().best_weight_kg, 100)
+
+        top.weight = 130
+        top.save()
+        self.assertEqual(self.best().best_weight_kg, 130)
+
+        top.delete()
+        self.assertEqual(self.best().best_weight_kg, 100)
+
+        self.log.set_logs.all().delete()
+        self.assertFalse(PersonalBest.objects.exists())
+
+    def test_deleting_a_record_set_promotes_later_sets(self):
+        self.add_set(100, 5)
+        top = self.add_set(120, 2)
+        later = self.add_set(110, 3)
+        self.assertFalse(later.is_pr)
+
+        top.delete()
+        later.refresh_from_db()
+        self.assertTrue(later.is_pr)
+        self.assertEqual(self.best().best_weight_kg, 110)
+
+    def test_cascading_deletes_refresh_each_personal_best_once(self):
+        def delete_session(sets_per_log):
+            session = WorkoutSession.objects.create(
+                user=self.user, workout=self.log.session.workout, date=date(2025, 3, 2)
+            )
+            lunge = Exercise.objects.create(name=f'Lunge {sets_per_log}', description='', muscle_group='quadriceps')
+            for order, exercise in enumerate([self.exercise, self.exercise, lunge]):
+                log = ExerciseLog.objects.create(session=session, exercise=exercise, order=order)
+                for number in range(1, sets_per_log + 1):
+                    SetLog.objects.create(exercise_log=log, set_number=number, repetitions=5, weight=100 + number)
+            with CaptureQueriesContext(connection) as ctx:
+                session.delete()
+            return len(ctx.captured_queries)
+
+        self.add_set(100, 5)
+        self.assertEqual(delete_session(2), delete_session(6))
+        self.assertEqual(self.best().best_weight_kg, 100)
+        self.assertTrue(self.log.set_logs.get().is_pr)
+
+    def test_repeated_deletes_through_one_queryset_refresh_each_time(self):
+        working_sets = self.log.set_logs.filter(set_type='WORK')
+        self.add_set(100, 5)
+        working_sets.delete()
+        self.assertFalse(PersonalBest.objects.exists())
+
+        self.add_set(90, 5)
+        self.add_set(95, 5)
+        working_sets.filter(weight=95).delete()
+        self.assertEqual(self.best().best_weight_kg, 90)
+        working_sets.delete()
+        self.assertFalse(PersonalBest.objects.exists())
+
+    def test_moving_a_set_refreshes_the_pair_it_left(self):
+        self.add_set(100, 5)
+        top = self.add_set(140, 1)
+        bench = Exercise.objects.create(name='Bench Press', description='', muscle_group='chest')
+        bench_log = ExerciseLog.objects.create(session=self.log.session, exercise=bench, order=1)
+
+        top = SetLog.objects.get(pk=top.pk)
+        top.exercise_log = bench_log
+        top.save()
+
+        self.assertEqual(self.best().best_weight_kg, 100)
+        self.assertEqual(PersonalBest.objects.get(user=self.user, exercise=bench).best_weight_kg, 140)
+
+    def test_rebuild_command_matches_incremental_index(self):
+        self.add_set(100, 5)
+        self.add_set(110, 3)
+        expected = self.best()
+        PersonalBest.objects.all().delete()
+        PersonalRecord.objects.all().delete()
+
+        call_command('rebuild_personal_bests', '--replay', stdout=StringIO())
+
+        rebuilt = self.best()
+        self.assertEqual(rebuilt.best_weight_kg, expected.best_weight_kg)
+        self.assertEqual(rebuilt.best_volume, expected.best_volume)
+        self.assertAlmostEqual(rebuilt.best_estimated_1rm, expected.best_estimated_1rm)
+        self.assertEqual(PersonalRecord.objects.filter(record_type='WEIGHT').count(), 2)
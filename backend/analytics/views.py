@@ -1,17 +1,26 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions
+from core.pagination import TimeOrderedCursorPagination
 from .serializers import PersonalRecordSerializer, BodyMeasurementSerializer, ProgressPhotoSerializer
 from .models import PersonalRecord, BodyMeasurement, ProgressPhoto
+from teachers.scoping import scoped_to_user
 
 class PersonalRecordViewSet(viewsets.ModelViewSet):
     queryset = PersonalRecord.objects.all()
     serializer_class = PersonalRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+    cursor_ordering = ('-achieved_at', '-id')
+
+    def get_queryset(self):
+        return scoped_to_user(PersonalRecord.objects.all(), self.request.user)
 
 class BodyMeasurementViewSet(viewsets.ModelViewSet):
     queryset = BodyMeasurement.objects.all()
     serializer_class = BodyMeasurementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+    cursor_ordering = ('-date', '-id')
     
     def get_queryset(self):
         queryset = BodyMeasurement.objects.all()
@@ -26,6 +35,8 @@ class ProgressPhotoViewSet(viewsets.ModelViewSet):
     queryset = ProgressPhoto.objects.all()
     serializer_class = ProgressPhotoSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+    cursor_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         queryset = ProgressPhoto.objects.all()
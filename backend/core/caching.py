@@ -0,0 +1,214 @@
+"""
+Versioned caching on top of Django's cache framework.
+
+Every key embeds version tokens instead of being deleted on change: one for
+the namespace, and one for either the object it describes or, for lists,
+the collection. Saving an object bumps its own token and the collection's,
+so its detail entry and all lists go stale while other objects stay cached.
+Invalidation is a single cache write, done after commit, and stale entries
+simply expire.
+
+    invalidate_on_change('food-items', FoodItem)
+
+    class FoodItemViewSet(viewsets.ModelViewSet):
+        @cache_response('food-items', shared=True)
+        def list(self, request, *args, **kwargs):
+            return super().list(request, *args, **kwargs)
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import Counter, defaultdict
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+MISSING = object()
+COLLECTION = '*'
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_state = threading.local()
+
+# model class -> namespaces invalidated by its changes
+_dependencies = defaultdict(list)
+
+
+def _version_key(namespace, object_id=None):
+    if object_id is None:
+        return f'cache-version:{namespace}'
+    return f'cache-version:{namespace}:{object_id}'
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def current_versions(namespace, object_id=None):
+    """(namespace version, object or collection version), created on first use"""
+    version_keys = [_version_key(namespace), _version_key(namespace, COLLECTION if object_id is None else object_id)]
+    versions = cache.get_many(version_keys)
+    for version_key in version_keys:
+        if version_key not in versions:
+            # A fresh random token rather than a counter restarting at 0, so an
+            # evicted version key can never resurrect stale entries
+            cache.add(version_key, _new_version(), None)
+            versions[version_key] = cache.get(version_key)
+    return versions[version_keys[0]], versions[version_keys[1]]
+
+
+def make_key(namespace, key, object_id=None):
+    """Cache key for key in namespace, for one object or (object_id=None) the collection"""
+    namespace_version, scope_version = current_versions(namespace, object_id)
+    key = str(key)
+    if len(key) > 100:
+        # Keep long query strings within portable key limits
+        key = hashlib.sha1(key.encode()).hexdigest()
+    scope = COLLECTION if object_id is None else object_id
+    return f'{namespace}:{namespace_version}:{scope}.{scope_version}:{key}'
+
+
+def bump_version(namespace, object_id=None):
+    cache.set(_version_key(namespace, object_id), _new_version(), None)
+
+
+def record(namespace, hit):
+    with _stats_lock:
+        _stats[namespace]['hits' if hit else 'misses'] += 1
+
+
+def cache_stats():
+    """Hit/miss counters per namespace for this process"""
+    with _stats_lock:
+        return {
+            namespace: {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'hit_rate': round(counts['hits'] / (counts['hits'] + counts['misses']), 3),
+            }
+            for namespace, counts in sorted(_stats.items())
+        }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def cached(namespace, key, compute, object_id=None, timeout=None):
+    """Return the cached value for key, calling compute() on a miss"""
+    full_key = make_key(namespace, key, object_id)
+    value = cache.get(full_key, MISSING)
+    record(namespace, value is not MISSING)
+    if value is MISSING:
+        value = compute()
+        cache.set(full_key, value, timeout)
+    return value
+
+
+def cache_response(namespace, per_object=False, timeout=None, shared=False):
+    """
+    Cache a DRF view method's response data by full request path and user.
+    Permission checks still run, since the method is only entered after
+    initial(). With per_object, the entry also follows the looked-up object's
+    version. shared=True drops the user from the key, so every user gets the
+    same entry; only for views whose queryset and serializer ignore
+    request.user.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            object_id = kwargs.get(view.lookup_url_kwarg or view.lookup_field) if per_object else None
+            key = request.get_full_path() if shared else f'user:{request.user.pk}:{request.get_full_path()}'
+            full_key = make_key(namespace, key, object_id)
+            data = cache.get(full_key, MISSING)
+            record(namespace, data is not MISSING)
+            if data is not MISSING:
+                return Response(data)
+
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(full_key, response.data, timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+class InvalidationBatch:
+    """Namespaces and objects to bump once the current transaction commits"""
+    def __init__(self):
+        # namespace -> object ids, or None for the whole namespace
+        self.pending = {}
+
+    def add(self, namespace, object_ids=None):
+        if object_ids is None or self.pending.get(namespace, set()) is None:
+            self.pending[namespace] = None
+        else:
+            self.pending.setdefault(namespace, set()).update(object_ids)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for namespace, object_ids in pending.items():
+            if object_ids is None:
+                bump_version(namespace)
+                continue
+            bump_version(namespace, COLLECTION)
+            for object_id in object_ids:
+                bump_version(namespace, object_id)
+
+    __call__ = flush
+
+
+def _pending_batch():
+    batch = getattr(_state, 'batch', None)
+    if batch is None:
+        batch = _state.batch = InvalidationBatch()
+    return batch
+
+
+def invalidate(namespace, object_ids=None):
+    """
+    Once the transaction commits, bump the given objects and the collection,
+    or the whole namespace when object_ids is None; outside a transaction,
+    right away. Every call registers the batch's flush, but the first one to
+    run after commit writes everything queued and the rest find it empty.
+    Entries queued by a transaction that rolls back stay in the batch and go
+    out with the next flush, which only costs an unneeded invalidation.
+    """
+    batch = _pending_batch()
+    batch.add(namespace, object_ids)
+    transaction.on_commit(batch, robust=True)
+
+
+def invalidate_model(model):
+    """Invalidate every namespace depending on model; for bulk writes that skip signals"""
+    for namespace in _dependencies[model]:
+        invalidate(namespace)
+
+
+def invalidate_on_change(namespace, model, object_ids=None, ignore_fields=()):
+    """
+    Invalidate namespace whenever an instance of model is saved or deleted.
+    With object_ids(instance), only those objects and the collection are
+    bumped; without it, the whole namespace. Saves touching only
+    ignore_fields (e.g. last_login) are skipped.
+    """
+    _dependencies[model].append(namespace)
+
+    def receiver(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        if update_fields and ignore_fields and set(update_fields) <= set(ignore_fields):
+            return
+        ids = None
+        if object_ids:
+            ids = [object_id for object_id in object_ids(instance) if object_id is not None]
+        invalidate(namespace, ids)
+
+    uid = f'cache-invalidation:{namespace}:{model._meta.label}'
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,65 @@
+"""
+Conditional GET for DRF list and retrieve methods.
+
+The ETag comes from one aggregate over the view's queryset, before anything
+is serialized: the newest timestamp, the row count (deletions), the
+requesting user (querysets are scoped) and optionally a cache namespace
+version, for related models that don't touch the timestamp. A matching
+If-None-Match gets a 304. No Last-Modified is sent: the newest timestamp
+doesn't move when rows are deleted or related data changes, so
+If-Modified-Since would validate stale responses.
+
+    class DietPlanViewSet(viewsets.ModelViewSet):
+        @conditional_response('updated_at')
+        def list(self, request, *args, **kwargs):
+            return super().list(request, *args, **kwargs)
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from core.caching import current_versions
+
+
+def conditional_response(field='updated_at', namespace=None):
+    """
+    Answer GETs with 304 when the client's validators still match. Goes above
+    @cache_response so a cache hit still gets its headers.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(view, request, *args, **kwargs)
+
+            queryset = view.filter_queryset(view.get_queryset())
+            lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+            object_id = kwargs.get(lookup_url_kwarg)
+            if object_id is not None:
+                queryset = queryset.filter(**{view.lookup_field: object_id})
+            state = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'))
+            if state['last_modified'] is None:
+                # Empty list or missing object: nothing worth validating
+                return method(view, request, *args, **kwargs)
+
+            parts = [request.user.pk, request.get_full_path(), state['last_modified'].isoformat(), state['count']]
+            if namespace:
+                # Edits of the objects themselves already move the timestamp;
+                # related rows bump the namespace or its collection
+                parts.extend(current_versions(namespace))
+            etag = '"%s"' % hashlib.sha1(':'.join(map(str, parts)).encode()).hexdigest()
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            # Shared caches must not serve one user's scoped list to another
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
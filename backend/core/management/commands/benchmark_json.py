@@ -0,0 +1,147 @@
+"""
+Compare DRF's JSONRenderer/JSONParser with the orjson-backed ones.
+Usage: python manage.py benchmark_json --iterations 200
+
+Renders the list responses of the session, diet plan and program endpoints
+over generated fixtures, checks both renderers produce the same bytes, and
+times rendering and parsing. The fixtures are rolled back afterwards.
+"""
+
+import io
+import time
+import uuid
+from datetime import date, datetime, timedelta, time as dtime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.caching import bump_version
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from diet.models import DietPlan, FoodItem, Meal, MealFoodItem
+from diet.views import DietPlanViewSet
+from exercises.models import Exercise
+from student.models import Student
+from teachers.models import Teacher
+from tracking.models import ExerciseLog, SetLog, WorkoutSession
+from tracking.views import WorkoutSessionViewSet
+from training.models import Program, Training, Workout, WorkoutExercise
+from training.views import ProgramViewSet
+from users.models import User
+
+ENDPOINTS = [
+    ('sessions', WorkoutSessionViewSet, 'student'),
+    ('diet plans', DietPlanViewSet, 'teacher'),
+    ('programs', ProgramViewSet, 'teacher'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the stdlib and orjson JSON renderers and parsers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Renders and parses per endpoint')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        try:
+            with transaction.atomic():
+                users = self.populate(uuid.uuid4().hex[:8])
+                try:
+                    for label, viewset, role in ENDPOINTS:
+                        self.benchmark(label, self.list_data(viewset, users[role]), iterations)
+                finally:
+                    transaction.set_rollback(True)
+        finally:
+            # The program list was cached with the rolled-back fixtures
+            bump_version('programs')
+
+    def list_data(self, viewset, user):
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        request = APIRequestFactory().get('/', HTTP_HOST=host)
+        force_authenticate(request, user)
+        return viewset.as_view({'get': 'list'})(request).data
+
+    def benchmark(self, label, data, iterations):
+        stdlib, fast = JSONRenderer(), ORJSONRenderer()
+        expected = stdlib.render(data)
+        if fast.render(data) != expected:
+            self.stdout.write(self.style.WARNING(f'{label}: renderers disagree'))
+
+        timings = []
+        for renderer, parser in ((stdlib, JSONParser()), (fast, ORJSONParser())):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                renderer.render(data)
+            render_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                parser.parse(io.BytesIO(expected))
+            timings.append((render_time, time.perf_counter() - start))
+
+        (json_render, json_parse), (orjson_render, orjson_parse) = timings
+        self.stdout.write(
+            f'{label} ({len(expected) / 1024:.0f} KiB): '
+            f'render {json_render / iterations * 1000:.2f} -> {orjson_render / iterations * 1000:.2f} ms '
+            f'({json_render / orjson_render:.1f}x), '
+            f'parse {json_parse / iterations * 1000:.2f} -> {orjson_parse / iterations * 1000:.2f} ms '
+            f'({json_parse / orjson_parse:.1f}x)'
+        )
+
+    def populate(self, suffix):
+        teacher_user = User.objects.create(username=f'bench_teacher_{suffix}', email=f'bench_teacher_{suffix}@example.com', is_teacher=True)
+        student_user = User.objects.create(username=f'bench_student_{suffix}', email=f'bench_student_{suffix}@example.com', is_student=True)
+        teacher = Teacher.objects.create(user=teacher_user)
+        student = Student.objects.create(user=student_user)
+        exercises = [
+            Exercise.objects.create(name=f'Bench Exercise {suffix} {i}', description='Step one.\nStep two.', muscle_group='chest')
+            for i in range(6)
+        ]
+        foods = [
+            FoodItem.objects.create(name=f'Bench Food {suffix} {i}', calories=100 + i, protein=10.5, carbs=20.25, fats=3.125, category='GRN')
+            for i in range(4)
+        ]
+
+        for p in range(10):
+            program = Program.objects.create(name=f'Program {p}', teacher=teacher, goal='HYP')
+            for t in range(4):
+                training = Training.objects.create(
+                    student=student, teacher=teacher, program=program, goal='HYP', name=f'Treino {p}-{t}'
+                )
+                for d in range(3):
+                    workout = Workout.objects.create(training_plan=training, name=f'Dia {d}', day_of_week=str(d + 1))
+                    WorkoutExercise.objects.bulk_create([
+                        WorkoutExercise(workout=workout, exercise=exercise, sets=4, reps=10, rest_time=timedelta(seconds=90))
+                        for exercise in exercises
+                    ])
+
+        started = timezone.make_aware(datetime(2025, 1, 1, 7, 30))
+        for s in range(50):
+            session = WorkoutSession.objects.create(
+                user=student_user, workout=workout, date=date(2025, 1, 1) + timedelta(days=s), status='CMP',
+                started_at=started + timedelta(days=s), ended_at=started + timedelta(days=s, hours=1),
+            )
+            for order, exercise in enumerate(exercises[:5], start=1):
+                exercise_log = ExerciseLog.objects.create(session=session, exercise=exercise, order=order)
+                SetLog.objects.bulk_create([
+                    SetLog(exercise_log=exercise_log, set_number=n, repetitions=10, weight=60 + n * 2.5, rest_time=timedelta(seconds=90))
+                    for n in range(1, 5)
+                ])
+
+        for d in range(20):
+            plan = DietPlan.objects.create(
+                student=student_user, teacher=teacher_user, name=f'Plano {d}', goal='BUK',
+                start_date=date(2025, 1, 1), end_date=date(2025, 3, 1),
+            )
+            for m in range(5):
+                meal = Meal.objects.create(diet_plan=plan, name=f'Refeição {m}', time=dtime(7 + m * 3))
+                for food in foods:
+                    MealFoodItem.objects.create(meal=meal, food_item=food, quantity=150, unit='g')
+
+        return {'teacher': teacher_user, 'student': student_user}
@@ -3,6 +3,7 @@ Django Management Command to seed the database
 Usage: python manage.py seed_db
 """
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from datetime import datetime, timedelta, time
 from django.utils import timezone
@@ -11,6 +12,7 @@ from decimal import Decimal
 from users.models import User
 from student.models import Student, ProgressLog, PhotosStudent
 from teachers.models import Teacher, ScheduleTeacher, ScheduleException, Appointment, TeacherStudents
+from teachers.evaluations import evaluation_updates_suspended
 from exercises.models import Exercise
 from training.models import Training, Workout, WorkoutExercise
 from tracking.models import WorkoutSession, ExerciseLog, SetLog
@@ -36,17 +38,20 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS('🌱 Starting database seeding...\n'))
         
-        users = self.create_users()
-        teacher_students = self.create_teacher_student_relationships()
-        self.create_teacher_schedules()
-        exercises = self.create_exercises()
-        foods = self.create_food_items()
-        trainings = self.create_training_plans()
-        sessions = self.create_workout_sessions()
-        diet_plans = self.create_diet_plans()
-        progress_logs = self.create_progress_logs()
-        measurements = self.create_body_measurements()
-        appointments = self.create_appointments()
+        # Evaluation flags are filled in once at the end instead of per row
+        with evaluation_updates_suspended():
+            users = self.create_users()
+            teacher_students = self.create_teacher_student_relationships()
+            self.create_teacher_schedules()
+            exercises = self.create_exercises()
+            foods = self.create_food_items()
+            trainings = self.create_training_plans()
+            sessions = self.create_workout_sessions()
+            diet_plans = self.create_diet_plans()
+            progress_logs = self.create_progress_logs()
+            measurements = self.create_body_measurements()
+            appointments = self.create_appointments()
+        call_command('backfill_evaluations', stdout=self.stdout)
         
         self.stdout.write(self.style.SUCCESS("\n" + "="*50))
         self.stdout.write(self.style.SUCCESS("✨ Database seeding completed successfully!"))
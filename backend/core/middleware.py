@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+
+def accepts_gzip(request):
+    """
+    Whether Accept-Encoding allows gzip. Unlike GZipMiddleware's token search
+    this honours q-values, so "gzip;q=0" and "*;q=0" refuse it.
+    """
+    weights = {}
+    for coding in request.headers.get('Accept-Encoding', '').split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+    return weights.get('gzip', weights.get('*', 0)) > 0
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves responses under GZIP_MIN_LENGTH bytes alone,
+    where the gzip framing and CPU cost outweigh the savings.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.GZIP_MIN_LENGTH:
+            return response
+        if not accepts_gzip(request) and not response.has_header('Content-Encoding'):
+            patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+        return super().process_response(request, response)
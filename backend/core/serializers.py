@@ -0,0 +1,110 @@
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def parse_field_paths(value):
+    """'id,trainings.name' -> {'id': {}, 'trainings': {'name': {}}}; None when absent"""
+    if value is None:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.split('.'):
+            if part.strip():
+                node = node.setdefault(part.strip(), {})
+    return tree
+
+
+def collapsed(field):
+    """Replace a nested serializer by the primary keys of the objects it would render"""
+    if isinstance(field, serializers.ListSerializer):
+        return serializers.PrimaryKeyRelatedField(source=field.source, many=True, read_only=True)
+    return serializers.PrimaryKeyRelatedField(source=field.source, read_only=True)
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets and on-demand expansion for a serializer tree.
+
+    ?fields=id,name,trainings.name  keeps only the listed fields; a dotted path
+                                    selects fields of a nested object.
+    ?expand=trainings.workouts      embeds only the listed relations, every
+                                    other nested serializer becomes ids.
+                                    Without ?expand everything is embedded.
+
+    Nested serializers receive their part of the spec from their parent, so
+    only the root reads the request.
+    """
+
+    #: field name -> prefetch lookups, relative to this model, it reads
+    field_prefetches = {}
+    #: field name -> select_related paths, relative to this model, it reads
+    field_select_related = {}
+
+    def field_spec(self):
+        spec = getattr(self, '_field_spec', None)
+        if spec is not None:
+            return spec
+        root = self.parent if isinstance(self.parent, serializers.ListSerializer) else self
+        request = self.context.get('request')
+        if root.parent is not None or request is None:
+            return None, None
+        return (
+            parse_field_paths(request.query_params.get('fields')),
+            parse_field_paths(request.query_params.get('expand')),
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = self.field_spec()
+        if only:
+            fields = {name: field for name, field in fields.items() if name in only}
+
+        for name, field in list(fields.items()):
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            nested_only = only.get(name) or None if only else None
+            if expand is not None and name not in expand and not nested_only:
+                fields[name] = collapsed(field)
+                continue
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            nested._field_spec = (nested_only, None if expand is None else expand.get(name, {}))
+        return fields
+
+    def query_plan(self, queryset):
+        """queryset with the joins and prefetches this serializer's output needs"""
+        return queryset.select_related(*self.expanded_select_related()).prefetch_related(*self.expanded_prefetches())
+
+    def expanded_select_related(self):
+        return sorted({path for name in self.fields for path in self.field_select_related.get(name, ())})
+
+    def expanded_prefetches(self, prefix=''):
+        """Prefetch lookups for exactly the relations this spec renders"""
+        lookups = []
+        for name, field in self.fields.items():
+            for lookup in self.field_prefetches.get(name, ()):
+                if isinstance(lookup, Prefetch):
+                    lookups.append(Prefetch(prefix + lookup.prefetch_through, queryset=lookup.queryset))
+                else:
+                    lookups.append(prefix + lookup)
+
+            relation = prefix + (field.source or name).replace('.', '__')
+            if isinstance(field, serializers.ManyRelatedField):
+                lookups.append(relation)
+            elif isinstance(field, serializers.BaseSerializer):
+                nested = field.child if isinstance(field, serializers.ListSerializer) else field
+                if not isinstance(nested, DynamicFieldsMixin):
+                    lookups.append(relation)
+                    continue
+                related = nested.expanded_select_related()
+                if related:
+                    lookups.append(Prefetch(relation, queryset=nested.Meta.model.objects.select_related(*related)))
+                else:
+                    lookups.append(relation)
+                lookups.extend(nested.expanded_prefetches(f'{relation}__'))
+
+        # Several fields may read the same relation
+        unique = {}
+        for lookup in lookups:
+            unique.setdefault(lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup, lookup)
+        return list(unique.values())
@@ -0,0 +1,39 @@
+"""Helpers for post_delete receivers that refresh derived data"""
+
+import threading
+
+from django.db.models.signals import pre_delete
+
+_state = threading.local()
+
+
+def reset_refreshes(sender, **kwargs):
+    _state.refreshed = set()
+
+
+def dedupe_refreshes(model):
+    """
+    Scope first_refresh to single delete() calls removing model rows. A
+    delete sends every pre_delete signal before the first post_delete, so
+    the keys are cleared before each call's receivers run.
+    """
+    pre_delete.connect(reset_refreshes, sender=model, dispatch_uid=f'reset-refreshes:{model._meta.label}')
+
+
+def first_refresh(origin, key):
+    """
+    True once per key and delete() call of a model passed to
+    dedupe_refreshes. Post-delete signals only fire after the whole batch is
+    gone, so one refresh covers every row of a queryset or cascade sharing
+    the key.
+    """
+    if origin is None:
+        return True
+    refreshed = getattr(_state, 'refreshed', None)
+    if refreshed is None:
+        refreshed = _state.refreshed = set()
+    key = (id(origin), key)
+    if key in refreshed:
+        return False
+    refreshed.add(key)
+    return True
@@ -0,0 +1,63 @@
+import json
+import re
+
+# '{"FoundationFoods": ' in front of the array of a wrapped export
+WRAPPER_PREFIX = re.compile(r'\{\s*"(?:[^"\\]|\\.)*"\s*:\s*')
+WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_array(f, chunk_size=64 * 1024):
+    """
+    Yield the items of a top-level JSON array without loading the whole file.
+    An array wrapped in a single-key object, as in USDA FoodData Central
+    downloads, is unwrapped.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    # Parsing moves an offset; consumed text is only dropped when a chunk is appended
+    pos = 0
+    read_size = chunk_size
+    started = False
+    eof = False
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+        if not started:
+            if buffer.startswith('{', pos):
+                wrapper = WRAPPER_PREFIX.match(buffer, pos)
+                if wrapper and wrapper.end() < len(buffer):
+                    pos = wrapper.end()
+                    continue
+            elif pos < len(buffer):
+                if buffer[pos] != '[':
+                    raise ValueError('Expected a JSON array')
+                pos += 1
+                started = True
+                continue
+        elif buffer.startswith(',', pos):
+            pos += 1
+            continue
+        elif buffer.startswith(']', pos):
+            return
+        elif pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number at the end of the buffer may still be incomplete
+                if end < len(buffer) or eof:
+                    yield item
+                    pos = end
+                    read_size = chunk_size
+                    continue
+            # The item spans the chunk boundary: read twice as much before
+            # parsing it again, so large items aren't re-parsed chunk by chunk
+            read_size *= 2
+
+        if eof:
+            raise ValueError('Unexpected end of JSON array')
+        chunk = f.read(read_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
@@ -0,0 +1,71 @@
+import io
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.middleware import CompressionMiddleware
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONTests(SimpleTestCase):
+    data = {
+        'created_at': datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        'naive': datetime(2025, 1, 2, 3, 4, 5),
+        'offset': datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-3))),
+        'date': date(2025, 1, 2),
+        'time': time(7, 30, 0, 500),
+        'rest_time': timedelta(minutes=1, seconds=30),
+        'weight': Decimal('82.50'),
+        'ratio': 0.1,
+        'id': UUID('12345678-1234-5678-1234-567812345678'),
+        'name': 'Refeição pós-treino',
+        1: [None, True, (1, 2)],
+    }
+
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_indented_output_matches_json_renderer(self):
+        for media_type in ('application/json; indent=2', 'application/json; indent=4'):
+            self.assertEqual(
+                ORJSONRenderer().render(self.data, media_type),
+                JSONRenderer().render(self.data, media_type),
+            )
+
+    def test_large_integers_fall_back_to_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_parser_matches_json_parser(self):
+        body = JSONRenderer().render({'name': 'Frango', 'quantity': 150.5, 'items': [1, None]})
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"weight": NaN}'))
+
+
+@override_settings(GZIP_MIN_LENGTH=1024)
+class CompressionTests(SimpleTestCase):
+    def compress(self, body, accept_encoding='gzip'):
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body, content_type='application/json'))
+        return middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding))
+
+    def test_large_responses_are_compressed(self):
+        response = self.compress(b'[' + b'{"name":"Arroz","calories":130},' * 100 + b'{}]')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_responses_are_left_alone(self):
+        response = self.compress(b'{"detail":"Not found."}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_gzip_refused_with_q_zero_is_left_alone(self):
+        response = self.compress(b'[' + b'{"name":"Arroz","calories":130},' * 100 + b'{}]', 'gzip;q=0, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from videoLesson.views import VideoLessonViewSet
+from core.views import CacheStatsView
 from rest_framework import routers
 from exercises.views import ExerciseViewSet
 from feedback.views import FeedbackViewSet
@@ -31,6 +32,7 @@ router.register(r'video-lessons', VideoLessonViewSet, basename='video-lesson')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
+    path('api/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
     path('api/analytics/', include('analytics.urls')),
     path('api/diet/', include('diet.urls')),
     path('api/tracking/', include('tracking.urls')),
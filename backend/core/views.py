@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.caching import cache_stats
+
+
+class CacheStatsView(APIView):
+    """Hit/miss counters per cache namespace, for the worker serving the request"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'backend': settings.CACHES['default']['BACKEND'],
+            'namespaces': cache_stats(),
+        })
@@ -0,0 +1,146 @@
+"""
+Daily nutrition adherence: what a student's diet plans scheduled against the
+meals they registered, day by day.
+
+The whole computation is one query. A recursive CTE lists the days of the
+range, planned totals come from the plan covering a day (the latest started
+one where a replacement overlaps the plan it replaces) and consumed totals
+from that day's MealRegistrations of that plan's meals, summing their
+nutrition (Meal.total_*, kept equal to their MealFoodItem x FoodItem sums by
+diet.nutrition). Registrations of meals from a replaced plan, or on days no
+plan covers, are not counted. A gaps-and-islands window then numbers each
+run of adherent days, which gives the streaks.
+"""
+
+from datetime import date
+
+from django.db import connection
+
+from .models import DietPlan, Meal, MealRegistration
+
+NUTRIENTS = ['calories', 'protein', 'carbs', 'fats']
+# A day is adherent when the registered meals cover this share of the planned calories
+ADHERENT_RANGE = (90, 110)
+MAX_DAYS = 366
+
+
+def day_series(vendor):
+    """(first day, next day) SQL for the recursive day CTE"""
+    if vendor == 'sqlite':
+        return 'date(%s)', "date(day, '+1 day')"
+    if vendor == 'postgresql':
+        return 'CAST(%s AS date)', 'day + 1'
+    return 'CAST(%s AS date)', "day + INTERVAL '1' DAY"
+
+
+def adherence_sql(vendor):
+    first_day, next_day = day_series(vendor)
+    plan_totals = ', '.join(f'total_{nutrient} AS {nutrient}' for nutrient in NUTRIENTS)
+    meal_totals = ', '.join(f'SUM(m.total_{nutrient}) AS {nutrient}' for nutrient in NUTRIENTS)
+    daily_columns = ', '.join(
+        f'COALESCE({source}.{nutrient}, 0) AS {label}_{nutrient}'
+        for source, label in (('pl', 'planned'), ('c', 'consumed'))
+        for nutrient in [*NUTRIENTS, 'meals']
+    )
+    meal_table, plan_table, registration_table = (
+        connection.ops.quote_name(model._meta.db_table) for model in (Meal, DietPlan, MealRegistration)
+    )
+    return f"""
+        WITH RECURSIVE days(day) AS (
+            SELECT {first_day}
+            UNION ALL
+            SELECT {next_day} FROM days WHERE day < %s
+        ),
+        plans AS (
+            SELECT p.id, p.start_date, p.end_date, p.total_calories, p.total_protein, p.total_carbs, p.total_fats,
+                (SELECT COUNT(*) FROM {meal_table} m WHERE m.diet_plan_id = p.id) AS meals
+            FROM {plan_table} p
+            WHERE p.student_id = %s AND p.start_date <= %s AND p.end_date >= %s
+        ),
+        covering AS (
+            SELECT d.day, p.*,
+                ROW_NUMBER() OVER (PARTITION BY d.day ORDER BY p.start_date DESC, p.id DESC) AS plan_rank
+            FROM days d JOIN plans p ON p.start_date <= d.day AND p.end_date >= d.day
+        ),
+        planned AS (
+            SELECT day, id AS plan_id, {plan_totals}, meals
+            FROM covering
+            WHERE plan_rank = 1
+        ),
+        consumed AS (
+            SELECT r.date AS day, {meal_totals}, COUNT(*) AS meals
+            FROM {registration_table} r
+            JOIN {meal_table} m ON m.id = r.meal_id
+            JOIN planned pl ON pl.day = r.date AND pl.plan_id = m.diet_plan_id
+            WHERE r.date >= %s AND r.date <= %s
+            GROUP BY r.date
+        ),
+        daily AS (
+            SELECT d.day, {daily_columns},
+                CASE WHEN pl.calories > 0
+                    AND COALESCE(c.calories, 0) * 100 BETWEEN pl.calories * %s AND pl.calories * %s
+                THEN 1 ELSE 0 END AS adherent
+            FROM days d
+            LEFT JOIN planned pl ON pl.day = d.day
+            LEFT JOIN consumed c ON c.day = d.day
+        ),
+        islands AS (
+            SELECT daily.*,
+                ROW_NUMBER() OVER (ORDER BY day) - ROW_NUMBER() OVER (PARTITION BY adherent ORDER BY day) AS island
+            FROM daily
+        )
+        SELECT islands.*,
+            CASE WHEN adherent = 1 THEN ROW_NUMBER() OVER (PARTITION BY adherent, island ORDER BY day) ELSE 0 END AS streak
+        FROM islands
+        ORDER BY day
+    """
+
+
+def percentage(consumed, planned):
+    return round(consumed * 100 / planned, 1) if planned else None
+
+
+def breakdown(totals):
+    """Planned and consumed totals plus the consumed share of each"""
+    return {
+        'planned': {field: round(totals[f'planned_{field}'], 1) for field in [*NUTRIENTS, 'meals']},
+        'consumed': {field: round(totals[f'consumed_{field}'], 1) for field in [*NUTRIENTS, 'meals']},
+        'adherence': {
+            field: percentage(totals[f'consumed_{field}'], totals[f'planned_{field}'])
+            for field in [*NUTRIENTS, 'meals']
+        },
+    }
+
+
+def daily_adherence(student_id, start, end):
+    """
+    Per-day breakdown for the student's plans between start and end
+    (inclusive) and a summary with the streaks. The current streak is the
+    run of adherent days ending on end.
+    """
+    params = [start, end, student_id, end, start, start, end, *ADHERENT_RANGE]
+    with connection.cursor() as cursor:
+        cursor.execute(adherence_sql(connection.vendor), params)
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    days = [
+        {
+            # SQLite hands dates back as text
+            'date': row['day'] if isinstance(row['day'], date) else date.fromisoformat(row['day']),
+            **breakdown(row),
+            'adherent': bool(row['adherent']),
+            'streak': row['streak'],
+        }
+        for row in rows
+    ]
+    totals = {column: sum(row[column] for row in rows) for column in columns if column.startswith(('planned_', 'consumed_'))}
+    return {
+        'days': days,
+        'summary': {
+            **breakdown(totals),
+            'adherent_days': sum(day['adherent'] for day in days),
+            'current_streak': days[-1]['streak'] if days else 0,
+            'longest_streak': max((day['streak'] for day in days), default=0),
+        },
+    }
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from diet.search import install_search_index
+    install_search_index(connections[using])
 
 
 class DietConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'diet'
+
+    def ready(self):
+        import diet.signals
+        # Later migrations may rebuild the food table and drop the SQLite triggers
+        post_migrate.connect(ensure_search_index, sender=self)
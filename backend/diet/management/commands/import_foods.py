@@ -0,0 +1,297 @@
+"""
+Import a food composition table into FoodItem.
+Usage: python manage.py import_foods taco.csv --encoding latin-1
+
+Reads CSV (TACO, USDA SR Legacy ABBREV, or any table with name and
+per-100g nutrient columns) or JSON (an array of flat records or of USDA
+FoodData Central foods, optionally wrapped in an object) one row at a time.
+Rows are upserted by folded name in batches, so memory use depends on the
+batch size rather than the file size.
+"""
+
+import csv
+import math
+import os
+import time
+from functools import lru_cache
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.caching import invalidate_model
+from core.streaming import iter_json_array
+from diet.models import FoodItem
+from diet.nutrition import refresh_food_item_totals
+
+FOOD_FIELDS = ['calories', 'protein', 'carbs', 'fats', 'category']
+NUTRIENTS = ['calories', 'protein', 'carbs', 'fats']
+
+# Folded column header -> field, covering TACO, SR Legacy and plain exports
+COLUMNS = {
+    'name': 'name',
+    'description': 'name',
+    'descricao': 'name',
+    'descricao dos alimentos': 'name',
+    'alimento': 'name',
+    'shrt desc': 'name',
+    'long desc': 'name',
+    'calories': 'calories',
+    'kcal': 'calories',
+    'energy kcal': 'calories',
+    'energia kcal': 'calories',
+    'energ kcal': 'calories',
+    'protein': 'protein',
+    'protein g': 'protein',
+    'proteina': 'protein',
+    'proteina g': 'protein',
+    'carbs': 'carbs',
+    'carbohydrate': 'carbs',
+    'carbohydrate g': 'carbs',
+    'carbohydrate by difference g': 'carbs',
+    'carbohydrt g': 'carbs',
+    'carboidrato': 'carbs',
+    'carboidrato g': 'carbs',
+    'fats': 'fats',
+    'fat': 'fats',
+    'fat g': 'fats',
+    'total lipid fat g': 'fats',
+    'lipid tot g': 'fats',
+    'lipideos': 'fats',
+    'lipideos g': 'fats',
+    'category': 'category',
+    'categoria': 'category',
+    'categoria do alimento': 'category',
+    'food category': 'category',
+    'food group': 'category',
+    'fdgrp desc': 'category',
+    'brandedfoodcategory': 'category',
+}
+
+# USDA nutrient number -> field; 957/958 are the Atwater energies Foundation
+# Foods report instead of 208
+USDA_NUTRIENTS = {'208': 'calories', '957': 'calories', '958': 'calories', '203': 'protein', '205': 'carbs', '204': 'fats'}
+
+# Checked in order against the words of the folded category name
+CATEGORY_KEYWORDS = [
+    ('FRT', ['fruta', 'fruit']),
+    ('VEG', ['verdura', 'hortalica', 'vegetable']),
+    ('GRN', ['cerea', 'grain', 'pasta', 'baked', 'panificad', 'massa']),
+    ('DRY', ['leite', 'dairy', 'milk', 'queijo', 'cheese']),
+    ('FAT', ['gordura', 'oleo', 'fat', 'oil', 'noz', 'semente', 'nut', 'seed']),
+    ('PRN', [
+        'carne', 'pescado', 'ovo', 'leguminosa', 'beef', 'pork', 'poultry', 'finfish', 'shellfish',
+        'fish', 'meat', 'legume', 'egg', 'sausage', 'lamb',
+    ]),
+]
+# TACO's markers for traces, not analysed and missing values
+NUMBER_PLACEHOLDERS = {'tr', 'na', 'nd', '*', '-'}
+CATEGORY_CODES = {code for code, _ in FoodItem.CATEGORY}
+CATEGORY_LABELS = {FoodItem.normalize_name(label): code for code, label in FoodItem.CATEGORY}
+
+
+class InvalidValue(Exception):
+    """A row value that doesn't convert; the row is skipped and reported"""
+
+
+@lru_cache(maxsize=256)
+def column_field(header):
+    """Field a column feeds, None to ignore it; headers repeat on every row"""
+    return COLUMNS.get(FoodItem.normalize_name(header))
+
+
+def map_category(value):
+    """'Frutas e derivados' -> 'FRT'; FoodItem codes and labels pass through, unknown groups are 'OTH'"""
+    if isinstance(value, dict):
+        # FoodData Central: {"description": "Fruits and Fruit Juices"}
+        value = value.get('description')
+    if not value:
+        return 'OTH'
+    value = str(value).strip()
+    if value in CATEGORY_CODES:
+        return value
+    folded = FoodItem.normalize_name(value)
+    if folded in CATEGORY_LABELS:
+        return CATEGORY_LABELS[folded]
+    words = folded.split()
+    for code, keywords in CATEGORY_KEYWORDS:
+        if any(word.startswith(keyword) for word in words for keyword in keywords):
+            return code
+    return 'OTH'
+
+
+def parse_number(value):
+    """TACO writes '1,5', 'Tr' (traces), 'NA' and '*'; the markers count as 0"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    elif str(value).strip().lower() in NUMBER_PLACEHOLDERS:
+        return 0.0
+    else:
+        try:
+            number = float(str(value).strip().replace(',', '.'))
+        except ValueError:
+            raise InvalidValue(f'{value!r} is not a number')
+    if not math.isfinite(number):
+        raise InvalidValue(f'{value!r} is not a number')
+    return number
+
+
+def parse_food(record):
+    """Map one CSV row or JSON record onto (name, FoodItem fields)"""
+    values = {}
+    for key, value in record.items():
+        field = column_field(key)
+        if field and value not in (None, ''):
+            values.setdefault(field, value)
+
+    for nutrient in record.get('foodNutrients') or ():
+        nutrient_info = nutrient.get('nutrient') or {}
+        field = USDA_NUTRIENTS.get(str(nutrient_info.get('number') or nutrient.get('nutrientNumber')))
+        if field and nutrient.get('amount') is not None:
+            values.setdefault(field, nutrient['amount'])
+    if 'category' not in values:
+        values['category'] = record.get('foodCategory')
+
+    name = ' '.join(str(values.get('name') or '').split())[:FoodItem._meta.get_field('name').max_length]
+    fields = {nutrient: parse_number(values.get(nutrient, 0)) for nutrient in NUTRIENTS}
+    fields['calories'] = round(fields['calories'])
+    fields['category'] = map_category(values.get('category'))
+    return name, fields
+
+
+def iter_csv(f):
+    sample = f.read(64 * 1024)
+    f.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    return csv.DictReader(f, dialect=dialect)
+
+
+def read_records(f, file_format):
+    """
+    (position, record) pairs, the position being the CSV line or the JSON
+    record number. Only errors reading the file become a CommandError,
+    errors in the caller's loop body are not raised in here.
+    """
+    try:
+        if file_format == 'csv':
+            reader = iter_csv(f)
+            for record in reader:
+                yield f'line {reader.line_num}', record
+        else:
+            for number, record in enumerate(iter_json_array(f), 1):
+                yield f'record {number}', record
+    except (ValueError, csv.Error) as error:
+        # Malformed JSON (JSONDecodeError) or the wrong --encoding (UnicodeDecodeError)
+        raise CommandError(f'Could not read {f.name}: {error}')
+
+
+class Command(BaseCommand):
+    help = 'Import a food composition table (TACO, USDA) from CSV or JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='File format, guessed from the extension by default',
+        )
+        parser.add_argument(
+            '--encoding',
+            default='utf-8-sig',
+            help='File encoding; TACO CSVs are often latin-1',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Foods per bulk write',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'json'):
+            raise CommandError(f'Unknown format {file_format!r}, pass --format csv or --format json')
+        self.batch_size = options['batch_size']
+        self.created_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.skipped_count = 0
+        self.rows = 0
+
+        self.stdout.write(f'Streaming foods from {path}...')
+        self.start = time.perf_counter()
+        try:
+            with open(path, 'r', encoding=options['encoding'], newline='') as f, transaction.atomic():
+                batch = {}
+                for position, record in read_records(f, file_format):
+                    self.rows += 1
+                    try:
+                        name, fields = parse_food(record)
+                    except InvalidValue as error:
+                        self.skip(position, error)
+                        continue
+                    search_name = FoodItem.normalize_name(name)
+                    if not search_name:
+                        self.skip(position, 'no name')
+                        continue
+                    # Later rows win, keyed like the upsert itself
+                    batch[search_name] = (name, fields)
+                    if len(batch) >= self.batch_size:
+                        self.apply_batch(batch)
+                        batch = {}
+                self.apply_batch(batch)
+                # Bulk writes skip the signals that invalidate cached food data
+                if self.created_count or self.updated_count:
+                    invalidate_model(FoodItem)
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {path}')
+
+        elapsed = time.perf_counter() - self.start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.rows} rows in {elapsed:.2f}s ({self.rows / max(elapsed, 1e-6):.0f} rows/s)\n'
+                f'Created: {self.created_count}\n'
+                f'Updated: {self.updated_count}\n'
+                f'Unchanged: {self.unchanged_count}\n'
+                f'Skipped: {self.skipped_count}'
+            )
+        )
+
+    def skip(self, position, reason):
+        self.skipped_count += 1
+        self.stderr.write(self.style.WARNING(f'Skipped {position}: {reason}'))
+
+    def apply_batch(self, batch):
+        if not batch:
+            return
+        existing = {}
+        # Oldest row wins where earlier data already folds to the same name
+        for row in FoodItem.objects.filter(search_name__in=batch).order_by('-id').values('id', 'search_name', *FOOD_FIELDS):
+            existing[row['search_name']] = row
+
+        now = timezone.now()
+        to_create, to_update = [], []
+        for search_name, (name, fields) in batch.items():
+            row = existing.get(search_name)
+            if row is None:
+                # bulk_create skips save(), which fills search_name
+                to_create.append(FoodItem(name=name, search_name=search_name, **fields))
+            elif any(row[field] != value for field, value in fields.items()):
+                # The stored name is kept, only its data is refreshed
+                to_update.append(FoodItem(id=row['id'], updated_at=now, **fields))
+            else:
+                self.unchanged_count += 1
+
+        FoodItem.objects.bulk_create(to_create, batch_size=self.batch_size)
+        FoodItem.objects.bulk_update(to_update, [*FOOD_FIELDS, 'updated_at'], batch_size=self.batch_size)
+        # bulk_update skips the post_save receiver that maintains meal totals
+        refresh_food_item_totals([food.id for food in to_update])
+
+        self.created_count += len(to_create)
+        self.updated_count += len(to_update)
+        processed = self.created_count + self.updated_count + self.unchanged_count
+        self.stdout.write(f'Processed {processed} foods ({self.rows / (time.perf_counter() - self.start):.0f} rows/s)...')
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+GRAMS_PER_UNIT = {'g': 1.0, 'oz': 28.3495, 'ml': 1.0, 'cup': 240.0, 'slice': 30.0, 'unit': 100.0}
+NUTRIENTS = ['calories', 'protein', 'carbs', 'fats']
+
+
+def backfill_totals(apps, schema_editor):
+    DietPlan = apps.get_model('diet', 'DietPlan')
+    Meal = apps.get_model('diet', 'Meal')
+    MealFoodItem = apps.get_model('diet', 'MealFoodItem')
+
+    meal_totals = {}
+    for item in MealFoodItem.objects.select_related('food_item'):
+        grams = item.quantity * GRAMS_PER_UNIT.get(item.unit, 1.0)
+        totals = meal_totals.setdefault(item.meal_id, dict.fromkeys(NUTRIENTS, 0.0))
+        for nutrient in NUTRIENTS:
+            totals[nutrient] += getattr(item.food_item, nutrient) * grams / 100.0
+
+    meals = list(Meal.objects.all())
+    plan_totals = {}
+    for meal in meals:
+        totals = meal_totals.get(meal.id, dict.fromkeys(NUTRIENTS, 0.0))
+        plan = plan_totals.setdefault(meal.diet_plan_id, dict.fromkeys(NUTRIENTS, 0.0))
+        for nutrient in NUTRIENTS:
+            setattr(meal, f'total_{nutrient}', totals[nutrient])
+            plan[nutrient] += totals[nutrient]
+    Meal.objects.bulk_update(meals, [f'total_{n}' for n in NUTRIENTS], batch_size=500)
+
+    plans = list(DietPlan.objects.filter(id__in=plan_totals))
+    for plan in plans:
+        for nutrient in NUTRIENTS:
+            setattr(plan, f'total_{nutrient}', plan_totals[plan.id][nutrient])
+    DietPlan.objects.bulk_update(plans, [f'total_{n}' for n in NUTRIENTS], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diet', '0005_dietplan_description_dietplan_target_calories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dietplan',
+            name='total_calories',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dietplan',
+            name='total_carbs',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dietplan',
+            name='total_fats',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dietplan',
+            name='total_protein',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='total_calories',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='total_carbs',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='total_fats',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='total_protein',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
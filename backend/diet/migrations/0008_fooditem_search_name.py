@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:16
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def fill_search_name(apps, schema_editor):
+    # Same folding as FoodItem.normalize_name, frozen here for the historical model
+    def normalize_name(name):
+        decomposed = unicodedata.normalize('NFKD', name or '')
+        stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+        return ' '.join(re.findall(r'\w+', stripped.casefold()))
+
+    FoodItem = apps.get_model('diet', 'FoodItem')
+    food_items = list(FoodItem.objects.only('id', 'name'))
+    for food_item in food_items:
+        food_item.search_name = normalize_name(food_item.name)
+    FoodItem.objects.bulk_update(food_items, ['search_name'], batch_size=1000)
+
+
+def install_search_index(apps, schema_editor):
+    from diet.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from diet.search import drop_search_index
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diet', '0007_dietplan_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditem',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, help_text='Accent- and case-folded name, used for autocomplete', max_length=100),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
@@ -1,3 +1,6 @@
+import re
+import unicodedata
+
 from django.db import models
 from django.conf import settings
 
@@ -13,6 +16,7 @@ class FoodItem(models.Model):
     ]
 
     name = models.CharField(max_length=100, unique=True)
+    search_name = models.CharField(max_length=100, editable=False, db_index=True, default='', help_text="Accent- and case-folded name, used for autocomplete")
     description = models.TextField(blank=True, null=True)
     calories = models.IntegerField(help_text="Calories per 100g")
     protein = models.FloatField(help_text="Protein per 100g")
@@ -25,6 +29,20 @@ class FoodItem(models.Model):
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def normalize_name(name):
+        """'Pão  Francês' -> 'pao frances'"""
+        decomposed = unicodedata.normalize('NFKD', name or '')
+        stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+        return ' '.join(re.findall(r'\w+', stripped.casefold()))
+
+    def save(self, *args, **kwargs):
+        self.search_name = self.normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+
 class DietPlan(models.Model):
     GOAL = [ 
         ('BUK', 'Bulking'),
@@ -41,6 +59,14 @@ class DietPlan(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     is_active = models.BooleanField(default=True)
+    # Also bumped by meal and food changes, see diet.nutrition.refresh_plan_totals
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Sum of the meal totals, maintained by diet.nutrition
+    total_calories = models.FloatField(default=0)
+    total_protein = models.FloatField(default=0)
+    total_carbs = models.FloatField(default=0)
+    total_fats = models.FloatField(default=0)
 
     def __str__(self):
         return f"{self.name} for {self.student.username}"
@@ -57,17 +83,15 @@ class Meal(models.Model):
         related_name="meals"
     )
 
+    # Denormalized from MealFoodItem rows, maintained by diet.nutrition
+    total_calories = models.FloatField(default=0)
+    total_protein = models.FloatField(default=0)
+    total_carbs = models.FloatField(default=0)
+    total_fats = models.FloatField(default=0)
+
     def __str__(self):
         return f"{self.name} for plan '{self.diet_plan.name}'"
 
-    @property
-    def total_calories(self):
-        total = 0
-        for item in self.mealfooditem_set.all():
-            if item.unit == 'g':
-                total += (item.food_item.calories / 100.0) * item.quantity
-        return total
-
 class MealFoodItem(models.Model):
     UNIT_CHOICES = [
         ('g', 'grams'),
@@ -78,6 +102,16 @@ class MealFoodItem(models.Model):
         ('unit', 'unit(s)'),
     ]
 
+    # Approximate grams per unit used for nutrition totals (ml assumes water density)
+    GRAMS_PER_UNIT = {
+        'g': 1.0,
+        'oz': 28.3495,
+        'ml': 1.0,
+        'cup': 240.0,
+        'slice': 30.0,
+        'unit': 100.0,
+    }
+
     meal = models.ForeignKey(Meal, on_delete=models.CASCADE)
     food_item = models.ForeignKey(FoodItem, on_delete=models.PROTECT)
     quantity = models.FloatField()
@@ -88,7 +122,7 @@ class MealFoodItem(models.Model):
 
     def __str__(self):
         return f"{self.quantity}{self.unit} of {self.food_item.name}"
-    
+
 
 class MealRegistration(models.Model):
     meal = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name='registrations')
@@ -0,0 +1,72 @@
+"""
+Set-based maintenance of the denormalized Meal and DietPlan nutrition totals.
+
+Each refresh is a single UPDATE with correlated subqueries, so the cost does
+not depend on how many foods a meal has.
+"""
+
+from django.db.models import Case, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import DietPlan, Meal, MealFoodItem
+
+# Meal/DietPlan total field -> FoodItem field (per 100g)
+NUTRIENT_FIELDS = [
+    ('total_calories', 'calories'),
+    ('total_protein', 'protein'),
+    ('total_carbs', 'carbs'),
+    ('total_fats', 'fats'),
+]
+
+
+def grams_expression():
+    return Case(
+        *[
+            When(unit=unit, then=ExpressionWrapper(F('quantity') * factor, output_field=FloatField()))
+            for unit, factor in MealFoodItem.GRAMS_PER_UNIT.items()
+        ],
+        default=F('quantity'),
+        output_field=FloatField(),
+    )
+
+
+def meal_totals():
+    items = MealFoodItem.objects.filter(meal=OuterRef('pk')).order_by().values('meal')
+    grams = grams_expression()
+    return {
+        total: Coalesce(
+            Subquery(items.annotate(value=Sum(ExpressionWrapper(
+                F(f'food_item__{field}') * grams / 100.0, output_field=FloatField()
+            ))).values('value')),
+            Value(0.0),
+        )
+        for total, field in NUTRIENT_FIELDS
+    }
+
+
+def plan_totals():
+    meals = Meal.objects.filter(diet_plan=OuterRef('pk')).order_by().values('diet_plan')
+    return {
+        total: Coalesce(Subquery(meals.annotate(value=Sum(total)).values('value')), Value(0.0))
+        for total, _ in NUTRIENT_FIELDS
+    }
+
+
+def refresh_plan_totals(plan_ids):
+    """plan_ids may be a list or a queryset of ids. Also bumps updated_at, which validates plan responses"""
+    DietPlan.objects.filter(pk__in=plan_ids).update(updated_at=timezone.now(), **plan_totals())
+
+
+def refresh_meal_totals(meal_ids):
+    """Recompute the given meals and then the plans that own them"""
+    meal_ids = list(meal_ids)
+    if not meal_ids:
+        return
+    Meal.objects.filter(pk__in=meal_ids).update(**meal_totals())
+    refresh_plan_totals(Meal.objects.filter(pk__in=meal_ids).values('diet_plan_id'))
+
+
+def refresh_food_item_totals(food_item_ids):
+    """FoodItem nutrients changed: refresh every meal that uses one of them"""
+    refresh_meal_totals(MealFoodItem.objects.filter(food_item_id__in=food_item_ids).values_list('meal_id', flat=True).distinct())
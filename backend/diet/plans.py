@@ -0,0 +1,146 @@
+"""
+Bulk writes of a DietPlan's meals and foods.
+
+Food names are resolved for the whole payload at once. On updates, incoming
+meals and foods are matched against what exists instead of being recreated:
+meals by id, falling back to name, and foods by food item, falling back to
+id. Only the differences are written, as bulk inserts, updates and deletes,
+so matched meals keep their primary keys and their MealRegistration history.
+"""
+
+from django.db import transaction
+
+from core.caching import invalidate_model
+
+from .models import FoodItem, Meal, MealFoodItem
+from .nutrition import refresh_meal_totals
+
+MEAL_FIELDS = ['name', 'time', 'description']
+MEAL_FOOD_ITEM_FIELDS = ['food_item', 'quantity', 'unit']
+
+
+def food_defaults(food_data):
+    """FoodItem fields for a food first seen in a meal payload"""
+    return {
+        'calories': int(food_data.get('calories', 0)),
+        'protein': float(food_data.get('protein', 0)),
+        'carbs': float(food_data.get('carbs', 0)),
+        'fats': float(food_data.get('fat', 0)),
+        'category': 'OTH',  # Default category
+    }
+
+
+def resolve_food_items(foods_data):
+    """
+    name -> FoodItem for every named food: one name__in query, then one
+    bulk insert for the missing names. Concurrent requests inserting the
+    same name are settled by the unique constraint; the loser re-reads it.
+    """
+    wanted = {}
+    for food_data in foods_data:
+        if food_data.get('name'):
+            wanted.setdefault(food_data['name'], food_data)
+
+    food_items = FoodItem.objects.in_bulk(wanted, field_name='name')
+    missing = [
+        FoodItem(name=name, search_name=FoodItem.normalize_name(name), **food_defaults(food_data))
+        for name, food_data in wanted.items() if name not in food_items
+    ]
+    if missing:
+        FoodItem.objects.bulk_create(missing, ignore_conflicts=True)
+        food_items.update(FoodItem.objects.in_bulk([food_item.name for food_item in missing], field_name='name'))
+        # bulk_create skips save() and the post_save receiver that invalidates cached food lists
+        invalidate_model(FoodItem)
+    return food_items
+
+
+def create_meal_foods(meal, foods_data):
+    """Add foods to a new meal with one bulk insert"""
+    to_create, _, _ = diff_foods(meal, [], foods_data, resolve_food_items(foods_data))
+    MealFoodItem.objects.bulk_create(to_create)
+    refresh_meal_totals([meal.pk])
+
+
+def match_meals(existing, meals_data):
+    """Pair each incoming meal with an existing one (or None); ids first, then names"""
+    matches = [existing.get(meal_data.get('id')) for meal_data in meals_data]
+    claimed = {meal.pk for meal in matches if meal is not None}
+    for i, meal_data in enumerate(meals_data):
+        if matches[i] is None and 'id' not in meal_data:
+            meal = next(
+                (meal for meal in existing.values() if meal.pk not in claimed and meal.name == meal_data.get('name')),
+                None,
+            )
+            if meal is not None:
+                matches[i] = meal
+                claimed.add(meal.pk)
+    return matches
+
+
+def diff_foods(meal, current, foods_data, food_items):
+    """(to_create, to_update, to_delete) MealFoodItems turning current into foods_data"""
+    wanted = {}
+    for food_data in foods_data:
+        food_item = food_items.get(food_data.get('name'))
+        if food_item is not None:
+            # Later entries win, a meal lists each food once
+            wanted[food_item.pk] = (food_item, food_data)
+
+    by_food = {item.food_item_id: item for item in current}
+    spare = {item.pk: item for item in current if item.food_item_id not in wanted}
+    to_create, to_update = [], []
+    for food_item_id, (food_item, food_data) in wanted.items():
+        quantity = float(food_data.get('quantity', 0))
+        unit = food_data.get('unit', 'g')
+        item = by_food.get(food_item_id) or spare.pop(food_data.get('id'), None)
+        if item is None:
+            to_create.append(MealFoodItem(meal=meal, food_item=food_item, quantity=quantity, unit=unit))
+        elif (item.food_item_id, item.quantity, item.unit) != (food_item_id, quantity, unit):
+            item.food_item, item.quantity, item.unit = food_item, quantity, unit
+            to_update.append(item)
+    return to_create, to_update, list(spare)
+
+
+@transaction.atomic
+def sync_plan_meals(plan, meals_data):
+    existing = {meal.pk: meal for meal in plan.meals.prefetch_related('mealfooditem_set')}
+    matches = match_meals(existing, meals_data)
+    food_items = resolve_food_items([food for meal_data in meals_data for food in meal_data.get('foods', [])])
+
+    changed_meals, new_meals = [], []
+    for meal, meal_data in zip(matches, meals_data):
+        if meal is None:
+            new_meals.append(Meal(diet_plan=plan, **{field: meal_data[field] for field in MEAL_FIELDS if field in meal_data}))
+            continue
+        changed = [field for field in MEAL_FIELDS if field in meal_data and getattr(meal, field) != meal_data[field]]
+        for field in changed:
+            setattr(meal, field, meal_data[field])
+        if changed:
+            changed_meals.append(meal)
+
+    matched_ids = {meal.pk for meal in matches if meal is not None}
+    Meal.objects.filter(pk__in=[pk for pk in existing if pk not in matched_ids]).delete()
+    Meal.objects.bulk_update(changed_meals, MEAL_FIELDS)
+    Meal.objects.bulk_create(new_meals)
+
+    new_meals = iter(new_meals)
+    to_create, to_update, to_delete = [], [], []
+    touched_meal_ids = set()
+    for meal, meal_data in zip(matches, meals_data):
+        if meal is None:
+            meal, current = next(new_meals), []
+        else:
+            current = list(meal.mealfooditem_set.all())
+        created, updated, deleted = diff_foods(meal, current, meal_data.get('foods', []), food_items)
+        if created or updated or deleted:
+            touched_meal_ids.add(meal.pk)
+        to_create += created
+        to_update += updated
+        to_delete += deleted
+
+    # Deletes first so updates and inserts never collide on (meal, food_item)
+    MealFoodItem.objects.filter(pk__in=to_delete).delete()
+    MealFoodItem.objects.bulk_update(to_update, MEAL_FOOD_ITEM_FIELDS)
+    MealFoodItem.objects.bulk_create(to_create)
+    # Bulk writes skip the receivers that maintain the nutrition totals
+    refresh_meal_totals(touched_meal_ids)
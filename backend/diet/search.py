@@ -0,0 +1,108 @@
+"""
+Accent- and case-insensitive autocomplete over food names.
+
+FoodItem.save() stores the folded name in search_name ('Pão Francês' ->
+'pao frances'), so lookups never fold at query time. Prefixes are range scans
+over its B-tree index. From three characters on, substrings are matched too,
+through a trigram index: an external-content FTS5 table on SQLite, pg_trgm on
+PostgreSQL. Other backends fall back to an unindexed contains.
+"""
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+
+from .models import FoodItem
+
+TRIGRAM_TABLE = 'diet_fooditem_trigram'
+PG_TRIGRAM_INDEX = 'diet_fooditem_search_name_trgm'
+# Shorter keys have no trigram to look up
+MIN_SUBSTRING_LENGTH = 3
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+SQLITE_SEARCH_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TRIGRAM_TABLE} USING fts5(
+        search_name,
+        content='diet_fooditem', content_rowid='id',
+        tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TRIGRAM_TABLE}_ai AFTER INSERT ON diet_fooditem BEGIN
+        INSERT INTO {TRIGRAM_TABLE}(rowid, search_name) VALUES (new.id, new.search_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TRIGRAM_TABLE}_ad AFTER DELETE ON diet_fooditem BEGIN
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, search_name) VALUES ('delete', old.id, old.search_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TRIGRAM_TABLE}_au AFTER UPDATE OF search_name ON diet_fooditem BEGIN
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, search_name) VALUES ('delete', old.id, old.search_name);
+        INSERT INTO {TRIGRAM_TABLE}(rowid, search_name) VALUES (new.id, new.search_name);
+    END""",
+]
+
+
+def install_search_index(using_connection=connection):
+    """Create the backend's trigram index if it is missing; safe to run repeatedly"""
+    with using_connection.cursor() as cursor:
+        if using_connection.vendor == 'sqlite':
+            # Table rebuilds by later migrations drop the triggers, see exercises.search
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{TRIGRAM_TABLE}_%'],
+            )
+            if cursor.fetchone()[0] == 3:
+                return
+            for statement in SQLITE_SEARCH_SQL:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}) VALUES ('rebuild')")
+        elif using_connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {PG_TRIGRAM_INDEX} ON diet_fooditem USING GIN (search_name gin_trgm_ops)'
+            )
+
+
+def drop_search_index(using_connection=connection):
+    with using_connection.cursor() as cursor:
+        if using_connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {TRIGRAM_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {TRIGRAM_TABLE}')
+        elif using_connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {PG_TRIGRAM_INDEX}')
+
+
+def prefix_filter(key):
+    if connection.vendor == 'sqlite':
+        # LIKE can't use the index under SQLite's default case-insensitive LIKE,
+        # a range over the binary collation can
+        return Q(search_name__gte=key, search_name__lt=key + '\U0010ffff')
+    # Django gives the column a varchar_pattern_ops index on PostgreSQL
+    return Q(search_name__startswith=key)
+
+
+def substring_filter(key):
+    if connection.vendor == 'sqlite':
+        # Keys are letters, digits and single spaces, nothing to escape in the phrase
+        return Q(id__in=RawSQL(f'SELECT rowid FROM {TRIGRAM_TABLE} WHERE {TRIGRAM_TABLE} MATCH %s', [f'"{key}"']))
+    return Q(search_name__contains=key)
+
+
+def search_foods(query, limit=DEFAULT_LIMIT):
+    """
+    Foods whose folded name starts with or contains the folded query. Whole
+    name prefixes rank first, then word prefixes, then other substrings;
+    shorter names first within each group.
+    """
+    key = FoodItem.normalize_name(query)
+    if not key:
+        return []
+    ordering = [Length('search_name'), 'search_name', 'id']
+    foods = list(FoodItem.objects.filter(prefix_filter(key)).order_by(*ordering)[:limit])
+    if len(foods) == limit or len(key) < MIN_SUBSTRING_LENGTH:
+        # Prefix matches outrank everything else, skip the trigram lookup
+        return foods
+    foods += FoodItem.objects.filter(substring_filter(key)).exclude(prefix_filter(key)).annotate(
+        word_prefix=Case(When(search_name__contains=f' {key}', then=Value(0)), default=Value(1), output_field=IntegerField()),
+    ).order_by('word_prefix', *ordering)[:limit - len(foods)]
+    return foods
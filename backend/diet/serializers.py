@@ -1,7 +1,13 @@
 from rest_framework import serializers
 from .models import Meal, DietPlan, MealFoodItem, FoodItem
 from users.serializers import UserSerializer
+from teachers.scoping import ScopedPrimaryKeyRelatedField
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from .plans import create_meal_foods, sync_plan_meals
+from .adherence import MAX_DAYS
+from datetime import timedelta
+from django.utils import timezone
 
 class FoodItemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -26,18 +32,22 @@ class MealFoodItemSerializer(serializers.ModelSerializer):
 
 class MealSerializer(serializers.ModelSerializer):
     food_items = serializers.SerializerMethodField()
-    total_calories = serializers.ReadOnlyField()
-    diet_plan_id = serializers.PrimaryKeyRelatedField(queryset=DietPlan.objects.all(), source='diet_plan', write_only=True, required=False)
+    diet_plan_id = ScopedPrimaryKeyRelatedField(
+        queryset=DietPlan.objects.all(), user_field='student', source='diet_plan', write_only=True, required=False
+    )
 
     class Meta: 
         model = Meal 
-        fields = ['id', 'diet_plan_id', 'name', 'time', 'description', 'food_items', 'total_calories']
+        fields = ['id', 'diet_plan_id', 'name', 'time', 'description', 'food_items', 'total_calories', 'total_protein', 'total_carbs', 'total_fats']
+        read_only_fields = ['total_calories', 'total_protein', 'total_carbs', 'total_fats']
     
     def get_food_items(self, obj):
         meal_food_items = obj.mealfooditem_set.all()
         return MealFoodItemSerializer(meal_food_items, many=True).data
 
 class MealCreateSerializer(serializers.ModelSerializer):
+    # Writable so plan updates can match meals that already exist
+    id = serializers.IntegerField(required=False)
     foods = serializers.ListField(child=serializers.DictField(), write_only=True, required=False)
 
     class Meta:
@@ -45,32 +55,10 @@ class MealCreateSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'time', 'description', 'foods']
 
     def create(self, validated_data):
+        validated_data.pop('id', None)
         foods_data = validated_data.pop('foods', [])
         meal = Meal.objects.create(**validated_data)
-        
-        for food_data in foods_data:
-            food_name = food_data.get('name', '')
-            if not food_name:
-                continue
-                
-            food_item, created = FoodItem.objects.get_or_create(
-                name=food_name,
-                defaults={
-                    'calories': int(food_data.get('calories', 0)),
-                    'protein': float(food_data.get('protein', 0)),
-                    'carbs': float(food_data.get('carbs', 0)),
-                    'fats': float(food_data.get('fat', 0)),
-                    'category': 'OTH',  # Default category
-                }
-            )
-            
-            MealFoodItem.objects.create(
-                meal=meal,
-                food_item=food_item,
-                quantity=float(food_data.get('quantity', 0)),
-                unit=food_data.get('unit', 'g')
-            )
-        
+        create_meal_foods(meal, foods_data)
         return meal
 
 class DietPlanSerializer(serializers.ModelSerializer):
@@ -91,9 +79,13 @@ class DietPlanSerializer(serializers.ModelSerializer):
             'start_date',
             'end_date',
             'is_active',
+            'total_calories',
+            'total_protein',
+            'total_carbs',
+            'total_fats',
             'meals',
         ]
-        read_only_fields = ['id', 'student', 'teacher', 'start_date', 'end_date', 'is_active']
+        read_only_fields = ['id', 'student', 'teacher', 'start_date', 'end_date', 'is_active', 'total_calories', 'total_protein', 'total_carbs', 'total_fats']
 
 class DietPlanCreateSerializer(serializers.ModelSerializer):
     meals = MealCreateSerializer(many=True, write_only=True, required=False)
@@ -113,6 +105,7 @@ class DietPlanCreateSerializer(serializers.ModelSerializer):
             'meals',
         ]
     
+    @transaction.atomic
     def create(self, validated_data):
         meals_data = validated_data.pop('meals', [])
         student_id = validated_data.pop('student_id')
@@ -131,16 +124,22 @@ class DietPlanCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        for meal_data in meals_data:
-            meal_data['diet_plan'] = diet_plan
-            meal_serializer = MealCreateSerializer(data=meal_data)
-            if meal_serializer.is_valid():
-                meal_serializer.save(diet_plan=diet_plan)
+        # Foods of every meal are resolved together and inserted in bulk
+        sync_plan_meals(diet_plan, meals_data)
         
         return diet_plan
     
+    def validate_meals(self, meals):
+        if self.partial and any('id' not in meal and not {'name', 'time'} <= set(meal) for meal in meals):
+            raise serializers.ValidationError('New meals need a name and a time.')
+        ids = [meal['id'] for meal in meals if meal.get('id') is not None]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each meal id can appear only once.')
+        return meals
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        meals_data = validated_data.pop('meals', [])
+        meals_data = validated_data.pop('meals', None)
         student_id = validated_data.pop('student_id', None)
         
         # Update basic fields
@@ -153,21 +152,38 @@ class DietPlanCreateSerializer(serializers.ModelSerializer):
         
         if student_id:
             User = get_user_model()
-            instance.student = User.objects.get(id=student_id)
+            try:
+                instance.student = User.objects.get(id=student_id)
+            except User.DoesNotExist:
+                raise serializers.ValidationError({"student_id": "User not found. Send a valid user id (not student id)."})
         
         instance.save()
         
-        # Delete existing meals
-        instance.meals.all().delete()
-        
-        # Create new meals
-        for meal_data in meals_data:
-            meal_data['diet_plan'] = instance
-            meal_serializer = MealCreateSerializer(data=meal_data)
-            if meal_serializer.is_valid():
-                meal_serializer.save(diet_plan=instance)
+        # Apply only what changed, so meals keep their ids and registrations
+        if meals_data is not None:
+            sync_plan_meals(instance, meals_data)
         
         return instance
 
     def to_representation(self, instance):
-        return DietPlanSerializer(instance, context=self.context).data
\ No newline at end of file
+        # Reload: totals were recomputed in the database by diet.nutrition while
+        # saving meals, and the meal tree is rendered from one prefetch
+        instance = DietPlan.objects.select_related('student', 'teacher').prefetch_related(
+            'meals__mealfooditem_set__food_item'
+        ).get(pk=instance.pk)
+        return DietPlanSerializer(instance, context=self.context).data
+
+class AdherenceQuerySerializer(serializers.Serializer):
+    """?student=&start=&end= of the adherence report; the last 30 days of the requester by default"""
+    student = serializers.IntegerField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('end', timezone.localdate())
+        attrs.setdefault('start', attrs['end'] - timedelta(days=29))
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'start': 'start must not be after end.'})
+        if (attrs['end'] - attrs['start']).days >= MAX_DAYS:
+            raise serializers.ValidationError({'start': f'The range can span at most {MAX_DAYS} days.'})
+        return attrs
@@ -0,0 +1,71 @@
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from diet.models import DietPlan, FoodItem, Meal, MealFoodItem
+from diet.nutrition import refresh_meal_totals, refresh_plan_totals, refresh_food_item_totals
+from core.caching import invalidate_on_change
+from core.signals import dedupe_refreshes, first_refresh
+from users.models import User
+
+invalidate_on_change('food-items', FoodItem, object_ids=lambda food: [food.pk])
+# Plan responses embed the student and teacher; meal and food changes move
+# the plan's updated_at instead
+invalidate_on_change(
+    'diet-plans', User,
+    object_ids=lambda user: list(
+        DietPlan.objects.filter(Q(student=user.pk) | Q(teacher=user.pk)).values_list('pk', flat=True)
+    ),
+    ignore_fields=['last_login'],
+)
+dedupe_refreshes(Meal)
+dedupe_refreshes(MealFoodItem)
+
+
+def deleted_with_parent(sender, origin):
+    """
+    The delete started on another model (a meal, plan or student), so the
+    row's parent is deleted by the same cascade and needs no refresh.
+    """
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not sender
+
+
+@receiver(post_save, sender=MealFoodItem)
+def update_totals_on_meal_food_item_saved(sender, instance, raw=False, **kwargs):
+    """Keep Meal and DietPlan nutrition totals in sync with their foods"""
+    if raw:
+        return
+    refresh_meal_totals([instance.meal_id])
+
+
+@receiver(post_delete, sender=MealFoodItem)
+def update_totals_on_meal_food_item_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_with_parent(sender, origin) or not first_refresh(origin, ('meal', instance.meal_id)):
+        return
+    refresh_meal_totals([instance.meal_id])
+
+
+@receiver(post_save, sender=FoodItem)
+def update_totals_on_food_item_changed(sender, instance, created, raw=False, **kwargs):
+    """Nutrient values changed: refresh every meal using this food"""
+    if created or raw:
+        return
+    refresh_food_item_totals([instance.pk])
+
+
+@receiver(post_save, sender=Meal)
+def touch_plan_on_meal_saved(sender, instance, raw=False, **kwargs):
+    """Renamed or rescheduled meals change the plan's response too"""
+    if raw:
+        return
+    refresh_plan_totals([instance.diet_plan_id])
+
+
+@receiver(post_delete, sender=Meal)
+def update_totals_on_meal_deleted(sender, instance, origin=None, **kwargs):
+    """Drop a deleted meal's contribution from its plan"""
+    if deleted_with_parent(sender, origin) or not first_refresh(origin, ('plan', instance.diet_plan_id)):
+        return
+    refresh_plan_totals([instance.diet_plan_id])
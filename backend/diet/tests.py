@@ -1,3 +1,526 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.caching import cache_stats, reset_cache_stats
+from student.models import Student
+from teachers.models import Teacher, TeacherStudents
+from users.models import User
+from .adherence import daily_adherence
+from .models import DietPlan, FoodItem, Meal, MealFoodItem, MealRegistration
+
+
+class DietAPITestCase(APITestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='coach', email='coach@example.com', is_teacher=True)
+        self.student = User.objects.create(username='athlete', email='athlete@example.com', is_student=True)
+        self.rice = FoodItem.objects.create(name='Arroz', calories=130, protein=2.7, carbs=28, fats=0.3, category='GRN')
+        self.milk = FoodItem.objects.create(name='Leite', calories=60, protein=3.2, carbs=4.8, fats=3.3, category='DRY')
+        self.client.force_authenticate(self.teacher)
+
+    def create_plan(self, meals=1):
+        plan = DietPlan.objects.create(
+            student=self.student, teacher=self.teacher, name='Plano', goal='BUK',
+            start_date=date(2025, 1, 1), end_date=date(2025, 3, 1),
+        )
+        for i in range(meals):
+            meal = Meal.objects.create(diet_plan=plan, name=f'Refeição {i}', time=time(8 + i))
+            MealFoodItem.objects.create(meal=meal, food_item=self.rice, quantity=200, unit='g')
+            MealFoodItem.objects.create(meal=meal, food_item=self.milk, quantity=1, unit='cup')
+        return plan
+
+
+class NutritionTotalsTests(DietAPITestCase):
+    def test_totals_convert_units_and_roll_up(self):
+        plan = self.create_plan(meals=2)
+        meal = plan.meals.first()
+        meal.refresh_from_db()
+        plan.refresh_from_db()
+
+        self.assertAlmostEqual(meal.total_calories, 130 * 2 + 60 * 2.4)
+        self.assertAlmostEqual(meal.total_protein, 2.7 * 2 + 3.2 * 2.4)
+        self.assertAlmostEqual(plan.total_calories, 2 * meal.total_calories)
+
+    def test_totals_follow_food_and_item_changes(self):
+        plan = self.create_plan()
+        meal = plan.meals.get()
+
+        self.rice.calories = 100
+        self.rice.save()
+        meal.refresh_from_db()
+        self.assertAlmostEqual(meal.total_calories, 100 * 2 + 60 * 2.4)
+
+        MealFoodItem.objects.get(meal=meal, food_item=self.milk).delete()
+        meal.refresh_from_db()
+        self.assertAlmostEqual(meal.total_calories, 200)
+
+        meal.delete()
+        plan.refresh_from_db()
+        self.assertEqual(plan.total_calories, 0)
+
+    def test_cascading_deletes_refresh_each_parent_once(self):
+        def delete_count(target):
+            with CaptureQueriesContext(connection) as ctx:
+                target.delete()
+            return len(ctx.captured_queries)
+
+        small, large = self.create_plan(meals=1), self.create_plan(meals=6)
+        self.assertEqual(delete_count(large), delete_count(small))
+
+        plan = self.create_plan(meals=3)
+        meals = list(plan.meals.all())
+        few = delete_count(Meal.objects.filter(pk=meals[0].pk))
+        many = delete_count(Meal.objects.filter(pk__in=[meal.pk for meal in meals[1:]]))
+        self.assertEqual(few, many)
+        plan.refresh_from_db()
+        self.assertEqual(plan.total_calories, 0)
+
+        plan = self.create_plan(meals=1)
+        delete_count(MealFoodItem.objects.filter(meal__diet_plan=plan))
+        plan.refresh_from_db()
+        self.assertEqual(plan.total_calories, 0)
+
+    def test_plan_list_query_count_is_constant(self):
+        self.create_plan(meals=1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/diet-plans/')
+        few = len(ctx.captured_queries)
+
+        self.create_plan(meals=6)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/diet-plans/')
+        many = len(ctx.captured_queries)
+
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(few, many)
+
+
+class FoodItemCacheTests(DietAPITestCase):
+    def setUp(self):
+        # Flush the fixtures' invalidations so later saves start a new batch
+        with self.captureOnCommitCallbacks(execute=True):
+            super().setUp()
+        cache.clear()
+        reset_cache_stats()
+
+    def get_counted(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, len(ctx.captured_queries)
+
+    def test_list_is_served_from_cache_until_a_food_changes(self):
+        response, queries = self.get_counted('/api/food-items/')
+        self.assertGreater(queries, 0)
+
+        cached, queries = self.get_counted('/api/food-items/')
+        self.assertEqual(queries, 0)
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cache_stats()['food-items'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rice.calories = 100
+            self.rice.save()
+        response, queries = self.get_counted('/api/food-items/')
+        self.assertGreater(queries, 0)
+        self.assertIn(100, [food['calories'] for food in response.data])
+
+    def test_detail_entries_are_invalidated_per_object(self):
+        self.client.get(f'/api/food-items/{self.rice.pk}/')
+        self.client.get(f'/api/food-items/{self.milk.pk}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.protein = 3.5
+            self.milk.save()
+
+        _, queries = self.get_counted(f'/api/food-items/{self.rice.pk}/')
+        self.assertEqual(queries, 0)
+        response, queries = self.get_counted(f'/api/food-items/{self.milk.pk}/')
+        self.assertGreater(queries, 0)
+        self.assertEqual(response.data['protein'], 3.5)
+
+    def test_stats_endpoint_requires_admin(self):
+        self.client.get('/api/food-items/')
+        self.assertEqual(self.client.get('/api/cache-stats/').status_code, 403)
+
+        admin = User.objects.create(username='admin', email='admin@example.com', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['namespaces']['food-items']['misses'], 1)
+
+
+class FoodAutocompleteTests(DietAPITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            super().setUp()
+            for name in ['Pão Francês', 'Pão de Queijo', 'Pão', 'Feijão Preto', 'Maçã', 'Suco de Maçã']:
+                FoodItem.objects.create(name=name, calories=100, protein=1, carbs=1, fats=1, category='OTH')
+        cache.clear()
+
+    def names(self, query, **params):
+        response = self.client.get('/api/food-items/autocomplete/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [food['name'] for food in response.data]
+
+    def test_matching_ignores_accents_and_case(self):
+        self.assertEqual(FoodItem.objects.get(name='Pão Francês').search_name, 'pao frances')
+        self.assertEqual(self.names('PAO'), ['Pão', 'Pão Francês', 'Pão de Queijo'])
+        self.assertEqual(self.names('feijao'), ['Feijão Preto'])
+        self.assertEqual(self.names(''), [])
+
+    def test_prefixes_rank_before_word_prefixes_and_substrings(self):
+        self.assertEqual(self.names('maca'), ['Maçã', 'Suco de Maçã'])
+        self.assertEqual(self.names('queijo'), ['Pão de Queijo'])
+        # Substrings need three characters, shorter keys only match prefixes
+        self.assertEqual(self.names('ao'), [])
+        self.assertEqual(self.names('pao', limit=2), ['Pão', 'Pão Francês'])
+
+    def test_renames_reach_the_index_and_the_cache(self):
+        self.assertEqual(self.names('pao f'), ['Pão Francês'])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.names('Pão F'), ['Pão Francês'])
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            food = FoodItem.objects.get(name='Pão Francês')
+            food.name = 'Baguete'
+            food.save(update_fields=['name'])
+        self.assertEqual(self.names('pao f'), [])
+        self.assertEqual(self.names('guet'), ['Baguete'])
+
+
+class ConditionalGetTests(DietAPITestCase):
+    def test_unchanged_plans_return_304_without_serializing(self):
+        plan = self.create_plan(meals=2)
+        response = self.client.get('/api/diet-plans/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/diet-plans/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        response = self.client.get(f'/api/diet-plans/{plan.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deletes_change_the_etag(self):
+        plans = [self.create_plan(), self.create_plan()]
+        etag = self.client.get('/api/diet-plans/')['ETag']
+        plans[0].delete()
+        response = self.client.get(
+            '/api/diet-plans/', HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_meal_changes_invalidate_the_plan(self):
+        plan = self.create_plan()
+        etag = self.client.get(f'/api/diet-plans/{plan.pk}/')['ETag']
+
+        item = MealFoodItem.objects.get(meal__diet_plan=plan, food_item=self.rice)
+        item.quantity = 50
+        item.save()
+        response = self.client.get(f'/api/diet-plans/{plan.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+    def test_people_changes_invalidate_the_plan(self):
+        plan = self.create_plan()
+        etag = self.client.get(f'/api/diet-plans/{plan.pk}/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plan.student.first_name = 'Renamed'
+            plan.student.save()
+        response = self.client.get(f'/api/diet-plans/{plan.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['student']['first_name'], 'Renamed')
+
+
+class DietPlanUpdateTests(DietAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = self.create_plan(meals=2)
+        self.breakfast, self.lunch = self.plan.meals.order_by('id')
+        MealRegistration.objects.create(meal=self.breakfast, date=date(2025, 1, 2))
+
+    def meal_payload(self, meal, with_ids=True):
+        data = {
+            'name': meal.name,
+            'time': meal.time.strftime('%H:%M'),
+            'description': meal.description or '',
+            'foods': [
+                {'name': item.food_item.name, 'quantity': item.quantity, 'unit': item.unit, **({'id': item.pk} if with_ids else {})}
+                for item in meal.mealfooditem_set.order_by('id')
+            ],
+        }
+        if with_ids:
+            data['id'] = meal.pk
+        return data
+
+    def put(self, meals):
+        return self.client.put(f'/api/diet-plans/{self.plan.pk}/', {
+            'student_id': self.student.pk, 'name': 'Plano', 'goal': 'BUK',
+            'start_date': '2025-01-01', 'end_date': '2025-03-01', 'meals': meals,
+        }, format='json')
+
+    def item_ids(self):
+        return set(MealFoodItem.objects.filter(meal__diet_plan=self.plan).values_list('id', flat=True))
+
+    def test_editing_one_food_keeps_ids_and_registrations(self):
+        item_ids = self.item_ids()
+        breakfast = self.meal_payload(self.breakfast)
+        breakfast['foods'][0]['quantity'] = 100
+
+        response = self.put([breakfast, self.meal_payload(self.lunch)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(self.plan.meals.values_list('id', flat=True)), {self.breakfast.pk, self.lunch.pk})
+        self.assertEqual(self.item_ids(), item_ids)
+        self.assertTrue(MealRegistration.objects.filter(meal=self.breakfast).exists())
+
+        self.breakfast.refresh_from_db()
+        self.assertAlmostEqual(self.breakfast.total_calories, 130 + 60 * 2.4)
+        self.assertAlmostEqual(response.data['total_calories'], self.breakfast.total_calories + 130 * 2 + 60 * 2.4)
+
+    def test_meals_and_foods_are_inserted_and_deleted(self):
+        breakfast = self.meal_payload(self.breakfast)
+        breakfast['foods'] = [breakfast['foods'][0], {'name': 'Ovo', 'quantity': 2, 'unit': 'unit', 'calories': 155, 'protein': 13, 'fat': 11}]
+        snack = {'name': 'Lanche', 'time': '16:00', 'foods': [{'name': 'Leite', 'quantity': 200, 'unit': 'ml'}]}
+
+        response = self.put([breakfast, snack])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Meal.objects.filter(pk=self.lunch.pk).exists())
+        self.assertEqual(sorted(self.plan.meals.values_list('name', flat=True)), ['Lanche', 'Refeição 0'])
+        self.assertEqual(
+            sorted(self.breakfast.mealfooditem_set.values_list('food_item__name', flat=True)), ['Arroz', 'Ovo']
+        )
+        self.assertEqual(FoodItem.objects.get(name='Ovo').fats, 11)
+
+        self.plan.refresh_from_db()
+        self.assertAlmostEqual(self.plan.total_calories, 130 * 2 + 155 * 2 + 60 * 2)
+
+    def test_payloads_without_ids_match_meals_by_name(self):
+        response = self.put([self.meal_payload(self.breakfast, with_ids=False), self.meal_payload(self.lunch, with_ids=False)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(self.plan.meals.values_list('id', flat=True)), {self.breakfast.pk, self.lunch.pk})
+        self.assertTrue(MealRegistration.objects.filter(meal=self.breakfast).exists())
+
+    def test_repeated_meal_ids_are_rejected(self):
+        breakfast = self.meal_payload(self.breakfast)
+        response = self.put([breakfast, {**breakfast, 'name': 'Outra'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('meals', response.data)
+        self.assertEqual(self.plan.meals.count(), 2)
+
+    def test_partial_update_without_meals_keeps_them(self):
+        item_ids = self.item_ids()
+        response = self.client.patch(f'/api/diet-plans/{self.plan.pk}/', {'name': 'Plano novo'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.item_ids(), item_ids)
+
+
+class DietPlanCreateTests(DietAPITestCase):
+    def post(self, foods_per_meal, prefix):
+        meals = [
+            {
+                'name': f'Refeição {m}', 'time': f'{8 + m}:00',
+                'foods': [
+                    {'name': f'{prefix} {m}-{f}', 'quantity': 100, 'unit': 'g', 'calories': 100, 'protein': 5, 'carbs': 10, 'fat': 2}
+                    for f in range(foods_per_meal)
+                ] + [{'name': 'Arroz', 'quantity': 100, 'unit': 'g'}],
+            }
+            for m in range(5)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/diet-plans/', {
+                'student_id': self.student.pk, 'name': 'Plano', 'goal': 'BUK',
+                'start_date': '2025-01-01', 'end_date': '2025-03-01', 'meals': meals,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return len(ctx.captured_queries), response.data
+
+    def test_query_count_does_not_depend_on_food_count(self):
+        few, _ = self.post(foods_per_meal=2, prefix='Alimento')
+        many, data = self.post(foods_per_meal=10, prefix='Comida')
+        self.assertEqual(few, many)
+        self.assertLess(many, 20)
+
+        self.assertEqual(len(data['meals']), 5)
+        self.assertEqual(len(data['meals'][0]['food_items']), 11)
+        self.assertAlmostEqual(data['total_calories'], 5 * (10 * 100 + 130))
+
+    def test_existing_foods_are_reused(self):
+        self.post(foods_per_meal=1, prefix='Alimento')
+        self.assertEqual(FoodItem.objects.filter(name='Arroz').count(), 1)
+        self.assertEqual(FoodItem.objects.get(name='Arroz').calories, 130)
+        self.assertEqual(FoodItem.objects.get(name='Alimento 0-0').fats, 2)
+
+
+class ImportFoodsTests(DietAPITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            super().setUp()
+
+    def run_import(self, suffix, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, encoding='latin-1', delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        out, self.err = StringIO(), StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_foods', f.name, '--batch-size', '2', *args, stdout=out, stderr=self.err)
+        return out.getvalue()
+
+    def test_taco_csv_is_upserted_by_folded_name(self):
+        plan = self.create_plan()
+        taco = (
+            'Número do Alimento;Categoria do alimento;Descrição dos alimentos;Energia (kcal);Energia (kJ);'
+            'Proteína (g);Lipídeos (g);Carboidrato (g)\n'
+            '1;Cereais e derivados;ARROZ;128;536;2,5;0,2;28,1\n'
+            '2;Frutas e derivados;Maçã, Fuji, com casca, crua;56;234;0,3;Tr;15,2\n'
+            '3;Pescados e frutos do mar;Atum, conserva em óleo;166;695;26,2;6,0;NA\n'
+            ';;;;;;;\n'
+        )
+        output = self.run_import('.csv', taco, '--encoding', 'latin-1')
+
+        self.assertIn('Created: 2', output)
+        self.assertIn('Updated: 1', output)
+        self.assertIn('Skipped: 1', output)
+        self.assertIn('Skipped line 5: no name', self.err.getvalue())
+        self.assertIn('rows/s', output)
+        apple = FoodItem.objects.get(search_name='maca fuji com casca crua')
+        self.assertEqual((apple.calories, apple.fats, apple.category), (56, 0, 'FRT'))
+        self.assertEqual(FoodItem.objects.get(name='Atum, conserva em óleo').category, 'PRN')
+        # 'ARROZ' folds onto the existing 'Arroz', which keeps its name
+        self.rice.refresh_from_db()
+        self.assertEqual((self.rice.calories, self.rice.protein), (128, 2.5))
+        plan.refresh_from_db()
+        self.assertAlmostEqual(plan.total_calories, 2 * 128 + 240 * 0.6)
+
+        output = self.run_import('.csv', taco, '--encoding', 'latin-1')
+        self.assertIn('Unchanged: 3', output)
+        self.assertEqual(FoodItem.objects.count(), 4)
+
+    def test_usda_json_is_streamed(self):
+        foods = {'FoundationFoods': [
+            {
+                'description': f'Beans, Dry, Variety {i}',
+                'foodCategory': {'description': 'Legumes and Legume Products'},
+                'foodNutrients': [
+                    {'nutrient': {'number': '203', 'name': 'Protein'}, 'amount': 21.5},
+                    {'nutrient': {'number': '204', 'name': 'Total lipid (fat)'}, 'amount': 1.2},
+                    {'nutrient': {'number': '205', 'name': 'Carbohydrate, by difference'}, 'amount': 60.1},
+                    {'nutrient': {'number': '958', 'name': 'Energy (Atwater Specific Factors)'}, 'amount': 333.4},
+                ],
+            }
+            for i in range(5)
+        ]}
+        output = self.run_import('.json', json.dumps(foods))
+
+        self.assertIn('Created: 5', output)
+        beans = FoodItem.objects.get(name='Beans, Dry, Variety 3')
+        self.assertEqual((beans.calories, beans.protein, beans.category), (333, 21.5, 'PRN'))
+        self.assertEqual(beans.search_name, 'beans dry variety 3')
+
+    def test_unconvertible_rows_are_skipped_and_reported(self):
+        output = self.run_import('.csv', (
+            'name,calories,protein,fat\n'
+            'Feijao,76,4.8,0.5\n'
+            'Lentilha,muitas,9,0.4\n'
+            'Grao de bico,164,nan,2.6\n'
+            'Ervilha,81,Tr,-\n'
+        ))
+        self.assertIn('Created: 2', output)
+        self.assertIn('Skipped: 2', output)
+        self.assertIn("Skipped line 3: 'muitas' is not a number", self.err.getvalue())
+        self.assertIn("Skipped line 4: 'nan' is not a number", self.err.getvalue())
+        self.assertEqual(FoodItem.objects.get(search_name='ervilha').fats, 0)
+
+    def test_parser_errors_are_not_reported_as_bad_files(self):
+        with mock.patch('diet.management.commands.import_foods.map_category', side_effect=ValueError('bug')):
+            with self.assertRaisesMessage(ValueError, 'bug'):
+                self.run_import('.json', '[{"name": "Feijao", "calories": 76}]')
+
+    def test_malformed_json_is_a_command_error(self):
+        for content in ('[{"name": "Feijao", "calories": 76}, {"name": ', '{"name": "Feijao"}'):
+            with self.assertRaises(CommandError):
+                self.run_import('.json', content)
+        self.assertFalse(FoodItem.objects.filter(search_name='feijao').exists())
+
+
+class AdherenceTests(DietAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # Two meals of 200 g rice and a cup of milk: 404 kcal each
+        self.plan = self.create_plan(meals=2)
+        breakfast, lunch = self.plan.meals.order_by('time')
+        eaten = {1: [breakfast, lunch], 2: [breakfast, lunch], 3: [breakfast], 4: [breakfast, lunch], 5: [breakfast, lunch], 6: [lunch, breakfast]}
+        MealRegistration.objects.bulk_create([
+            MealRegistration(meal=meal, date=date(2025, 1, day)) for day, meals in eaten.items() for meal in meals
+        ])
+
+    def get(self, **params):
+        return self.client.get('/api/diet-plans/adherence/', {'start': '2025-01-01', 'end': '2025-01-07', **params})
+
+    def test_days_streaks_and_summary_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            report = daily_adherence(self.student.pk, date(2024, 12, 31), date(2025, 1, 7))
+
+        days = report['days']
+        self.assertEqual([day['date'] for day in days], [date(2024, 12, 31) + timedelta(days=i) for i in range(8)])
+        self.assertEqual([day['streak'] for day in days], [0, 1, 2, 0, 1, 2, 3, 0])
+        # Before the plan started nothing was planned
+        self.assertEqual(days[0]['planned']['calories'], 0)
+        self.assertIsNone(days[0]['adherence']['calories'])
+        self.assertEqual(days[1]['planned'], {'calories': 808, 'protein': 26.2, 'carbs': 135.0, 'fats': 17.0, 'meals': 2})
+        self.assertEqual(days[3]['consumed']['meals'], 1)
+        self.assertEqual(days[3]['adherence']['calories'], 50.0)
+
+        summary = report['summary']
+        self.assertEqual(summary['planned']['calories'], 7 * 808)
+        self.assertEqual(summary['consumed']['meals'], 11)
+        self.assertEqual(summary['adherence']['meals'], round(11 * 100 / 14, 1))
+        self.assertEqual((summary['adherent_days'], summary['current_streak'], summary['longest_streak']), (5, 0, 3))
+
+    def test_overlapping_plans_count_once(self):
+        # A one-meal plan replacing the two-meal one from the 4th
+        replacement = self.create_plan(meals=1)
+        DietPlan.objects.filter(pk=replacement.pk).update(start_date=date(2025, 1, 4))
+
+        days = daily_adherence(self.student.pk, date(2025, 1, 1), date(2025, 1, 7))['days']
+        self.assertEqual([day['planned']['meals'] for day in days], [2, 2, 2, 1, 1, 1, 1])
+        self.assertEqual(days[3]['planned']['calories'], 404)
+        # Meals of the replaced plan no longer count once the replacement starts
+        self.assertEqual([day['consumed']['meals'] for day in days], [2, 2, 1, 0, 0, 0, 0])
+
+        MealRegistration.objects.create(meal=replacement.meals.get(), date=date(2025, 1, 4))
+        days = daily_adherence(self.student.pk, date(2025, 1, 1), date(2025, 1, 7))['days']
+        self.assertEqual(days[3]['consumed'], {**days[3]['planned'], 'meals': 1})
+
+    def test_students_and_their_teachers_can_read_it(self):
+        self.assertEqual(self.get(student=self.student.pk).status_code, 404)
+
+        TeacherStudents.objects.create(teacher=Teacher.objects.create(user=self.teacher), student=Student.objects.create(user=self.student))
+        response = self.get(student=self.student.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['longest_streak'], 3)
+
+        self.client.force_authenticate(self.student)
+        response = self.get(end='2025-01-06')
+        self.assertEqual(response.data['student'], self.student.pk)
+        self.assertEqual(response.data['summary']['current_streak'], 3)
+
+    def test_ranges_are_validated(self):
+        self.assertEqual(self.get(start='2025-01-08').status_code, 400)
+        self.assertEqual(self.get(start='2023-01-01').status_code, 400)
 
-# Create your tests here.
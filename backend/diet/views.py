@@ -1,20 +1,36 @@
 from django.shortcuts import render
 from rest_framework import viewsets
 from .serializers import * 
+from .search import DEFAULT_LIMIT, MAX_LIMIT, search_foods
+from .adherence import daily_adherence
 from rest_framework import permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from teachers.models import TeacherStudents
+from teachers.scoping import scoped_to_user
+from core.caching import cache_response, cached
+from django.http import Http404
+from core.conditional import conditional_response
     
 class MealViewSet(viewsets.ModelViewSet):
     queryset = Meal.objects.all()
     serializer_class = MealSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        queryset = Meal.objects.prefetch_related('mealfooditem_set__food_item')
+        return scoped_to_user(queryset, self.request.user, 'diet_plan__student')
+
 class DietPlanViewSet(viewsets.ModelViewSet):
     queryset = DietPlan.objects.all()
     serializer_class = DietPlanSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = DietPlan.objects.all()
+        # Totals are stored columns, so only the food listing needs prefetching
+        queryset = DietPlan.objects.select_related('student', 'teacher').prefetch_related(
+            'meals__mealfooditem_set__food_item'
+        )
         student_id = self.request.query_params.get('student', None)
         teacher_id = self.request.query_params.get('teacher', None)
         is_active = self.request.query_params.get('is_active', None)
@@ -33,6 +49,32 @@ class DietPlanViewSet(viewsets.ModelViewSet):
             return DietPlanCreateSerializer
         return DietPlanSerializer
 
+    @conditional_response('updated_at', namespace='diet-plans')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_response('updated_at', namespace='diet-plans')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def adherence(self, request):
+        """
+        Planned vs registered nutrition per day, adherence percentages and streaks.
+        ?student=<user id>&start=2025-01-01&end=2025-03-31
+        """
+        params = AdherenceQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        student_id = params.validated_data.get('student', request.user.pk)
+        # Students see themselves, teachers the students they coach
+        if student_id != request.user.pk and not (
+            request.user.is_teacher
+            and TeacherStudents.objects.coached_by(request.user).filter(student__user_id=student_id).exists()
+        ):
+            raise Http404
+        start, end = params.validated_data['start'], params.validated_data['end']
+        return Response({'student': student_id, 'start': start, 'end': end, **daily_adherence(student_id, start, end)})
+
 class MealFoodItemViewSet(viewsets.ModelViewSet):
     queryset = MealFoodItem.objects.all()
     serializer_class = MealFoodItemSerializer
@@ -41,4 +83,31 @@ class MealFoodItemViewSet(viewsets.ModelViewSet):
 class FoodItemViewSet(viewsets.ModelViewSet):
     queryset = FoodItem.objects.all()
     serializer_class = FoodItemSerializer
-    permission_classes = [permissions.IsAuthenticated] 
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated]
+
+    @cache_response('food-items', shared=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('food-items', per_object=True, shared=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Ranked food name matches, accent- and case-insensitive.
+        ?q=pao&limit=10
+        """
+        key = FoodItem.normalize_name(request.query_params.get('q', ''))
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        # Keyed by the folded query, so 'Pão' and 'pao' share an entry; folded
+        # keys only have single spaces, which cache backends reject in keys
+        data = cached(
+            'food-items', f'autocomplete:{limit}:{key.replace(" ", "+")}',
+            lambda: FoodItemSerializer(search_foods(key, limit), many=True).data,
+        )
+        return Response(data)
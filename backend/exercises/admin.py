@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exercise, ExerciseImage
+from .models import Exercise, ExerciseImage, ExerciseMuscle, Muscle
 
 
 class ExerciseImageInline(admin.TabularInline):
@@ -8,12 +8,20 @@ class ExerciseImageInline(admin.TabularInline):
     fields = ['image_path', 'order']
 
 
+class ExerciseMuscleInline(admin.TabularInline):
+    model = ExerciseMuscle
+    extra = 0
+    fields = ['muscle', 'role']
+    readonly_fields = ['muscle', 'role']
+    can_delete = False
+
+
 @admin.register(Exercise)
 class ExerciseAdmin(admin.ModelAdmin):
     list_display = ['name', 'level', 'category', 'equipment', 'muscle_group', 'created_at']
     list_filter = ['level', 'category', 'equipment', 'force', 'mechanic', 'muscle_group', 'created_at']
     search_fields = ['name', 'description', 'primary_muscles', 'secondary_muscles']
-    inlines = [ExerciseImageInline]
+    inlines = [ExerciseImageInline, ExerciseMuscleInline]
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'description')
@@ -35,3 +43,9 @@ class ExerciseImageAdmin(admin.ModelAdmin):
     list_display = ['exercise', 'image_path', 'order']
     list_filter = ['exercise__muscle_group']
     search_fields = ['exercise__name']
+
+
+@admin.register(Muscle)
+class MuscleAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name']
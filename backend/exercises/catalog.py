@@ -0,0 +1,48 @@
+"""
+Whole-catalog snapshot for clients that cache the exercise library locally.
+
+The snapshot is keyed by a version derived from row counts and the latest
+change on Exercise and ExerciseImage, stored gzip-compressed in the cache and
+only rebuilt when that version moves.
+"""
+
+import gzip
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+
+from core.caching import cached
+
+from .models import Exercise, ExerciseImage
+from .serializers import ExerciseSerializer, exercise_prefetches
+
+# Bump when the snapshot layout or ExerciseSerializer output changes
+SNAPSHOT_FORMAT = 1
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def catalog_version():
+    exercises = Exercise.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    # Images are replaced rather than edited, so new rows mean a higher max id
+    images = ExerciseImage.objects.aggregate(count=Count('id'), last=Max('id'))
+    key = f"{SNAPSHOT_FORMAT}:{exercises['count']}:{exercises['updated']}:{images['count']}:{images['last']}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def build_snapshot(version):
+    exercises = Exercise.objects.prefetch_related(*exercise_prefetches()).order_by('id')
+    payload = {
+        'version': version,
+        'count': len(exercises),
+        'exercises': ExerciseSerializer(exercises, many=True).data,
+    }
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    # mtime=0 keeps the bytes identical for identical content
+    return gzip.compress(body, mtime=0)
+
+
+def get_snapshot(version):
+    """gzip-compressed JSON for version, built on first request"""
+    return cached('exercise-catalog', version, lambda: build_snapshot(version), timeout=CACHE_TIMEOUT)
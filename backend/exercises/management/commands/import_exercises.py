@@ -1,103 +1,179 @@
-import json
 import os
+import time
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.caching import invalidate_model
+from core.streaming import iter_json_array
 from exercises.models import Exercise, ExerciseImage
+from exercises.muscles import sync_exercise_muscles
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), '../../../exercises.json')
+
+EXERCISE_FIELDS = [
+    'description',
+    'muscle_group',
+    'primary_muscles',
+    'secondary_muscles',
+    'force',
+    'level',
+    'mechanic',
+    'equipment',
+    'category',
+]
+
+
+def parse_exercise(exercise_data):
+    """Map a free-exercise-db entry onto Exercise fields and image paths"""
+    # Build description from instructions
+    instructions = exercise_data.get('instructions', [])
+    primary_muscles = exercise_data.get('primaryMuscles', [])
+    secondary_muscles = exercise_data.get('secondaryMuscles', [])
+
+    fields = {
+        'description': '\n'.join(instructions) if instructions else 'No description available',
+        'muscle_group': primary_muscles[0] if primary_muscles else 'general',
+        'primary_muscles': ', '.join(primary_muscles) if primary_muscles else 'general',
+        'secondary_muscles': ', '.join(secondary_muscles) if secondary_muscles else '',
+        'force': exercise_data.get('force'),
+        'level': exercise_data.get('level', 'beginner'),
+        'mechanic': exercise_data.get('mechanic'),
+        'equipment': exercise_data.get('equipment'),
+        'category': exercise_data.get('category', 'strength'),
+    }
+    # None leaves stored images alone, a list (even an empty one) replaces them
+    images = None
+    if 'images' in exercise_data:
+        images = [f'exercises/{image_path}' for image_path in exercise_data['images'] or []]
+    return exercise_data.get('name', ''), fields, images
 
 
 class Command(BaseCommand):
     help = 'Import exercises from the free-exercise-db JSON file'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=DEFAULT_PATH,
+            help='JSON file with a top-level array of exercises',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Exercises per bulk write',
+        )
+
     def handle(self, *args, **options):
-        # Path to the JSON file
-        json_path = os.path.join(os.path.dirname(__file__), '../../../exercises.json')
-        
-        self.stdout.write('Loading exercises from JSON...')
-        
+        json_path = options['path']
+        self.batch_size = options['batch_size']
+        self.created_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+
+        self.stdout.write(f'Streaming exercises from {json_path}...')
+        start = time.perf_counter()
+
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                exercises_data = json.load(f)
+            with open(json_path, 'r', encoding='utf-8') as f, transaction.atomic():
+                self.load_existing()
+                batch = {}
+                for exercise_data in iter_json_array(f):
+                    name, fields, images = parse_exercise(exercise_data)
+                    # Later entries win, like the old update_or_create loop
+                    batch[name] = (fields, images)
+                    if len(batch) >= self.batch_size:
+                        self.apply_batch(batch)
+                        batch = {}
+                self.apply_batch(batch)
+                # Bulk writes skip the signals that invalidate cached exercise data
+                if self.created_count or self.updated_count:
+                    invalidate_model(Exercise)
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'File not found: {json_path}'))
             return
-        
-        self.stdout.write(f'Found {len(exercises_data)} exercises to import')
-        
-        created_count = 0
-        updated_count = 0
-        
-        for exercise_data in exercises_data:
-            # Extract data from JSON
-            name = exercise_data.get('name', '')
-            
-            # Build description from instructions
-            instructions = exercise_data.get('instructions', [])
-            description = '\n'.join(instructions) if instructions else 'No description available'
-            
-            # Get primary and secondary muscles
-            primary_muscles = exercise_data.get('primaryMuscles', [])
-            secondary_muscles = exercise_data.get('secondaryMuscles', [])
-            primary_muscles_str = ', '.join(primary_muscles) if primary_muscles else 'general'
-            secondary_muscles_str = ', '.join(secondary_muscles) if secondary_muscles else ''
-            muscle_group = primary_muscles[0] if primary_muscles else 'general'
-            
-            # Get other schema fields
-            force = exercise_data.get('force')
-            level = exercise_data.get('level', 'beginner')
-            mechanic = exercise_data.get('mechanic')
-            equipment = exercise_data.get('equipment')
-            category = exercise_data.get('category', 'strength')
-            
-            # Check if exercise already exists
-            existing_exercises = Exercise.objects.filter(name=name)
-            
-            if existing_exercises.count() > 1:
-                # If there are duplicates, delete all but the first one
-                self.stdout.write(self.style.WARNING(f'Found {existing_exercises.count()} duplicates for "{name}", cleaning up...'))
-                for duplicate in existing_exercises[1:]:
-                    duplicate.delete()
-            
-            exercise, created = Exercise.objects.update_or_create(
-                name=name,
-                defaults={
-                    'description': description,
-                    'muscle_group': muscle_group,
-                    'primary_muscles': primary_muscles_str,
-                    'secondary_muscles': secondary_muscles_str,
-                    'force': force,
-                    'level': level,
-                    'mechanic': mechanic,
-                    'equipment': equipment,
-                    'category': category,
-                }
-            )
-            
-            # Handle images
-            images = exercise_data.get('images', [])
-            if images:
-                # Clear existing images for this exercise
-                ExerciseImage.objects.filter(exercise=exercise).delete()
-                
-                # Add new images
-                for idx, image_path in enumerate(images):
-                    ExerciseImage.objects.create(
-                        exercise=exercise,
-                        image_path=f'exercises/{image_path}',
-                        order=idx
-                    )
-            
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-            
-            if (created_count + updated_count) % 100 == 0:
-                self.stdout.write(f'Processed {created_count + updated_count} exercises...')
-        
+
+        total = self.created_count + self.updated_count + self.unchanged_count
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully imported exercises!\n'
-                f'Created: {created_count}\n'
-                f'Updated: {updated_count}\n'
-                f'Total: {created_count + updated_count}'
+                f'Successfully imported exercises in {time.perf_counter() - start:.2f}s!\n'
+                f'Created: {self.created_count}\n'
+                f'Updated: {self.updated_count}\n'
+                f'Unchanged: {self.unchanged_count}\n'
+                f'Total: {total}'
             )
         )
+
+    def load_existing(self):
+        """Index current exercises and images by name, dropping duplicate names"""
+        self.existing = {}
+        duplicate_ids = []
+        for row in Exercise.objects.order_by('id').values('id', 'name', *EXERCISE_FIELDS):
+            if row['name'] in self.existing:
+                duplicate_ids.append(row['id'])
+            else:
+                self.existing[row['name']] = row
+
+        if duplicate_ids:
+            # If there are duplicates, delete all but the first one
+            self.stdout.write(self.style.WARNING(f'Found {len(duplicate_ids)} duplicate exercises, cleaning up...'))
+            Exercise.objects.filter(id__in=duplicate_ids).delete()
+
+        self.existing_images = {}
+        for exercise_id, image_path in ExerciseImage.objects.order_by('exercise_id', 'order').values_list('exercise_id', 'image_path'):
+            self.existing_images.setdefault(exercise_id, []).append(image_path)
+
+    def apply_batch(self, batch):
+        if not batch:
+            return
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        images_by_exercise = {}
+
+        for name, (fields, images) in batch.items():
+            row = self.existing.get(name)
+            if row is None:
+                exercise = Exercise(name=name, **fields)
+                to_create.append(exercise)
+                if images:
+                    images_by_exercise[name] = (exercise, images)
+                continue
+
+            fields_changed = any(row[field] != value for field, value in fields.items())
+            images_changed = images is not None and self.existing_images.get(row['id'], []) != images
+            if not fields_changed and not images_changed:
+                self.unchanged_count += 1
+                continue
+
+            # bulk_update skips auto_now, so updated_at is bumped by hand
+            exercise = Exercise(id=row['id'], name=name, updated_at=now, **fields)
+            to_update.append(exercise)
+            if images_changed:
+                images_by_exercise[name] = (exercise, images)
+
+        Exercise.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Exercise.objects.bulk_update(to_update, [*EXERCISE_FIELDS, 'updated_at'], batch_size=self.batch_size)
+        # Bulk writes skip the post_save receiver that maintains the Muscle relation
+        sync_exercise_muscles([*to_create, *to_update])
+
+        # Replace images only for exercises whose image list changed
+        ExerciseImage.objects.filter(
+            exercise_id__in=[exercise.id for exercise, _ in images_by_exercise.values() if exercise in to_update]
+        ).delete()
+        ExerciseImage.objects.bulk_create([
+            ExerciseImage(exercise=exercise, image_path=image_path, order=idx)
+            for exercise, images in images_by_exercise.values()
+            for idx, image_path in enumerate(images)
+        ], batch_size=self.batch_size)
+
+        for exercise in [*to_create, *to_update]:
+            self.existing[exercise.name] = {'id': exercise.id, 'name': exercise.name, **{
+                field: getattr(exercise, field) for field in EXERCISE_FIELDS
+            }}
+        for exercise, images in images_by_exercise.values():
+            self.existing_images[exercise.id] = images
+
+        self.created_count += len(to_create)
+        self.updated_count += len(to_update)
+        self.stdout.write(f'Processed {self.created_count + self.updated_count + self.unchanged_count} exercises...')
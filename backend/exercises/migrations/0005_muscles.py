@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_muscles(apps, schema_editor):
+    Exercise = apps.get_model('exercises', 'Exercise')
+    Muscle = apps.get_model('exercises', 'Muscle')
+    ExerciseMuscle = apps.get_model('exercises', 'ExerciseMuscle')
+
+    wanted = {}
+    for exercise_id, primary, secondary in Exercise.objects.values_list('id', 'primary_muscles', 'secondary_muscles'):
+        roles = {}
+        for role, value in [('P', primary), ('S', secondary)]:
+            for name in (value or '').split(','):
+                name = name.strip().lower()
+                if name and name != 'general':
+                    roles.setdefault(name, role)
+        wanted[exercise_id] = roles
+
+    names = {name for roles in wanted.values() for name in roles}
+    Muscle.objects.bulk_create([Muscle(name=name) for name in sorted(names)])
+    muscle_ids = dict(Muscle.objects.values_list('name', 'id'))
+    ExerciseMuscle.objects.bulk_create([
+        ExerciseMuscle(exercise_id=exercise_id, muscle_id=muscle_ids[name], role=role)
+        for exercise_id, roles in wanted.items()
+        for name, role in roles.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0004_exercise_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Muscle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExerciseMuscle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('P', 'Primary'), ('S', 'Secondary')], max_length=1)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='muscle_links', to='exercises.exercise')),
+                ('muscle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exercise_links', to='exercises.muscle')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='exercise',
+            name='muscles',
+            field=models.ManyToManyField(blank=True, related_name='exercises', through='exercises.ExerciseMuscle', to='exercises.muscle'),
+        ),
+        migrations.AddIndex(
+            model_name='exercisemuscle',
+            index=models.Index(fields=['muscle', 'role', 'exercise'], name='exercises_e_muscle__6d3883_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='exercisemuscle',
+            unique_together={('exercise', 'muscle')},
+        ),
+        migrations.RunPython(populate_muscles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0005_muscles'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exercise',
+            index=models.Index(fields=['updated_at'], name='exercises_e_updated_31dc76_idx'),
+        ),
+    ]
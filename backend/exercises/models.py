@@ -79,13 +79,56 @@ class Exercise(models.Model):
     video_url = models.URLField(blank=True, null=True)
     image = models.ImageField(upload_to='exercises/', blank=True, null=True)
     
+    muscles = models.ManyToManyField('Muscle', through='ExerciseMuscle', related_name='exercises', blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # max(updated_at) versions the catalog snapshot
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Muscle(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
     def __str__(self):
         return self.name
 
 
+class ExerciseMuscle(models.Model):
+    """Normalized copy of Exercise.primary_muscles/secondary_muscles, kept in sync on save"""
+    PRIMARY = 'P'
+    SECONDARY = 'S'
+    ROLE_CHOICES = [
+        (PRIMARY, 'Primary'),
+        (SECONDARY, 'Secondary'),
+    ]
+
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='muscle_links')
+    muscle = models.ForeignKey(Muscle, on_delete=models.CASCADE, related_name='exercise_links')
+    role = models.CharField(max_length=1, choices=ROLE_CHOICES)
+
+    class Meta:
+        unique_together = ['exercise', 'muscle']
+        ordering = ['id']
+        indexes = [
+            # "exercises hitting the lats", optionally as primary movers only
+            models.Index(fields=['muscle', 'role', 'exercise']),
+        ]
+
+    def __str__(self):
+        return f"{self.exercise.name} - {self.muscle.name} ({self.get_role_display()})"
+
+
 class ExerciseImage(models.Model):
     exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='images')
     image_path = models.CharField(max_length=255)
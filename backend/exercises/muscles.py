@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from .models import ExerciseMuscle, Muscle
+
+# Placeholder primary_muscles value for exercises without muscle data
+UNSPECIFIED_MUSCLE = 'general'
+
+
+def split_muscles(value):
+    return [muscle.strip().lower() for muscle in (value or '').split(',') if muscle.strip()]
+
+
+def muscle_roles(exercise):
+    """[(muscle name, role)] from the comma-separated fields, primary muscles first"""
+    roles = {}
+    for role, value in [(ExerciseMuscle.PRIMARY, exercise.primary_muscles), (ExerciseMuscle.SECONDARY, exercise.secondary_muscles)]:
+        for name in split_muscles(value):
+            if name != UNSPECIFIED_MUSCLE:
+                roles.setdefault(name, role)
+    return list(roles.items())
+
+
+def sync_exercise_muscles(exercises):
+    """Rewrite the ExerciseMuscle rows of exercises whose muscle fields changed"""
+    wanted = {exercise.pk: muscle_roles(exercise) for exercise in exercises}
+    if not wanted:
+        return
+
+    names = {name for roles in wanted.values() for name, _ in roles}
+    Muscle.objects.bulk_create([Muscle(name=name) for name in names], ignore_conflicts=True)
+    muscle_ids = dict(Muscle.objects.filter(name__in=names).values_list('name', 'id'))
+
+    existing = defaultdict(list)
+    for exercise_id, muscle_id, role in ExerciseMuscle.objects.filter(exercise_id__in=wanted).values_list('exercise_id', 'muscle_id', 'role'):
+        existing[exercise_id].append((muscle_id, role))
+
+    stale = {}
+    for exercise_id, roles in wanted.items():
+        links = [(muscle_ids[name], role) for name, role in roles]
+        if existing[exercise_id] != links:
+            stale[exercise_id] = links
+    if not stale:
+        return
+
+    ExerciseMuscle.objects.filter(exercise_id__in=stale).delete()
+    ExerciseMuscle.objects.bulk_create([
+        ExerciseMuscle(exercise_id=exercise_id, muscle_id=muscle_id, role=role)
+        for exercise_id, links in stale.items()
+        for muscle_id, role in links
+    ])
@@ -0,0 +1,151 @@
+"""
+Full-text search and faceting for the exercise catalog.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers, PostgreSQL
+a GIN index over a tsvector expression. Other backends fall back to icontains.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Exercise, ExerciseMuscle
+
+FTS_TABLE = 'exercises_exercise_fts'
+PG_SEARCH_INDEX = 'exercises_exercise_search_idx'
+PG_DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+# Query parameter -> model field; every filter is also a facet
+FACET_FIELDS = ['level', 'equipment', 'category', 'force', 'mechanic']
+
+SQLITE_SEARCH_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='exercises_exercise', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON exercises_exercise BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON exercises_exercise BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON exercises_exercise BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+
+def install_search_index(using_connection=connection):
+    """Create the backend's search index if it is missing; safe to run repeatedly"""
+    with using_connection.cursor() as cursor:
+        if using_connection.vendor == 'sqlite':
+            # SQLite migrations rebuild tables by copy-and-rename, which drops
+            # triggers, so their absence also means the index may be stale.
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{FTS_TABLE}_%'],
+            )
+            if cursor.fetchone()[0] == 3:
+                return
+            for statement in SQLITE_SEARCH_SQL:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif using_connection.vendor == 'postgresql':
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {PG_SEARCH_INDEX} ON exercises_exercise USING GIN ({PG_DOCUMENT})')
+
+
+def drop_search_index(using_connection=connection):
+    with using_connection.cursor() as cursor:
+        if using_connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif using_connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {PG_SEARCH_INDEX}')
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def text_search_filter(query):
+    """Q matching exercises whose name or description contains every term as a prefix"""
+    terms = search_terms(query)
+    if not terms:
+        return Q()
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return Q(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return Q(id__in=RawSQL(
+            f"SELECT id FROM exercises_exercise WHERE {PG_DOCUMENT} @@ to_tsquery('simple', %s)", [tsquery]
+        ))
+
+    matches = Q()
+    for term in terms:
+        matches &= Q(name__icontains=term) | Q(description__icontains=term)
+    return matches
+
+
+def muscle_filter(muscles):
+    return Q(id__in=ExerciseMuscle.objects.filter(muscle__name__in=[muscle.lower() for muscle in muscles]).values('exercise_id'))
+
+
+def parse_filters(params):
+    """Comma-separated query params -> {facet: [values]}, muscle included"""
+    filters = {}
+    for facet in [*FACET_FIELDS, 'muscle']:
+        values = [value.strip() for value in params.get(facet, '').split(',') if value.strip()]
+        if values:
+            filters[facet] = values
+    return filters
+
+
+def filter_exercises(queryset, filters):
+    for facet, values in filters.items():
+        if facet == 'muscle':
+            queryset = queryset.filter(muscle_filter(values))
+        else:
+            queryset = queryset.filter(**{f'{facet}__in': values})
+    return queryset
+
+
+def order_by_relevance(queryset, query):
+    """Names starting with the query first, then alphabetical"""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.order_by('name', 'id')
+    return queryset.annotate(
+        name_prefix=Case(When(name__istartswith=terms[0], then=Value(0)), default=Value(1), output_field=IntegerField())
+    ).order_by('name_prefix', 'name', 'id')
+
+
+def search_exercises(query, filters):
+    return order_by_relevance(filter_exercises(Exercise.objects.filter(text_search_filter(query)), filters), query)
+
+
+def facet_counts(query, filters):
+    """
+    Counts per facet value for the current search. Each facet ignores its own
+    filter so the client can offer the other values of an active facet.
+    """
+    matched = Exercise.objects.filter(text_search_filter(query))
+    facets = {}
+    for facet in FACET_FIELDS:
+        others = {other: values for other, values in filters.items() if other != facet}
+        rows = filter_exercises(matched, others).order_by().values(facet).annotate(count=Count('id'))
+        facets[facet] = {row[facet]: row['count'] for row in rows if row[facet]}
+
+    others = {other: values for other, values in filters.items() if other != 'muscle'}
+    rows = (
+        ExerciseMuscle.objects.filter(exercise__in=filter_exercises(matched, others))
+        .order_by().values('muscle__name').annotate(count=Count('exercise_id', distinct=True))
+    )
+    facets['muscle'] = {row['muscle__name']: row['count'] for row in rows}
+    return {facet: dict(sorted(counts.items())) for facet, counts in facets.items()}
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.serializers import DynamicFieldsMixin
 from .models import Exercise, ExerciseImage
 
 
@@ -8,7 +9,7 @@ class ExerciseImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'image_path', 'order']
 
 
-class ExerciseSerializer(serializers.ModelSerializer):
+class ExerciseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     images = ExerciseImageSerializer(many=True, read_only=True)
     primary_muscles_list = serializers.SerializerMethodField()
     secondary_muscles_list = serializers.SerializerMethodField()
@@ -37,6 +38,8 @@ class ExerciseSerializer(serializers.ModelSerializer):
         ] 
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    # The comma-separated fields keep the catalog's casing and the 'general'
+    # placeholder, which the normalized Muscle relation drops
     def get_primary_muscles_list(self, obj):
         if obj.primary_muscles:
             return [m.strip() for m in obj.primary_muscles.split(',')]
@@ -46,3 +49,8 @@ class ExerciseSerializer(serializers.ModelSerializer):
         if obj.secondary_muscles:
             return [m.strip() for m in obj.secondary_muscles.split(',')]
         return []
+
+
+def exercise_prefetches(prefix=''):
+    """Lookups ExerciseSerializer needs, optionally under a relation like 'exercise__'"""
+    return [f'{prefix}images']
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from exercises.models import Exercise
+from exercises.muscles import sync_exercise_muscles
+
+
+@receiver(post_save, sender=Exercise)
+def sync_muscles_on_save(sender, instance, raw=False, **kwargs):
+    """Keep the Muscle relation in step with primary_muscles/secondary_muscles"""
+    if raw:
+        return
+    sync_exercise_muscles([instance])
@@ -1,3 +1,244 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from users.models import User
+
+from .models import Exercise, ExerciseImage, Muscle
+from .search import FACET_FIELDS, facet_counts
+
+
+class ImportExercisesTests(TestCase):
+    def setUp(self):
+        self.catalog = [
+            {
+                'name': f'Exercise {i}',
+                'force': 'push',
+                'level': 'beginner',
+                'mechanic': 'compound',
+                'equipment': 'barbell',
+                'primaryMuscles': ['chest', 'triceps'],
+                'secondaryMuscles': ['shoulders'],
+                'instructions': ['Lie down.', 'Press.'],
+                'category': 'strength',
+                'images': [f'Exercise_{i}/0.jpg', f'Exercise_{i}/1.jpg'],
+            }
+            for i in range(7)
+        ]
+
+    def run_import(self, catalog):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(catalog, f, indent=4)
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('import_exercises', '--path', f.name, '--batch-size', '3', stdout=out)
+        return out.getvalue(), len(ctx.captured_queries)
+
+    def test_import_is_idempotent_and_batched(self):
+        output, queries = self.run_import(self.catalog)
+
+        self.assertIn('Created: 7', output)
+        self.assertEqual(Exercise.objects.count(), 7)
+        self.assertEqual(ExerciseImage.objects.count(), 14)
+        exercise = Exercise.objects.get(name='Exercise 0')
+        self.assertEqual(exercise.primary_muscles, 'chest, triceps')
+        self.assertEqual(exercise.description, 'Lie down.\nPress.')
+        self.assertEqual(
+            list(exercise.images.values_list('image_path', flat=True)),
+            ['exercises/Exercise_0/0.jpg', 'exercises/Exercise_0/1.jpg'],
+        )
+        self.assertEqual(
+            list(exercise.muscle_links.values_list('muscle__name', 'role')),
+            [('chest', 'P'), ('triceps', 'P'), ('shoulders', 'S')],
+        )
+        # Per batch, not per exercise
+        self.assertLess(queries, 30)
+
+        output, _ = self.run_import(self.catalog)
+        self.assertIn('Unchanged: 7', output)
+
+    def test_only_changed_rows_are_rewritten(self):
+        self.run_import(self.catalog)
+        Exercise.objects.create(name='Exercise 1', description='Duplicate')
+        untouched_image_ids = set(
+            ExerciseImage.objects.filter(exercise__name='Exercise 2').values_list('id', flat=True)
+        )
+
+        self.catalog[0]['level'] = 'expert'
+        self.catalog[1]['images'] = ['Exercise_1/new.jpg']
+        self.catalog[3]['images'] = []
+        del self.catalog[4]['images']
+        output, _ = self.run_import(self.catalog)
+
+        self.assertIn('Updated: 3', output)
+        self.assertIn('Unchanged: 4', output)
+        self.assertEqual(Exercise.objects.filter(name='Exercise 1').count(), 1)
+        self.assertEqual(Exercise.objects.get(name='Exercise 0').level, 'expert')
+        self.assertEqual(
+            list(ExerciseImage.objects.filter(exercise__name='Exercise 1').values_list('image_path', flat=True)),
+            ['exercises/Exercise_1/new.jpg'],
+        )
+        self.assertEqual(
+            set(ExerciseImage.objects.filter(exercise__name='Exercise 2').values_list('id', flat=True)),
+            untouched_image_ids,
+        )
+        # An empty list clears the images, a missing key keeps them
+        self.assertFalse(ExerciseImage.objects.filter(exercise__name='Exercise 3').exists())
+        self.assertEqual(ExerciseImage.objects.filter(exercise__name='Exercise 4').count(), 2)
+
+
+class ExerciseCatalogTestCase(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create(username='coach', email='coach@example.com'))
+        for name, level, equipment, muscles in [
+            ('Barbell Bench Press', 'beginner', 'barbell', 'chest, triceps'),
+            ('Incline Dumbbell Press', 'intermediate', 'dumbbell', 'chest'),
+            ('Barbell Squat', 'beginner', 'barbell', 'quadriceps'),
+            ('Supino Máquina', 'beginner', 'machine', 'chest'),
+        ]:
+            Exercise.objects.create(
+                name=name, description='Push the weight.', level=level, equipment=equipment,
+                primary_muscles=muscles, muscle_group=muscles.split(',')[0],
+            )
+
+
+class ExerciseSearchTests(ExerciseCatalogTestCase):
+    def search(self, **params):
+        response = self.client.get('/api/exercises/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_prefix_search_ranks_name_matches_first(self):
+        data = self.search(q='bar')
+        self.assertEqual([row['name'] for row in data['results']], ['Barbell Bench Press', 'Barbell Squat'])
+        self.assertEqual([row['name'] for row in self.search(q='maquin')['results']], ['Supino Máquina'])
+
+        Exercise.objects.filter(name='Barbell Squat').update(name='Back Squat')
+        self.assertEqual(self.search(q='back')['count'], 1)
+
+    def test_filters_and_facets(self):
+        data = self.search(q='press', equipment='barbell,dumbbell', muscle='chest')
+
+        self.assertEqual(data['count'], 2)
+        # A facet ignores its own filter but applies the others
+        self.assertEqual(data['facets']['equipment'], {'barbell': 1, 'dumbbell': 1})
+        self.assertEqual(data['facets']['level'], {'beginner': 1, 'intermediate': 1})
+        self.assertEqual(data['facets']['muscle'], {'chest': 2, 'triceps': 1})
+
+    def test_facets_are_counted_in_the_database(self):
+        with CaptureQueriesContext(connection) as ctx:
+            facets = facet_counts('press', {'equipment': ['barbell']})
+        # One grouped query per facet, muscles included
+        self.assertEqual(len(ctx.captured_queries), len(FACET_FIELDS) + 1)
+        self.assertTrue(all('GROUP BY' in query['sql'] for query in ctx.captured_queries))
+        self.assertEqual(facets['equipment'], {'barbell': 1, 'dumbbell': 1})
+
+    def test_list_accepts_the_same_filters(self):
+        response = self.client.get('/api/exercises/', {'search': 'squat', 'level': 'beginner'})
+        self.assertEqual([row['name'] for row in response.data], ['Barbell Squat'])
+
+
+class MuscleRelationTests(ExerciseCatalogTestCase):
+    def test_relation_follows_muscle_fields(self):
+        exercise = Exercise.objects.get(name='Barbell Squat')
+        exercise.primary_muscles = 'quadriceps, glutes'
+        exercise.secondary_muscles = 'hamstrings, Glutes'
+        exercise.save()
+
+        self.assertEqual(
+            list(exercise.muscle_links.values_list('muscle__name', 'role')),
+            [('quadriceps', 'P'), ('glutes', 'P'), ('hamstrings', 'S')],
+        )
+        self.assertEqual(Muscle.objects.get(name='glutes').exercises.get(), exercise)
+
+    def test_serializer_keeps_the_string_format(self):
+        Exercise.objects.filter(name='Barbell Squat').update(
+            primary_muscles='general', secondary_muscles='Glutes, Hamstrings'
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/exercises/')
+        # exercises, images
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        rows = {row['name']: row for row in response.data}
+        self.assertEqual(rows['Barbell Bench Press']['primary_muscles_list'], ['chest', 'triceps'])
+        self.assertEqual(rows['Barbell Bench Press']['secondary_muscles_list'], [])
+        self.assertEqual(rows['Barbell Squat']['primary_muscles_list'], ['general'])
+        self.assertEqual(rows['Barbell Squat']['secondary_muscles_list'], ['Glutes', 'Hamstrings'])
+
+    def test_fixtures_load_without_syncing(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump([{
+                'model': 'exercises.exercise',
+                'pk': 1000,
+                'fields': {
+                    'name': 'Deadlift', 'description': '', 'muscle_group': 'back', 'primary_muscles': 'lats',
+                    'created_at': '2025-01-01T00:00:00Z', 'updated_at': '2025-01-01T00:00:00Z',
+                },
+            }], f)
+        self.addCleanup(os.remove, f.name)
+        call_command('loaddata', f.name, verbosity=0)
+
+        self.assertTrue(Exercise.objects.filter(pk=1000).exists())
+        self.assertFalse(Muscle.objects.filter(name='lats').exists())
+
+
+class CatalogSnapshotTests(ExerciseCatalogTestCase):
+    url = '/api/exercises/catalog/'
+
+    def test_snapshot_is_gzipped_and_versioned(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(response['ETag'], f'"{data["version"]}-gzip"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        plain = self.client.get(self.url)
+        self.assertEqual(json.loads(plain.content), data)
+        self.assertEqual(plain['ETag'], f'"{data["version"]}"')
+
+    def test_refused_gzip_gets_the_identity_body(self):
+        for header in ('gzip;q=0, identity', 'deflate, *;q=0', 'br, gzip; q=0.0'):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+            self.assertFalse(response.has_header('Content-Encoding'), header)
+            self.assertEqual(json.loads(response.content)['count'], 4)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='br, gzip;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_etags_do_not_match_across_encodings(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_unchanged_catalog_returns_304_without_rebuilding(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Only the two version aggregates
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_changes_produce_a_new_version(self):
+        etag = self.client.get(self.url)['ETag']
+        exercise = Exercise.objects.get(name='Barbell Squat')
+        ExerciseImage.objects.create(exercise=exercise, image_path='exercises/squat.jpg')
 
-# Create your tests here.
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        squat = next(row for row in json.loads(response.content)['exercises'] if row['name'] == 'Barbell Squat')
+        self.assertEqual(squat['images'][0]['image_path'], 'exercises/squat.jpg')
@@ -1,10 +1,73 @@
+import gzip
+
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from core.middleware import accepts_gzip
 from .models import Exercise
-from .serializers import ExerciseSerializer
+from .serializers import ExerciseSerializer, exercise_prefetches
+from .catalog import catalog_version, get_snapshot
+from .search import facet_counts, filter_exercises, parse_filters, search_exercises, text_search_filter
 from rest_framework import permissions
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+
+class ExerciseSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 class ExerciseViewSet(viewsets.ModelViewSet):
     queryset = Exercise.objects.all()
     serializer_class = ExerciseSerializer
-    permission_classes = [permissions.IsAuthenticated]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = self.get_serializer().query_plan(Exercise.objects.all())
+        if self.action == 'list':
+            # Same filters as search(), for clients that still want the plain array
+            params = self.request.query_params
+            queryset = filter_exercises(queryset.filter(text_search_filter(params.get('search'))), parse_filters(params))
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text prefix search over name and description with facet counts.
+        ?q=bench press&level=beginner,intermediate&equipment=barbell&muscle=chest
+        """
+        query = request.query_params.get('q', '')
+        filters = parse_filters(request.query_params)
+
+        paginator = ExerciseSearchPagination()
+        page = paginator.paginate_queryset(
+            search_exercises(query, filters).prefetch_related(*exercise_prefetches()), request, view=self
+        )
+        response = paginator.get_paginated_response(ExerciseSerializer(page, many=True).data)
+        response.data['facets'] = facet_counts(query, filters)
+        return response
+
+    @action(detail=False, methods=['get'])
+    def catalog(self, request):
+        """
+        The whole catalog as one precompressed JSON document with a strong ETag.
+        Clients send If-None-Match and get a 304 while nothing has changed.
+        """
+        version = catalog_version()
+        compressed = accepts_gzip(request)
+        # The two encodings are different representations and need their own tag
+        etag = f'"{version}-gzip"' if compressed else f'"{version}"'
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = HttpResponse(status=304)
+        else:
+            snapshot = get_snapshot(version)
+            if compressed:
+                response = HttpResponse(snapshot, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(gzip.decompress(snapshot), content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
@@ -1,10 +1,17 @@
 from django.shortcuts import render
+from django.db.models import Q
 from rest_framework import viewsets
 from .models import Feedback
 from .serializers import FeedbackSerializer
 from rest_framework import permissions 
+from core.pagination import TimeOrderedCursorPagination
 
 class FeedbackViewSet(viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
-    permission_classes = [permissions.IsAuthenticated]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+
+    def get_queryset(self):
+        # Students see what they wrote, teachers also see what they received
+        return Feedback.objects.filter(Q(user=self.request.user) | Q(receiver__user=self.request.user))
@@ -0,0 +1,134 @@
+"""
+Deferred, batched updates of StudentEvaluation checklist flags.
+
+Receivers only queue (flag, student) pairs. Everything queued inside a
+transaction is written once, after commit, by a single UPDATE over every
+active TeacherStudents relationship of the affected students that still has
+the flag's data, so pairs queued by a rolled-back savepoint are dropped.
+Relationships without an evaluation row get one first.
+"""
+
+import operator
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from analytics.models import BodyMeasurement, ProgressPhoto
+from diet.models import DietPlan
+from feedback.models import Feedback
+from teachers.models import TeacherStudents, StudentEvaluation
+from training.models import Training
+
+# StudentEvaluation flag -> timestamp field stamped alongside it
+EVALUATION_FLAGS = {
+    'has_initial_photos': 'initial_photos_date',
+    'has_diet_plan': 'diet_plan_date',
+    'has_training_plan': 'training_plan_date',
+    'has_progress_log': 'progress_log_date',
+    'has_body_measurements': 'body_measurements_date',
+}
+
+_state = threading.local()
+
+
+def evaluation_sources(prefix=''):
+    """
+    StudentEvaluation flag -> EXISTS subquery telling whether the student has
+    that data, relative to TeacherStudents reached through prefix
+    """
+    user_id = OuterRef(f'{prefix}student__user_id')
+    return {
+        'has_diet_plan': Exists(DietPlan.objects.filter(student_id=user_id)),
+        'has_training_plan': Exists(Training.objects.filter(student_id=OuterRef(f'{prefix}student_id'))),
+        'has_progress_log': Exists(Feedback.objects.filter(user_id=user_id)),
+        'has_initial_photos': Exists(ProgressPhoto.objects.filter(user_id=user_id)),
+        'has_body_measurements': Exists(BodyMeasurement.objects.filter(user_id=user_id)),
+    }
+
+
+class EvaluationBatch:
+    def __init__(self):
+        # flag -> ids; students are referenced either by Student or by User id
+        self.student_ids = defaultdict(set)
+        self.user_ids = defaultdict(set)
+
+    def add(self, flag, student_ids=(), user_ids=()):
+        self.student_ids[flag].update(student_ids)
+        self.user_ids[flag].update(user_ids)
+
+    def relationships(self, flag):
+        return TeacherStudents.objects.filter(is_active=True).filter(
+            Q(student_id__in=self.student_ids[flag]) | Q(student__user_id__in=self.user_ids[flag]),
+            # Pairs may come from a savepoint that was rolled back since
+            evaluation_sources()[flag],
+        ).values('pk')
+
+    def flush(self):
+        flags = set(self.student_ids) | set(self.user_ids)
+        if not flags:
+            return 0
+
+        # Relationships created while updates were suspended, or before
+        # evaluations existed, have no row to update yet
+        missing = TeacherStudents.objects.filter(evaluation__isnull=True).filter(
+            reduce(operator.or_, [Q(pk__in=self.relationships(flag)) for flag in flags])
+        ).values_list('pk', flat=True)
+        StudentEvaluation.objects.bulk_create(
+            [StudentEvaluation(teacher_student_id=pk) for pk in missing], ignore_conflicts=True
+        )
+
+        now = timezone.now()
+        updates = {'updated_at': now}
+        affected = Q()
+        for flag in flags:
+            matched = Q(teacher_student__in=self.relationships(flag))
+            affected |= matched
+            updates[flag] = Case(When(matched, then=Value(True)), default=F(flag))
+            date_field = EVALUATION_FLAGS[flag]
+            updates[date_field] = Case(When(matched, then=Value(now)), default=F(date_field))
+
+        count = StudentEvaluation.objects.filter(affected).update(**updates)
+        self.student_ids.clear()
+        self.user_ids.clear()
+        return count
+
+    __call__ = flush
+
+
+def _pending_batch():
+    batch = getattr(_state, 'batch', None)
+    if batch is None:
+        batch = _state.batch = EvaluationBatch()
+    return batch
+
+
+def queue_evaluation_update(flag, student_ids=(), user_ids=()):
+    """
+    Mark ``flag`` on the evaluations of the given students once the current
+    transaction commits. Outside a transaction the update runs immediately.
+    Every call registers the batch's flush; the first to run writes all
+    queued pairs and the rest find the batch empty.
+    """
+    if getattr(_state, 'suspended', 0):
+        return
+    batch = _pending_batch()
+    batch.add(flag, student_ids, user_ids)
+    transaction.on_commit(batch, robust=True)
+
+
+@contextmanager
+def evaluation_updates_suspended():
+    """
+    Skip evaluation bookkeeping for bulk loaders and seeding; run
+    ``manage.py backfill_evaluations`` afterwards to catch up.
+    """
+    _state.suspended = getattr(_state, 'suspended', 0) + 1
+    try:
+        yield
+    finally:
+        _state.suspended -= 1
@@ -1,65 +1,92 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 from teachers.models import TeacherStudents, StudentEvaluation
-from diet.models import DietPlan
-from training.models import Training
-from analytics.models import ProgressPhoto, BodyMeasurement
+from teachers.evaluations import EVALUATION_FLAGS, evaluation_sources
 
 
 class Command(BaseCommand):
     help = 'Backfill StudentEvaluation records based on existing data'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Run the backfill and report its counts, then roll everything back',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk_create/bulk_update batch',
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write('Starting backfill of StudentEvaluation records...\n')
-        
-        # Get all TeacherStudents relationships
-        teacher_students = TeacherStudents.objects.all()
-        created_count = 0
-        updated_count = 0
-        
-        for ts in teacher_students:
-            self.stdout.write(f'\nProcessing: {ts.student.user.username}')
-            
-            # Create or get StudentEvaluation
-            evaluation, created = StudentEvaluation.objects.get_or_create(
-                teacher_student=ts
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+        self.stdout.write('Starting backfill of StudentEvaluation records...')
+
+        # A dry run does the real work, so its counts match a real run, and
+        # then rolls it back
+        with transaction.atomic():
+            created_count = self.create_missing(batch_size)
+            updated_count, flag_counts = self.update_flags(batch_size)
+            if dry_run:
+                transaction.set_rollback(True)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(f'\n{prefix}Backfill complete!'))
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Created: {created_count} records'))
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Updated: {updated_count} records'))
+        for flag, count in flag_counts.items():
+            self.stdout.write(f'  {flag}: {count}')
+
+    def create_missing(self, batch_size):
+        missing = TeacherStudents.objects.filter(evaluation__isnull=True).values_list('pk', flat=True)
+        # Materialize first: the loop inserts into the table the query joins
+        missing_ids = list(missing)
+        for start in range(0, len(missing_ids), batch_size):
+            StudentEvaluation.objects.bulk_create(
+                [StudentEvaluation(teacher_student_id=pk) for pk in missing_ids[start:start + batch_size]],
+                ignore_conflicts=True,
             )
-            
-            if created:
-                created_count += 1
-                self.stdout.write(self.style.SUCCESS(f'  Created StudentEvaluation'))
-            
-            # Check for diet plans
-            has_diet = DietPlan.objects.filter(student=ts.student.user).exists()
-            if has_diet and not evaluation.has_diet_plan:
-                evaluation.has_diet_plan = True
-                evaluation.diet_plan_date = timezone.now()
-                self.stdout.write(f'  ✓ Found diet plan')
-            
-            # Check for trainings
-            has_training = Training.objects.filter(student=ts.student).exists()
-            if has_training and not evaluation.has_training_plan:
-                evaluation.has_training_plan = True
-                evaluation.training_plan_date = timezone.now()
-                self.stdout.write(f'  ✓ Found training plan')
-            
-            # Check for photos
-            has_photos = ProgressPhoto.objects.filter(user=ts.student.user).exists()
-            if has_photos and not evaluation.has_initial_photos:
-                evaluation.has_initial_photos = True
-                evaluation.initial_photos_date = timezone.now()
-                self.stdout.write(f'  ✓ Found photos')
-            
-            # Check for measurements
-            has_measurements = BodyMeasurement.objects.filter(user=ts.student.user).exists()
-            if has_measurements and not evaluation.has_body_measurements:
-                evaluation.has_body_measurements = True
-                evaluation.body_measurements_date = timezone.now()
-                self.stdout.write(f'  ✓ Found measurements')
-            
-            evaluation.save()
-            updated_count += 1
-        
-        self.stdout.write(self.style.SUCCESS(f'\n\nBackfill complete!'))
-        self.stdout.write(self.style.SUCCESS(f'Created: {created_count} records'))
-        self.stdout.write(self.style.SUCCESS(f'Updated: {updated_count} records'))
+            self.stdout.write(f'Created {min(start + batch_size, len(missing_ids))}/{len(missing_ids)} evaluations')
+        return len(missing_ids)
+
+    def update_flags(self, batch_size):
+        sources = evaluation_sources('teacher_student__')
+        found = {f'found_{flag}': exists for flag, exists in sources.items()}
+        needs_update = Q()
+        for flag in sources:
+            needs_update |= Q(**{f'found_{flag}': True, flag: False})
+
+        candidates = StudentEvaluation.objects.annotate(**found).filter(needs_update).order_by('pk')
+        total = candidates.count()
+        self.stdout.write(f'{total} evaluations need updating')
+
+        now = timezone.now()
+        flag_counts = dict.fromkeys(sources, 0)
+        processed = 0
+        last_pk = 0
+        while True:
+            # Keyset batches instead of one long cursor over a table being written to
+            batch = list(candidates.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            changed_fields = {'updated_at'}
+            for evaluation in batch:
+                for flag in sources:
+                    if getattr(evaluation, f'found_{flag}') and not getattr(evaluation, flag):
+                        setattr(evaluation, flag, True)
+                        setattr(evaluation, EVALUATION_FLAGS[flag], now)
+                        changed_fields.update([flag, EVALUATION_FLAGS[flag]])
+                        flag_counts[flag] += 1
+                evaluation.updated_at = now
+
+            StudentEvaluation.objects.bulk_update(batch, changed_fields)
+            processed += len(batch)
+            self.stdout.write(f'Processed {processed}/{total} evaluations')
+        return processed, flag_counts
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import ExpressionWrapper, FloatField, IntegerField, Value
+from django.db.models.functions import Cast, Coalesce
 from django.core.exceptions import ValidationError
 from datetime import datetime
 import holidays
@@ -100,11 +102,36 @@ class Appointment(models.Model):
     def __str__(self):
         return f"{self.teacher.user.username} - {self.student.user.username} - {self.date} {self.start_time}"
     
+class TeacherStudentsQuerySet(models.QuerySet):
+    def coached_by(self, user):
+        return self.filter(teacher__user=user, is_active=True)
+
+    def with_evaluation(self):
+        """Annotate evaluation progress in SQL so lists can filter on it"""
+        completed_items = sum(
+            Coalesce(Cast(f'evaluation__{field}', IntegerField()), Value(0))
+            for field in StudentEvaluation.CHECKLIST_FIELDS
+        )
+        return self.select_related('student__user', 'evaluation').annotate(
+            evaluation_completed_items=completed_items,
+            completion_percentage=ExpressionWrapper(
+                completed_items * 100.0 / len(StudentEvaluation.CHECKLIST_FIELDS), output_field=FloatField()
+            ),
+        )
+
+    def evaluated(self):
+        return self.with_evaluation().filter(evaluation_completed_items=len(StudentEvaluation.CHECKLIST_FIELDS))
+
+    def pending_evaluation(self):
+        return self.with_evaluation().filter(evaluation_completed_items__lt=len(StudentEvaluation.CHECKLIST_FIELDS))
+
 class TeacherStudents(models.Model):
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='students')
     student = models.ForeignKey('student.Student', on_delete=models.CASCADE, related_name='teachers')
     assigned_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+
+    objects = TeacherStudentsQuerySet.as_manager()
     
     class Meta:
         unique_together = ('teacher', 'student')
@@ -144,6 +171,14 @@ class TeacherStudents(models.Model):
             }
         
 class StudentEvaluation(models.Model):
+    CHECKLIST_FIELDS = [
+        'has_initial_photos',
+        'has_diet_plan',
+        'has_training_plan',
+        'has_progress_log',
+        'has_body_measurements',
+    ]
+
     teacher_student = models.OneToOneField(
         TeacherStudents, 
         on_delete=models.CASCADE, 
@@ -171,23 +206,11 @@ class StudentEvaluation(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def is_complete(self):
-        return all([
-            self.has_initial_photos,
-            self.has_diet_plan,
-            self.has_training_plan,
-            self.has_progress_log,
-            self.has_body_measurements
-        ])
+        return all(getattr(self, field) for field in self.CHECKLIST_FIELDS)
     
     def completion_percentage(self):
-        total_items = 5
-        completed_items = sum([
-            self.has_initial_photos,
-            self.has_diet_plan,
-            self.has_training_plan,
-            self.has_progress_log,
-            self.has_body_measurements
-        ])
+        total_items = len(self.CHECKLIST_FIELDS)
+        completed_items = sum(getattr(self, field) for field in self.CHECKLIST_FIELDS)
         return (completed_items / total_items) * 100
     
     def __str__(self):
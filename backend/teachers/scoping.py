@@ -0,0 +1,26 @@
+from django.db.models import Q
+from rest_framework import serializers
+from teachers.models import TeacherStudents
+
+
+def scoped_to_user(queryset, user, user_field='user'):
+    """Limit queryset to rows owned by user or, for teachers, by the students they coach"""
+    visible = Q(**{user_field: user.pk})
+    if user.is_teacher:
+        coached_users = TeacherStudents.objects.coached_by(user).values('student__user_id')
+        visible |= Q(**{f'{user_field}__in': coached_users})
+    return queryset.filter(visible)
+
+
+class ScopedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Writable relation accepting only rows scoped_to_user lets the requesting user see"""
+    def __init__(self, user_field='user', **kwargs):
+        self.user_field = user_field
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        if request is None:
+            return queryset.none()
+        return scoped_to_user(queryset, request.user, self.user_field)
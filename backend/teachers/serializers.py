@@ -1,6 +1,6 @@
 from student.serializers import StudentSerializer
 from rest_framework import serializers
-from .models import Appointment, Teacher, TeacherStudents
+from .models import Appointment, Teacher, TeacherStudents, StudentEvaluation
 from users.models import User
 
 class TeacherSerializer(serializers.ModelSerializer):
@@ -131,6 +131,9 @@ class TeacherStudentsSerializer(serializers.ModelSerializer):
         return f"{obj.student.user.first_name} {obj.student.user.last_name}"
     
     def get_is_evaluated(self, obj):
+        # Querysets from TeacherStudents.objects.with_evaluation() carry the answer
+        if hasattr(obj, 'evaluation_completed_items'):
+            return obj.evaluation_completed_items == len(StudentEvaluation.CHECKLIST_FIELDS)
         return obj.is_fully_evaluated()
     
     def get_evaluation_status(self, obj):
@@ -1,7 +1,16 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.utils import timezone
-from teachers.models import TeacherStudents, StudentEvaluation
+from teachers.models import Teacher, TeacherStudents, StudentEvaluation
+from teachers.evaluations import queue_evaluation_update
+from core.caching import invalidate_on_change
+from users.models import User
+
+invalidate_on_change('teachers', Teacher, object_ids=lambda teacher: [teacher.pk])
+invalidate_on_change(
+    'teachers', User,
+    object_ids=lambda user: Teacher.objects.filter(user_id=user.pk).values_list('pk', flat=True),
+    ignore_fields=['last_login'],
+)
 
 
 @receiver(post_save, sender=TeacherStudents)
@@ -15,120 +24,33 @@ def create_student_evaluation(sender, instance, created, **kwargs):
 def update_evaluation_on_diet_created(sender, instance, created, **kwargs):
     """Mark has_diet_plan as True when a diet is created"""
     if created:
-        try:
-            from student.models import Student
-            # DietPlan.student is a User, not Student model
-            student = Student.objects.filter(user=instance.student).first()
-            
-            if student:
-                # Find TeacherStudents relationship
-                teacher_student = TeacherStudents.objects.filter(
-                    student=student,
-                    is_active=True
-                ).first()
-                
-                if teacher_student:
-                    evaluation, _ = StudentEvaluation.objects.get_or_create(
-                        teacher_student=teacher_student
-                    )
-                    evaluation.has_diet_plan = True
-                    evaluation.diet_plan_date = timezone.now()
-                    evaluation.save()
-        except Exception as e:
-            print(f"Error updating diet evaluation: {e}")
+        # DietPlan.student is a User, not Student model
+        queue_evaluation_update('has_diet_plan', user_ids=[instance.student_id])
 
 
 @receiver(post_save, sender='training.Training')
 def update_evaluation_on_training_created(sender, instance, created, **kwargs):
     """Mark has_training_plan as True when a training is created"""
     if created:
-        try:
-            # Find TeacherStudents relationship
-            teacher_student = TeacherStudents.objects.filter(
-                student=instance.student,
-                is_active=True
-            ).first()
-            
-            if teacher_student:
-                evaluation, _ = StudentEvaluation.objects.get_or_create(
-                    teacher_student=teacher_student
-                )
-                evaluation.has_training_plan = True
-                evaluation.training_plan_date = timezone.now()
-                evaluation.save()
-        except Exception as e:
-            print(f"Error updating training evaluation: {e}")
+        queue_evaluation_update('has_training_plan', student_ids=[instance.student_id])
 
 
 @receiver(post_save, sender='feedback.Feedback')
 def update_evaluation_on_feedback_created(sender, instance, created, **kwargs):
     """Mark has_progress_log as True when feedback is created"""
     if created:
-        try:
-            # Find TeacherStudents relationship  
-            teacher_student = TeacherStudents.objects.filter(
-                student=instance.student,
-                is_active=True
-            ).first()
-            
-            if teacher_student:
-                evaluation, _ = StudentEvaluation.objects.get_or_create(
-                    teacher_student=teacher_student
-                )
-                evaluation.has_progress_log = True
-                evaluation.progress_log_date = timezone.now()
-                evaluation.save()
-        except Exception as e:
-            print(f"Error updating feedback evaluation: {e}")
+        queue_evaluation_update('has_progress_log', user_ids=[instance.user_id])
 
 
 @receiver(post_save, sender='analytics.ProgressPhoto')
 def update_evaluation_on_photo_uploaded(sender, instance, created, **kwargs):
     """Mark has_initial_photos as True when photos are uploaded"""
     if created:
-        try:
-            from student.models import Student
-            # Get student from user
-            student = Student.objects.filter(user=instance.user).first()
-            
-            if student:
-                teacher_student = TeacherStudents.objects.filter(
-                    student=student,
-                    is_active=True
-                ).first()
-                
-                if teacher_student:
-                    evaluation, _ = StudentEvaluation.objects.get_or_create(
-                        teacher_student=teacher_student
-                    )
-                    evaluation.has_initial_photos = True
-                    evaluation.initial_photos_date = timezone.now()
-                    evaluation.save()
-        except Exception as e:
-            print(f"Error updating photo evaluation: {e}")
+        queue_evaluation_update('has_initial_photos', user_ids=[instance.user_id])
 
 
 @receiver(post_save, sender='analytics.BodyMeasurement')
 def update_evaluation_on_measurement_created(sender, instance, created, **kwargs):
     """Mark has_body_measurements as True when measurements are created"""
     if created:
-        try:
-            from student.models import Student
-            # Get student from user
-            student = Student.objects.filter(user=instance.user).first()
-            
-            if student:
-                teacher_student = TeacherStudents.objects.filter(
-                    student=student,
-                    is_active=True
-                ).first()
-                
-                if teacher_student:
-                    evaluation, _ = StudentEvaluation.objects.get_or_create(
-                        teacher_student=teacher_student
-                    )
-                    evaluation.has_body_measurements = True
-                    evaluation.body_measurements_date = timezone.now()
-                    evaluation.save()
-        except Exception as e:
-            print(f"Error updating measurement evaluation: {e}")
+        queue_evaluation_update('has_body_measurements', user_ids=[instance.user_id])
@@ -1,3 +1,180 @@
-from django.test import TestCase
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from analytics.models import BodyMeasurement
+from diet.models import DietPlan
+from student.models import Student
+from training.models import Training
+from users.models import User
+from .evaluations import EvaluationBatch, evaluation_updates_suspended
+from .models import Teacher, TeacherStudents, StudentEvaluation
+
+
+class EvaluationTestCase(APITestCase):
+    def setUp(self):
+        self.teacher_user = User.objects.create(username='coach', email='coach@example.com', is_teacher=True)
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        self.students = []
+        for i in range(3):
+            user = User.objects.create(username=f'student{i}', email=f'student{i}@example.com', is_student=True)
+            student = Student.objects.create(user=user)
+            TeacherStudents.objects.create(teacher=self.teacher, student=student)
+            self.students.append(student)
+
+    def evaluation(self, student):
+        return StudentEvaluation.objects.get(teacher_student__student=student)
+
+    def create_diet(self, student):
+        return DietPlan.objects.create(
+            student=student.user, teacher=self.teacher_user, name='Plano', goal='CUT',
+            start_date=date(2025, 1, 1), end_date=date(2025, 2, 1),
+        )
+
+    def create_training(self, student):
+        return Training.objects.create(student=student, teacher=self.teacher, goal='HYP', name='Treino A')
+
+
+class EvaluationPipelineTests(EvaluationTestCase):
+    def test_flags_are_flushed_once_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            for student in self.students:
+                self.create_diet(student)
+                self.create_training(student)
+                BodyMeasurement.objects.create(user=student.user, date=date(2025, 1, 1))
+
+        self.assertFalse(self.evaluation(self.students[0]).has_diet_plan)
+        batches = [callback for callback in callbacks if isinstance(callback, EvaluationBatch)]
+        with CaptureQueriesContext(connection) as ctx:
+            for batch in batches:
+                batch()
+        # The first flush looks for missing evaluation rows and writes
+        # everything, the rest find the batch empty
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        for student in self.students:
+            evaluation = self.evaluation(student)
+            self.assertTrue(evaluation.has_diet_plan)
+            self.assertTrue(evaluation.has_training_plan)
+            self.assertTrue(evaluation.has_body_measurements)
+            self.assertFalse(evaluation.has_initial_photos)
+            self.assertIsNotNone(evaluation.diet_plan_date)
+
+    def test_rolled_back_savepoints_are_not_flagged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            # Queued before the savepoint, so the batch outlives its rollback
+            self.create_training(self.students[0])
+            try:
+                with transaction.atomic():
+                    self.create_diet(self.students[0])
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+
+        evaluation = self.evaluation(self.students[0])
+        self.assertFalse(evaluation.has_diet_plan)
+        self.assertIsNone(evaluation.diet_plan_date)
+        self.assertTrue(evaluation.has_training_plan)
+
+    def test_missing_evaluation_rows_are_created(self):
+        StudentEvaluation.objects.filter(teacher_student__student=self.students[0]).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_diet(self.students[0])
+
+        evaluation = self.evaluation(self.students[0])
+        self.assertTrue(evaluation.has_diet_plan)
+        self.assertIsNotNone(evaluation.diet_plan_date)
+
+    def test_only_affected_students_are_flagged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_diet(self.students[0])
+
+        self.assertTrue(self.evaluation(self.students[0]).has_diet_plan)
+        self.assertFalse(self.evaluation(self.students[1]).has_diet_plan)
+        self.assertIsNone(self.evaluation(self.students[1]).diet_plan_date)
+
+    def test_updates_can_be_suspended(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with evaluation_updates_suspended():
+                self.create_diet(self.students[0])
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(self.evaluation(self.students[0]).has_diet_plan)
+
+
+class EvaluationFilteringTests(EvaluationTestCase):
+    def setUp(self):
+        super().setUp()
+        StudentEvaluation.objects.filter(teacher_student__student=self.students[0]).update(
+            **{field: True for field in StudentEvaluation.CHECKLIST_FIELDS}
+        )
+        StudentEvaluation.objects.filter(teacher_student__student=self.students[1]).update(has_diet_plan=True)
+        # A relationship without an evaluation row counts as pending
+        StudentEvaluation.objects.filter(teacher_student__student=self.students[2]).delete()
+        self.client.force_authenticate(self.teacher_user)
+
+    def test_annotation_matches_model_methods(self):
+        for relationship in TeacherStudents.objects.with_evaluation():
+            self.assertEqual(
+                relationship.evaluation_completed_items == len(StudentEvaluation.CHECKLIST_FIELDS),
+                relationship.is_fully_evaluated(),
+            )
+            self.assertEqual(
+                relationship.completion_percentage,
+                relationship.get_evaluation_status()['completion_percentage'],
+            )
+
+    def test_evaluated_and_pending_lists(self):
+        url = '/api/trainer/teacher-students/'
+        with CaptureQueriesContext(connection) as ctx:
+            evaluated = self.client.get(f'{url}get_evaluated_students/').data
+        # teacher lookup, count and page
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+        pending = self.client.get(f'{url}get_pending_evaluation_students/').data
+
+        self.assertEqual([row['student_id'] for row in evaluated['results']], [self.students[0].pk])
+        self.assertTrue(evaluated['results'][0]['is_evaluated'])
+        self.assertEqual(pending['count'], 2)
+        self.assertEqual(pending['results'][0]['evaluation_status']['completion_percentage'], 20)
+        self.assertFalse(pending['results'][1]['is_evaluated'])
+
+
+class BackfillEvaluationsTests(EvaluationTestCase):
+    def setUp(self):
+        super().setUp()
+        with evaluation_updates_suspended():
+            for student in self.students:
+                self.create_diet(student)
+            self.create_training(self.students[0])
+        StudentEvaluation.objects.filter(teacher_student__student=self.students[2]).delete()
+
+    def test_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command('backfill_evaluations', '--dry-run', stdout=out)
+
+        self.assertIn('[dry run] Created: 1 records', out.getvalue())
+        # The evaluation it would create is updated too
+        self.assertIn('[dry run] Updated: 3 records', out.getvalue())
+        self.assertEqual(StudentEvaluation.objects.count(), 2)
+        self.assertFalse(StudentEvaluation.objects.filter(has_diet_plan=True).exists())
+
+        out = StringIO()
+        call_command('backfill_evaluations', stdout=out)
+        self.assertIn('Updated: 3 records', out.getvalue())
+
+    def test_backfill_sets_flags_in_batches(self):
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('backfill_evaluations', '--batch-size', '2', stdout=StringIO())
+        queries = len(ctx.captured_queries)
+
+        self.assertEqual(StudentEvaluation.objects.filter(has_diet_plan=True).count(), 3)
+        self.assertTrue(self.evaluation(self.students[0]).has_training_plan)
+        self.assertFalse(self.evaluation(self.students[1]).has_training_plan)
+        self.assertIsNotNone(self.evaluation(self.students[2]).diet_plan_date)
+        # Per batch, not per relationship
+        self.assertLess(queries, 15)
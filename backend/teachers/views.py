@@ -6,6 +6,13 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Teacher, TeacherStudents
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.pagination import PageNumberPagination
+from core.caching import cache_response
+
+class TeacherStudentPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
 
 class TeacherViewSet(viewsets.ModelViewSet):
     queryset = Teacher.objects.all()
@@ -18,12 +25,20 @@ class TeacherViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
     
     def get_queryset(self):
-        queryset = Teacher.objects.all()
+        queryset = Teacher.objects.select_related('user')
         user_id = self.request.query_params.get('user')
         if user_id:
             queryset = queryset.filter(user_id=user_id)
         return queryset
 
+    @cache_response('teachers', shared=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('teachers', per_object=True, shared=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -76,22 +91,20 @@ class TeacherStudentView(viewsets.ModelViewSet):
         serializer = TeacherStudentsSerializer(students, many=True)
         return Response(serializer.data)
     
+    def get_paginated_students(self, request, students):
+        paginator = TeacherStudentPagination()
+        page = paginator.paginate_queryset(students.order_by('assigned_at', 'id'), request, view=self)
+        serializer = TeacherStudentsSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def get_evaluated_students(self, request, *args, **kwargs):
         teacher = self.get_teacher(request)
-        students = TeacherStudents.objects.filter(teacher=teacher, is_active=True)
-        
-        evaluated = [s for s in students if s.is_fully_evaluated()]
-        
-        serializer = TeacherStudentsSerializer(evaluated, many=True)
-        return Response(serializer.data)
+        students = TeacherStudents.objects.filter(teacher=teacher, is_active=True).evaluated()
+        return self.get_paginated_students(request, students)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def get_pending_evaluation_students(self, request, *args, **kwargs):
         teacher = self.get_teacher(request)
-        students = TeacherStudents.objects.filter(teacher=teacher, is_active=True)
-        
-        pending = [s for s in students if not s.is_fully_evaluated()]
-        
-        serializer = TeacherStudentsSerializer(pending, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        students = TeacherStudents.objects.filter(teacher=teacher, is_active=True).pending_evaluation()
+        return self.get_paginated_students(request, students)
@@ -0,0 +1,108 @@
+"""
+Load test concurrent SetLog writes against the configured database.
+Usage: python manage.py load_test_set_logs --threads 8 --sets 50
+
+Every thread plays a live workout session logging sets for the same user and
+exercise, so the personal-record bookkeeping contends on the same rows. Run it
+once with the SQLite defaults and once with DB_ENGINE=postgres to compare.
+The fixtures are deleted afterwards.
+"""
+
+import threading
+import time
+import uuid
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from exercises.models import Exercise
+from student.models import Student
+from teachers.models import Teacher
+from tracking.models import ExerciseLog, SetLog, WorkoutSession
+from training.models import Training, Workout
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Load test concurrent SetLog writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers')
+        parser.add_argument('--sets', type=int, default=50, help='Sets logged per writer')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        sets = options['sets']
+        self.stdout.write(
+            f"{connection.vendor}: {threads} writers x {sets} sets "
+            f"(CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']})"
+        )
+
+        suffix = uuid.uuid4().hex[:8]
+        users, exercise, exercise_logs = self.populate(suffix, threads)
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def writer(exercise_log):
+            try:
+                for set_number in range(1, sets + 1):
+                    start = time.perf_counter()
+                    try:
+                        SetLog.objects.create(
+                            exercise_log=exercise_log,
+                            set_number=set_number,
+                            repetitions=8 + set_number % 5,
+                            weight=60 + set_number,
+                        )
+                    except Exception as exc:
+                        with lock:
+                            errors.append(exc)
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=writer, args=(exercise_log,)) for exercise_log in exercise_logs]
+        start = time.perf_counter()
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            written = SetLog.objects.filter(exercise_log__in=exercise_logs).count()
+        finally:
+            for user in users:
+                user.delete()
+            exercise.delete()
+
+        latencies.sort()
+        self.stdout.write(f'Written: {written}/{threads * sets} in {elapsed:.2f}s ({written / elapsed:.0f} writes/s)')
+        if latencies:
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+            self.stdout.write(f'Latency: median {latencies[len(latencies) // 2] * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms')
+
+        if errors:
+            for message in sorted({str(exc) for exc in errors}):
+                self.stdout.write(self.style.ERROR(message))
+            raise CommandError(f'{len(errors)} writes failed')
+        self.stdout.write(self.style.SUCCESS('All writes succeeded'))
+
+    @transaction.atomic
+    def populate(self, suffix, threads):
+        teacher_user = User.objects.create(username=f'load_teacher_{suffix}', email=f'load_teacher_{suffix}@example.com', is_teacher=True)
+        student_user = User.objects.create(username=f'load_student_{suffix}', email=f'load_student_{suffix}@example.com', is_student=True)
+        teacher = Teacher.objects.create(user=teacher_user)
+        student = Student.objects.create(user=student_user)
+        exercise = Exercise.objects.create(name=f'Load Test Exercise {suffix}', description='', muscle_group='chest')
+
+        training = Training.objects.create(student=student, teacher=teacher, goal='HYP', name='Load Test', description='')
+        workout = Workout.objects.create(training_plan=training, name='Dia 1', day_of_week='1')
+        exercise_logs = []
+        for _ in range(threads):
+            session = WorkoutSession.objects.create(user=student_user, workout=workout, date=date.today(), status='INP')
+            exercise_logs.append(ExerciseLog.objects.create(session=session, exercise=exercise, order=1))
+        return [student_user, teacher_user], exercise, exercise_logs
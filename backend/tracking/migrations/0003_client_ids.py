@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0002_rename_create_at_exerciselog_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exerciselog',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, help_text='Client-generated id used to deduplicate batch syncs', null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='setlog',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, help_text='Client-generated id used to deduplicate batch syncs', null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0003_client_ids'),
+        ('training', '0004_training_base_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='setlog',
+            index=models.Index(fields=['exercise_log', 'set_type', 'weight'], name='tracking_se_exercis_75a203_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutsession',
+            index=models.Index(fields=['user', 'date'], name='tracking_wo_user_id_d7a4db_idx'),
+        ),
+    ]
@@ -18,6 +18,11 @@ class WorkoutSession(models.Model):
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+
     def __str__(self):
         return f"{self.workout.name} on {self.date} for {self.user.username}"
     
@@ -27,6 +32,7 @@ class ExerciseLog(models.Model):
     workout_exercise = models.ForeignKey('training.WorkoutExercise', on_delete=models.SET_NULL, null=True, blank=True)
     order = models.PositiveIntegerField() 
     notes = models.TextField(blank=True, null=True)
+    client_id = models.UUIDField(unique=True, null=True, blank=True, editable=False, help_text="Client-generated id used to deduplicate batch syncs")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -52,11 +58,26 @@ class SetLog(models.Model):
     rest_time = models.DurationField(help_text="Rest time after this set", null=True, blank=True)
     notes = models.TextField(blank=True, null=True)
     is_pr = models.BooleanField(default=False)
+    client_id = models.UUIDField(unique=True, null=True, blank=True, editable=False, help_text="Client-generated id used to deduplicate batch syncs")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta: 
         ordering = ['set_number']
+        indexes = [
+            models.Index(fields=['exercise_log', 'set_type', 'weight']),
+        ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Moving a set to another exercise log changes two PersonalBests, see analytics.records
+        instance._loaded_exercise_log_id = instance.__dict__.get('exercise_log_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_exercise_log_id = self.exercise_log_id
+
     def __str__(self):
         return f"Set {self.set_number} of {self.exercise_log.exercise.name} in session {self.exercise_log.session.id}"
 
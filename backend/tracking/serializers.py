@@ -1,25 +1,37 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers 
 from .models import WorkoutSession, ExerciseLog, SetLog
+from training.models import WorkoutExercise
 from training.serializers import WorkoutExerciseSerializer
+from exercises.models import Exercise
 from exercises.serializers import ExerciseSerializer
+from analytics.records import record_new_sets
+from teachers.scoping import ScopedPrimaryKeyRelatedField
+from training.models import Workout
+from users.models import User
 
 class SetLogSerializer(serializers.ModelSerializer):
+    exercise_log = ScopedPrimaryKeyRelatedField(queryset=ExerciseLog.objects.all(), user_field='session__user')
+
     class Meta:
         model = SetLog
         fields = ['id', 'exercise_log', 'set_number', 'repetitions', 'weight', 'rest_time', 'notes', 'is_pr', 'created_at']
-        read_only_fields = ['created_at']
+        read_only_fields = ['is_pr', 'created_at']
 
 class ExerciseLogSerializer(serializers.ModelSerializer):
     workout_exercise = WorkoutExerciseSerializer(read_only=True)
     exercise = ExerciseSerializer(read_only=True)
     set_logs = SetLogSerializer(many=True, read_only=True)
     one_rep_max = serializers.SerializerMethodField()
+    session = ScopedPrimaryKeyRelatedField(queryset=WorkoutSession.objects.all())
 
     def get_one_rep_max(self, obj):
-            if obj.set_logs.exists():
-                set_log = obj.set_logs.first()
-                return self.calculate_1rm(set_log.weight, set_log.repetitions)
-            return None
+        # Iterate .all() instead of exists()/first() so prefetched set_logs are reused.
+        set_logs = obj.set_logs.all()
+        if set_logs:
+            set_log = set_logs[0]
+            return self.calculate_1rm(set_log.weight, set_log.repetitions)
+        return None
 
     def calculate_1rm(self, weight, reps):
         if reps > 1:
@@ -46,6 +58,8 @@ class ExerciseLogSerializer(serializers.ModelSerializer):
 class WorkoutSessionSerializer(serializers.ModelSerializer):
     exercise_logs = ExerciseLogSerializer(many=True, read_only=True)
     total_duration = serializers.SerializerMethodField()
+    user = ScopedPrimaryKeyRelatedField(queryset=User.objects.all(), user_field='pk')
+    workout = ScopedPrimaryKeyRelatedField(queryset=Workout.objects.all(), user_field='training_plan__student__user')
 
     def get_total_duration(self, obj):
         if obj.started_at and obj.ended_at:
@@ -59,3 +73,128 @@ class WorkoutSessionSerializer(serializers.ModelSerializer):
 
     
 
+class SetLogSyncSerializer(serializers.ModelSerializer):
+    client_id = serializers.UUIDField()
+
+    class Meta:
+        model = SetLog
+        fields = ['client_id', 'set_type', 'set_number', 'repetitions', 'weight', 'rest_time', 'notes']
+
+class ExerciseLogSyncSerializer(serializers.ModelSerializer):
+    client_id = serializers.UUIDField()
+    # Plain ids, checked in bulk by WorkoutSessionSyncSerializer.validate
+    exercise = serializers.IntegerField(required=False)
+    workout_exercise = serializers.IntegerField(required=False, allow_null=True)
+    order = serializers.IntegerField(required=False, min_value=0)
+    set_logs = SetLogSyncSerializer(many=True, required=False)
+
+    class Meta:
+        model = ExerciseLog
+        fields = ['client_id', 'exercise', 'workout_exercise', 'order', 'notes', 'set_logs']
+
+class WorkoutSessionSyncSerializer(serializers.ModelSerializer):
+    """
+    Writes a whole session tree (or a delta of it) in one transaction.
+
+    Exercise logs and sets are matched on their client-generated ``client_id``:
+    unknown ids are bulk-created, known ones are left untouched, so replaying
+    the same payload after a dropped connection never duplicates rows.
+    """
+    exercise_logs = ExerciseLogSyncSerializer(many=True)
+
+    class Meta:
+        model = WorkoutSession
+        fields = ['started_at', 'ended_at', 'status', 'notes', 'exercise_logs']
+
+    def validate_exercise_logs(self, value):
+        log_ids = [log['client_id'] for log in value]
+        set_ids = [s['client_id'] for log in value for s in log.get('set_logs', [])]
+        if len(set(log_ids)) != len(log_ids) or len(set(set_ids)) != len(set_ids):
+            raise serializers.ValidationError("client_id values must be unique within the payload.")
+
+        exercise_ids = {log['exercise'] for log in value if 'exercise' in log}
+        found = set(Exercise.objects.filter(id__in=exercise_ids).values_list('id', flat=True))
+        if exercise_ids - found:
+            raise serializers.ValidationError(f"Unknown exercise ids: {sorted(exercise_ids - found)}")
+
+        workout_exercise_ids = {log['workout_exercise'] for log in value if log.get('workout_exercise')}
+        found = set(
+            WorkoutExercise.objects.filter(id__in=workout_exercise_ids, workout_id=self.instance.workout_id)
+            .values_list('id', flat=True)
+        )
+        if workout_exercise_ids - found:
+            raise serializers.ValidationError(
+                f"workout_exercise ids not in this session's workout: {sorted(workout_exercise_ids - found)}"
+            )
+        return value
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        logs_data = validated_data.pop('exercise_logs')
+        # Serializes concurrent retries of the same session where rows can be locked
+        session = WorkoutSession.objects.select_for_update().get(pk=instance.pk)
+
+        if validated_data:
+            for attr, value in validated_data.items():
+                setattr(session, attr, value)
+            session.save(update_fields=list(validated_data))
+
+        try:
+            with transaction.atomic():
+                self.sync_result = self.create_logs(session, logs_data)
+        except IntegrityError:
+            # A concurrent retry inserted some of the same client_ids first;
+            # select_for_update doesn't serialize it on every backend (SQLite
+            # ignores it). Its rows are committed now, so a second pass skips them.
+            self.sync_result = self.create_logs(session, logs_data)
+        return session
+
+    def existing_logs(self, client_ids):
+        return {log.client_id: log for log in ExerciseLog.objects.filter(client_id__in=client_ids)}
+
+    def create_logs(self, session, logs_data):
+        """Create the exercise and set logs not stored yet and return the counts"""
+        logs = self.existing_logs([d['client_id'] for d in logs_data])
+        if any(log.session_id != session.pk for log in logs.values()):
+            raise serializers.ValidationError({"exercise_logs": "client_id already used by another session."})
+
+        new_logs = []
+        for position, log_data in enumerate(logs_data):
+            if log_data['client_id'] in logs:
+                continue
+            if 'exercise' not in log_data:
+                raise serializers.ValidationError({"exercise_logs": "exercise is required for new exercise logs."})
+            log = ExerciseLog(
+                session=session,
+                client_id=log_data['client_id'],
+                exercise_id=log_data['exercise'],
+                workout_exercise_id=log_data.get('workout_exercise'),
+                order=log_data.get('order', position),
+                notes=log_data.get('notes'),
+            )
+            new_logs.append(log)
+            logs[log.client_id] = log
+        ExerciseLog.objects.bulk_create(new_logs)
+
+        set_ids = [s['client_id'] for d in logs_data for s in d.get('set_logs', [])]
+        existing_sets = dict(
+            SetLog.objects.filter(client_id__in=set_ids).values_list('client_id', 'exercise_log__session_id')
+        )
+        if any(session_id != session.pk for session_id in existing_sets.values()):
+            raise serializers.ValidationError({"set_logs": "client_id already used by another session."})
+
+        new_sets = [
+            SetLog(exercise_log=logs[log_data['client_id']], **set_data)
+            for log_data in logs_data
+            for set_data in log_data.get('set_logs', [])
+            if set_data['client_id'] not in existing_sets
+        ]
+        # bulk_create skips signals, so fold the new sets into the PR index here
+        record_new_sets(session.user_id, session.date, new_sets)
+        SetLog.objects.bulk_create(new_sets)
+
+        return {
+            'created_exercise_logs': len(new_logs),
+            'created_set_logs': len(new_sets),
+            'skipped_set_logs': len(existing_sets),
+        }
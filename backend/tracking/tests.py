@@ -1,3 +1,260 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
+import uuid
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.pagination import TimeOrderedCursorPagination
+from exercises.models import Exercise, ExerciseImage
+from student.models import Student
+from teachers.models import Teacher, TeacherStudents
+from training.models import Training, Workout, WorkoutExercise
+from users.models import User
+from .models import WorkoutSession, ExerciseLog, SetLog
+from .serializers import WorkoutSessionSyncSerializer
+
+
+class TrackingAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='athlete', email='athlete@example.com', is_student=True)
+        self.teacher_user = User.objects.create(username='coach', email='coach@example.com', is_teacher=True)
+        self.student = Student.objects.create(user=self.user)
+        self.teacher = Teacher.objects.create(user=self.teacher_user)
+        training = Training.objects.create(student=self.student, teacher=self.teacher, goal='HYP', name='Treino A', description='')
+        self.workout = Workout.objects.create(training_plan=training, name='Push', day_of_week='1')
+        self.exercises = []
+        for i in range(3):
+            exercise = Exercise.objects.create(name=f'Exercise {i}', description='', muscle_group='chest')
+            ExerciseImage.objects.create(exercise=exercise, image_path=f'exercises/{i}/0.jpg', order=0)
+            ExerciseImage.objects.create(exercise=exercise, image_path=f'exercises/{i}/1.jpg', order=1)
+            self.exercises.append(exercise)
+        self.workout_exercises = [
+            WorkoutExercise.objects.create(
+                workout=self.workout, exercise=exercise, sets=3, reps=10, rest_time=timedelta(seconds=90)
+            )
+            for exercise in self.exercises
+        ]
+        self.client.force_authenticate(self.user)
+
+    def create_sessions(self, count, user=None):
+        for day in range(count):
+            session = WorkoutSession.objects.create(
+                user=user or self.user, workout=self.workout, date=date(2025, 1, 1) + timedelta(days=day)
+            )
+            for order, (exercise, workout_exercise) in enumerate(zip(self.exercises, self.workout_exercises)):
+                log = ExerciseLog.objects.create(
+                    session=session, exercise=exercise, workout_exercise=workout_exercise, order=order
+                )
+                for set_number in range(1, 4):
+                    SetLog.objects.create(
+                        exercise_log=log, set_number=set_number, repetitions=10, weight=50 + set_number
+                    )
+
+
+class WorkoutSessionQueryCountTests(TrackingAPITestCase):
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tracking/workout-sessions/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data['results']
+
+    def test_list_query_count_is_constant(self):
+        self.create_sessions(1)
+        single, _ = self.count_list_queries()
+
+        self.create_sessions(5)
+        many, data = self.count_list_queries()
+
+        self.assertEqual(len(data), 6)
+        self.assertEqual(single, many)
+
+    def test_one_rep_max_uses_first_set(self):
+        self.create_sessions(1)
+        _, data = self.count_list_queries()
+
+        exercise_log = data[0]['exercise_logs'][0]
+        self.assertEqual(len(exercise_log['exercise']['images']), 2)
+        self.assertAlmostEqual(exercise_log['one_rep_max'], 51 * (1 + 10 / 30.0))
+
+
+class UserScopingTests(TrackingAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create(username='rival', email='rival@example.com', is_student=True)
+        self.create_sessions(1)
+        self.create_sessions(2, user=self.other)
+
+    def test_students_only_see_their_own_history(self):
+        sessions = self.client.get('/api/tracking/workout-sessions/').data['results']
+        set_logs = self.client.get('/api/tracking/set-logs/').data['results']
+        other_session = WorkoutSession.objects.filter(user=self.other).first()
+
+        self.assertEqual([session['user'] for session in sessions], [self.user.pk])
+        self.assertEqual(len(self.client.get('/api/tracking/exercise-logs/').data['results']), 3)
+        self.assertEqual(len(set_logs), 9)
+        self.assertEqual(self.client.get(f'/api/tracking/workout-sessions/{other_session.pk}/').status_code, 404)
+
+    def test_teachers_see_the_students_they_coach(self):
+        self.client.force_authenticate(self.teacher_user)
+        self.assertEqual(self.client.get('/api/tracking/workout-sessions/').data['results'], [])
+
+        TeacherStudents.objects.create(teacher=self.teacher, student=self.student)
+        sessions = self.client.get('/api/tracking/workout-sessions/').data['results']
+        self.assertEqual([session['user'] for session in sessions], [self.user.pk])
+
+    def test_writes_only_reference_visible_rows(self):
+        own_log = ExerciseLog.objects.filter(session__user=self.user).first()
+        other_log = ExerciseLog.objects.filter(session__user=self.other).first()
+        payload = {'set_number': 4, 'repetitions': 8, 'weight': 60}
+
+        response = self.client.post('/api/tracking/set-logs/', {**payload, 'exercise_log': other_log.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/tracking/set-logs/', {**payload, 'exercise_log': own_log.pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post(
+            '/api/tracking/workout-sessions/',
+            {'user': self.other.pk, 'workout': self.workout.pk, 'date': '2025-02-01'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('user', response.data)
+
+
+class CursorPaginationTests(TrackingAPITestCase):
+    def test_set_logs_page_newest_first_without_offset(self):
+        self.create_sessions(2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.client.get('/api/tracking/set-logs/', {'page_size': 10}).data
+        self.assertNotIn('OFFSET', ctx.captured_queries[-1]['sql'].upper())
+        second = self.client.get(first['next']).data
+
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, sorted(SetLog.objects.values_list('id', flat=True), reverse=True))
+        self.assertIsNone(second['next'])
+
+    def test_sessions_sharing_a_date_page_without_offset(self):
+        for _ in range(7):
+            WorkoutSession.objects.create(user=self.user, workout=self.workout, date=date(2025, 1, 1))
+        WorkoutSession.objects.create(user=self.user, workout=self.workout, date=date(2025, 1, 2))
+
+        ids = []
+        url = '/api/tracking/workout-sessions/?page_size=3'
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                page = self.client.get(url).data
+            self.assertFalse(any('OFFSET' in query['sql'].upper() for query in ctx.captured_queries))
+            ids += [row['id'] for row in page['results']]
+            url = page['next']
+        expected = list(WorkoutSession.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+        # And back again from the last page
+        previous = self.client.get(self.client.get('/api/tracking/workout-sessions/?page_size=6').data['next']).data
+        back = self.client.get(previous['previous']).data
+        self.assertEqual([row['id'] for row in back['results']], expected[:6])
+
+    def test_malformed_cursors_are_404(self):
+        response = self.client.get('/api/tracking/workout-sessions/', {'cursor': 'cD0lNUIlMjJub3QrYStkYXRlJTIyJTJDKyUyMjElMjIlNUQ='})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_size_is_capped(self):
+        self.create_sessions(1)
+        with mock.patch.object(TimeOrderedCursorPagination, 'max_page_size', 4):
+            response = self.client.get('/api/tracking/set-logs/', {'page_size': 10000})
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_user_list_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/auth/users/').status_code, 401)
+
+
+class WorkoutSessionSyncTests(TrackingAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = WorkoutSession.objects.create(user=self.user, workout=self.workout, date=date(2025, 2, 1))
+        self.url = f'/api/tracking/workout-sessions/{self.session.pk}/sync/'
+
+    def payload(self, sets_per_log=3):
+        return {
+            'status': 'INP',
+            'exercise_logs': [
+                {
+                    'client_id': str(uuid.uuid5(uuid.NAMESPACE_OID, f'log-{i}')),
+                    'exercise': exercise.pk,
+                    'workout_exercise': workout_exercise.pk,
+                    'set_logs': [
+                        {
+                            'client_id': str(uuid.uuid5(uuid.NAMESPACE_OID, f'set-{i}-{n}')),
+                            'set_number': n,
+                            'repetitions': 8,
+                            'weight': 40 + n,
+                        }
+                        for n in range(1, sets_per_log + 1)
+                    ],
+                }
+                for i, (exercise, workout_exercise) in enumerate(zip(self.exercises, self.workout_exercises))
+            ],
+        }
+
+    def test_sync_creates_tree_and_is_idempotent(self):
+        response = self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created_exercise_logs'], 3)
+        self.assertEqual(response.data['created_set_logs'], 9)
+        self.assertEqual(response.data['session']['status'], 'INP')
+
+        response = self.client.post(self.url, self.payload(sets_per_log=4), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created_exercise_logs'], 0)
+        self.assertEqual(response.data['created_set_logs'], 3)
+        self.assertEqual(response.data['skipped_set_logs'], 9)
+        self.assertEqual(SetLog.objects.filter(exercise_log__session=self.session).count(), 12)
+
+        heaviest = SetLog.objects.filter(exercise_log__session=self.session, set_number=4)
+        self.assertTrue(all(set_log.is_pr for set_log in heaviest))
+
+    def test_sync_rejects_unknown_exercise(self):
+        payload = self.payload()
+        payload['exercise_logs'][0]['exercise'] = 999999
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExerciseLog.objects.filter(session=self.session).exists())
+
+    def test_sync_rejects_ids_from_another_session(self):
+        self.client.post(self.url, self.payload(), format='json')
+        other = WorkoutSession.objects.create(user=self.user, workout=self.workout, date=date(2025, 2, 2))
+        response = self.client.post(f'/api/tracking/workout-sessions/{other.pk}/sync/', self.payload(), format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_sync_rejects_workout_exercises_of_another_workout(self):
+        other_workout = Workout.objects.create(training_plan=self.workout.training_plan, name='Pull', day_of_week='2')
+        other = WorkoutExercise.objects.create(
+            workout=other_workout, exercise=self.exercises[0], sets=3, reps=10, rest_time=timedelta(seconds=90)
+        )
+        payload = self.payload()
+        payload['exercise_logs'][0]['workout_exercise'] = other.pk
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExerciseLog.objects.filter(session=self.session).exists())
+
+    def test_concurrent_retries_are_idempotent(self):
+        self.client.post(self.url, self.payload(), format='json')
+
+        # The retry reads before the first request's rows are visible
+        existing_logs = WorkoutSessionSyncSerializer.existing_logs
+        reads = []
+        def stale_first_read(serializer, client_ids):
+            reads.append(client_ids)
+            return {} if len(reads) == 1 else existing_logs(serializer, client_ids)
+
+        with mock.patch.object(WorkoutSessionSyncSerializer, 'existing_logs', stale_first_read):
+            response = self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(response.data['created_exercise_logs'], 0)
+        self.assertEqual(response.data['created_set_logs'], 0)
+        self.assertEqual(SetLog.objects.filter(exercise_log__session=self.session).count(), 9)
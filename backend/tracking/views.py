@@ -1,20 +1,64 @@
 from django.shortcuts import render
+from django.db.models import Prefetch
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from analytics.models import PersonalBest
+from analytics.serializers import PersonalBestSerializer
+from teachers.scoping import scoped_to_user
 from .models import *
 from .serializers import *
 from rest_framework import permissions
+from core.pagination import TimeOrderedCursorPagination
+from exercises.serializers import exercise_prefetches
+
+def exercise_logs_with_details():
+    # Load exercise/workout_exercise -> images/set_logs up front so the nested
+    # serializers never hit the database per row.
+    return ExerciseLog.objects.select_related(
+        'exercise',
+        'workout_exercise__exercise',
+    ).prefetch_related(
+        *exercise_prefetches('exercise__'),
+        *exercise_prefetches('workout_exercise__exercise__'),
+        'set_logs',
+    )
 
 class WorkoutSessionViewSet(viewsets.ModelViewSet):
     queryset = WorkoutSession.objects.all()
     serializer_class = WorkoutSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+    cursor_ordering = ('-date', '-id')
+
+    def get_queryset(self):
+        queryset = WorkoutSession.objects.prefetch_related(
+            Prefetch('exercise_logs', queryset=exercise_logs_with_details())
+        )
+        return scoped_to_user(queryset, self.request.user)
+
+    @action(detail=True, methods=['post'])
+    def sync(self, request, pk=None):
+        """Batch-write a session's exercise and set logs, idempotent on client_id"""
+        serializer = WorkoutSessionSyncSerializer(self.get_object(), data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save()
+
+        return Response({
+            **serializer.sync_result,
+            'session': WorkoutSessionSerializer(self.get_queryset().get(pk=session.pk)).data,
+        })
 
 class ExerciseLogViewSet(viewsets.ModelViewSet):
     queryset = ExerciseLog.objects.all()
     serializer_class = ExerciseLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+
+    def get_queryset(self):
+        return scoped_to_user(exercise_logs_with_details(), self.request.user, 'session__user')
 
+    @action(detail=False, methods=['get'])
     def exercise_pr(self, request):
         user = request.user
         exercise_id = request.query_params.get('exercise_id')
@@ -22,17 +66,10 @@ class ExerciseLogViewSet(viewsets.ModelViewSet):
         if not exercise_id:
             return Response({"error": "exercise_id parameter is required"}, status=400)
 
-        prs = SetLog.objects.filter(
-            exercise_log__session__user=user,
-            exercise_log__exercise_id=exercise_id, 
-            set_type='WORK'
-        ).select_related(
-            'exercise_log',           
-            'exercise_log__exercise',    
-            'exercise_log__session'  
-        ).order_by('-weight').first()
+        # PersonalBest is maintained on every SetLog write (see analytics.signals)
+        best = PersonalBest.objects.filter(user=user, exercise_id=exercise_id).first()
         
-        return Response({"pr": prs})
+        return Response({"pr": PersonalBestSerializer(best).data if best else None})
 
     def calculate_1rm(self, weight, reps):
         if reps > 1:
@@ -43,5 +80,9 @@ class SetLogViewSet(viewsets.ModelViewSet):
     queryset = SetLog.objects.all()
     serializer_class = SetLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimeOrderedCursorPagination
+
+    def get_queryset(self):
+        return scoped_to_user(SetLog.objects.all(), self.request.user, 'exercise_log__session__user')
 
 
@@ -0,0 +1,100 @@
+"""
+Benchmark TrainingViewSet.grouped_by_name against synthetic data.
+Usage: python manage.py benchmark_grouped_trainings --sizes 1000 10000 100000
+
+Every size is generated inside a transaction that is rolled back afterwards,
+so the command leaves the database untouched.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from exercises.models import Exercise
+from student.models import Student
+from teachers.models import Teacher
+from training.models import Training, Workout, WorkoutExercise
+from training.views import TrainingViewSet
+from users.models import User
+
+PLAN_NAMES = ['Treino A', 'Treino B', 'Treino C', 'Upper', 'Lower', 'Push', 'Pull', 'Legs']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the grouped_by_name training endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--students', type=int, default=1000, help='Students sharing the trainings')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'trainings':>10} {'queries':>8} {'best ms':>9} {'mean ms':>9}")
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    teacher_user = self.populate(size, options['students'])
+                    queries, timings = self.measure(teacher_user, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+            self.stdout.write(
+                f'{size:>10} {queries:>8} {min(timings) * 1000:>9.1f} {sum(timings) / len(timings) * 1000:>9.1f}'
+            )
+
+    def populate(self, size, student_count):
+        teacher_user = User.objects.create(username='bench_teacher', email='bench_teacher@example.com', is_teacher=True)
+        teacher = Teacher.objects.create(user=teacher_user)
+        exercise = Exercise.objects.create(name='Bench Exercise', description='', muscle_group='chest')
+
+        users = User.objects.bulk_create([
+            User(username=f'bench_student_{i}', email=f'bench_student_{i}@example.com', is_student=True)
+            for i in range(student_count)
+        ])
+        students = Student.objects.bulk_create([Student(user=user) for user in users])
+
+        # bulk_create bypasses Training.save, so base_name is set explicitly
+        trainings = Training.objects.bulk_create([
+            Training(
+                student=students[i % student_count],
+                teacher=teacher,
+                goal='HYP',
+                name=f'{users[i % student_count].username} - {PLAN_NAMES[i % len(PLAN_NAMES)]}',
+                base_name=PLAN_NAMES[i % len(PLAN_NAMES)],
+            )
+            for i in range(size)
+        ], batch_size=1000)
+
+        workouts = Workout.objects.bulk_create([
+            Workout(training_plan=training, name='Dia 1', day_of_week='1')
+            for training in trainings[:len(PLAN_NAMES) * 10]
+        ])
+        WorkoutExercise.objects.bulk_create([
+            WorkoutExercise(workout=workout, exercise=exercise, sets=4, reps=10, rest_time=timedelta(seconds=60))
+            for workout in workouts
+        ])
+        return teacher_user
+
+    def measure(self, teacher_user, repeat):
+        view = TrainingViewSet.as_view({'get': 'grouped_by_name'})
+        factory = APIRequestFactory()
+        timings = []
+        queries = 0
+        for _ in range(repeat):
+            request = factory.get('/api/training/grouped_by_name/', {'teacher': teacher_user.teacher_profile.pk})
+            force_authenticate(request, user=teacher_user)
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = view(request)
+                response.render()
+                timings.append(time.perf_counter() - start)
+            queries = len(ctx.captured_queries)
+        return queries, timings
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+def populate_base_name(apps, schema_editor):
+    Training = apps.get_model('training', 'Training')
+    trainings = list(Training.objects.only('id', 'name'))
+    for training in trainings:
+        training.base_name = training.name.split(' - ')[-1].strip() if ' - ' in training.name else training.name
+    Training.objects.bulk_update(trainings, ['base_name'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0007_progresslog_height'),
+        ('teachers', '0006_studentevaluation'),
+        ('training', '0003_remove_training_is_program_program_training_program'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='training',
+            name='base_name',
+            field=models.CharField(blank=True, editable=False, help_text="Name without the 'Student - ' prefix, used for grouping", max_length=100),
+        ),
+        migrations.RunPython(populate_base_name, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='program',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='training',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='training',
+            index=models.Index(fields=['teacher', 'is_active', 'base_name'], name='training_tr_teacher_610136_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0004_training_base_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='training',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
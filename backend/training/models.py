@@ -35,10 +35,39 @@ class Training(models.Model):
     program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='trainings', null=True, blank=True, help_text="If part of a program, link to the program")
     goal = models.CharField(max_length=5, choices=GOAL_CHOICES)
     name = models.CharField(max_length=100)
+    base_name = models.CharField(max_length=100, blank=True, editable=False, help_text="Name without the 'Student - ' prefix, used for grouping")
     description = models.TextField(blank=True, null=True)
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Also bumped by workout changes, see training.signals
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['teacher', 'is_active', 'base_name']),
+        ]
+
+    @staticmethod
+    def get_base_name(name):
+        if ' - ' in name:
+            return name.split(' - ')[-1].strip()
+        return name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Moving a training to another program changes both trees, see training.signals
+        instance._loaded_program_id = instance.__dict__.get('program_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.base_name = self.get_base_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'base_name'}
+        super().save(*args, **kwargs)
+        self._loaded_program_id = self.program_id
 
 class Workout(models.Model):
     DAY_CHOICES = [
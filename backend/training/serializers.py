@@ -1,27 +1,34 @@
 from rest_framework import serializers
 from .models import Training, Workout, WorkoutExercise, Program
 from exercises.serializers import ExerciseSerializer
+from core.serializers import DynamicFieldsMixin
 
-class WorkoutExerciseSerializer(serializers.ModelSerializer):
+class WorkoutExerciseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     exercise = ExerciseSerializer(read_only=True)
     
     class Meta:
         model = WorkoutExercise
         fields = ['id', 'workout', 'exercise', 'sets', 'reps', 'rest_time', 'notes']
 
-class WorkoutSerializer(serializers.ModelSerializer):
+class WorkoutSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     exercises = WorkoutExerciseSerializer(source='workout_exercises', many=True, read_only=True)
     
     class Meta:
         model = Workout
         fields = ['id', 'training_plan', 'name', 'day_of_week', 'exercises']
 
-class trainingSerializer(serializers.ModelSerializer):
+class trainingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     workouts = WorkoutSerializer(many=True, read_only=True)
     student_name = serializers.SerializerMethodField()
     teacher_name = serializers.SerializerMethodField()
     category = serializers.CharField(source='get_goal_display', read_only=True)
     program_name = serializers.CharField(source='program.name', read_only=True, allow_null=True)
+
+    field_select_related = {
+        'student_name': ['student__user'],
+        'teacher_name': ['teacher__user'],
+        'program_name': ['program'],
+    }
     
     class Meta:
         model = Training
@@ -54,10 +61,12 @@ class trainingSerializer(serializers.ModelSerializer):
             return f"{obj.teacher.user.first_name} {obj.teacher.user.last_name}".strip() or obj.teacher.user.username
         return None
 
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     trainings = trainingSerializer(many=True, read_only=True)
     category = serializers.CharField(source='get_goal_display', read_only=True)
     teacher_name = serializers.SerializerMethodField()
+
+    field_select_related = {'teacher_name': ['teacher__user']}
     
     class Meta:
         model = Program
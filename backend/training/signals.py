@@ -0,0 +1,74 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from core.caching import invalidate_on_change
+from exercises.models import Exercise, ExerciseImage
+from training.models import Program, Training, Workout, WorkoutExercise
+from users.models import User
+
+
+def programs_where(*args, **kwargs):
+    return list(Program.objects.filter(*args, **kwargs).values_list('pk', flat=True).distinct())
+
+
+# Program trees nest trainings, workouts, exercises with their images and
+# people's names: each change bumps only the programs rendering the changed
+# row. Rows are looked up through their parent, which a cascading delete
+# removes after them.
+invalidate_on_change('programs', Program, object_ids=lambda program: [program.pk])
+invalidate_on_change(
+    'programs', Training,
+    object_ids=lambda training: [training.program_id, getattr(training, '_loaded_program_id', None)],
+)
+invalidate_on_change('programs', Workout, object_ids=lambda workout: programs_where(trainings=workout.training_plan_id))
+invalidate_on_change(
+    'programs', WorkoutExercise,
+    object_ids=lambda workout_exercise: programs_where(trainings__workouts=workout_exercise.workout_id),
+)
+invalidate_on_change(
+    'programs', Exercise,
+    object_ids=lambda exercise: programs_where(trainings__workouts__workout_exercises__exercise=exercise.pk),
+)
+invalidate_on_change(
+    'programs', ExerciseImage,
+    object_ids=lambda image: programs_where(trainings__workouts__workout_exercises__exercise=image.exercise_id),
+)
+invalidate_on_change(
+    'programs', User,
+    object_ids=lambda user: programs_where(
+        Q(teacher__user=user.pk) | Q(trainings__teacher__user=user.pk) | Q(trainings__student__user=user.pk),
+    ),
+    ignore_fields=['last_login'],
+)
+
+
+def touch_trainings(training_ids):
+    """Bump updated_at of trainings and their programs, which validates their responses"""
+    now = timezone.now()
+    Training.objects.filter(pk__in=training_ids).update(updated_at=now)
+    Program.objects.filter(trainings__in=training_ids).update(updated_at=now)
+
+
+@receiver(post_save, sender=Training)
+@receiver(post_delete, sender=Training)
+def touch_program_on_training_changed(sender, instance, raw=False, **kwargs):
+    if raw or instance.program_id is None:
+        return
+    Program.objects.filter(pk=instance.program_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Workout)
+@receiver(post_delete, sender=Workout)
+def touch_training_on_workout_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    touch_trainings([instance.training_plan_id])
+
+
+@receiver(post_save, sender=WorkoutExercise)
+@receiver(post_delete, sender=WorkoutExercise)
+def touch_training_on_workout_exercise_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    touch_trainings(Workout.objects.filter(pk=instance.workout_id).values('training_plan_id'))
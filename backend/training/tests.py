@@ -1,3 +1,216 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.caching import current_versions
+from exercises.models import Exercise
+from student.models import Student
+from teachers.models import Teacher
+from users.models import User
+from .models import Program, Training, Workout, WorkoutExercise
+
+
+class TrainingAPITestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        teacher_user = User.objects.create(username='coach', email='coach@example.com', is_teacher=True)
+        self.teacher = Teacher.objects.create(user=teacher_user)
+        self.exercise = Exercise.objects.create(name='Bench Press', description='', muscle_group='chest')
+        self.client.force_authenticate(teacher_user)
+
+
+class GroupedByNameTests(TrainingAPITestCase):
+    def add_students(self, count, offset=0):
+        for i in range(offset, offset + count):
+            user = User.objects.create(username=f'student{i}', email=f'student{i}@example.com', is_student=True)
+            student = Student.objects.create(user=user)
+            for plan in ('Treino A', 'Treino B'):
+                training = Training.objects.create(
+                    student=student, teacher=self.teacher, goal='HYP', name=f'{user.username} - {plan}'
+                )
+                workout = Workout.objects.create(training_plan=training, name='Dia 1', day_of_week='1')
+                WorkoutExercise.objects.create(
+                    workout=workout, exercise=self.exercise, sets=4, reps=10, rest_time=timedelta(seconds=60)
+                )
+
+    def get_grouped(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/training/grouped_by_name/', {'teacher': self.teacher.pk, **params})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_groups_by_base_name(self):
+        self.add_students(3)
+        _, data = self.get_grouped()
+
+        self.assertEqual(data['count'], 2)
+        first = data['results'][0]
+        self.assertEqual(first['name'], 'Treino A')
+        self.assertEqual(first['full_name'], 'student0 - Treino A')
+        self.assertEqual(first['student_count'], 3)
+        self.assertEqual(len(first['training_ids']), 3)
+        self.assertEqual(first['exercises'], 1)
+        self.assertEqual(first['workouts'][0]['exercises'][0]['name'], 'Bench Press')
+
+        _, data = self.get_grouped(name='Treino B')
+        self.assertEqual([group['name'] for group in data['results']], ['Treino B'])
+
+    def test_query_count_is_constant(self):
+        self.add_students(2)
+        few, _ = self.get_grouped()
+
+        self.add_students(10, offset=2)
+        many, data = self.get_grouped()
+
+        self.assertEqual(data['results'][0]['student_count'], 12)
+        self.assertEqual(few, many)
+
+
+class ProgramTreeTestCase(TrainingAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.program = self.create_program('ABC')
+
+    def create_program(self, name, trainings=2):
+        user = User.objects.create(username=f'athlete_{name}', email=f'athlete_{name}@example.com', is_student=True)
+        student = Student.objects.create(user=user)
+        program = Program.objects.create(name=name, teacher=self.teacher, goal='HYP')
+        for plan in 'ABCDEF'[:trainings]:
+            training = Training.objects.create(
+                student=student, teacher=self.teacher, program=program, goal='HYP', name=f'Treino {plan}'
+            )
+            workout = Workout.objects.create(training_plan=training, name='Dia 1', day_of_week='1')
+            WorkoutExercise.objects.create(
+                workout=workout, exercise=self.exercise, sets=4, reps=10, rest_time=timedelta(seconds=90)
+            )
+        return program
+
+
+class FieldSelectionTests(ProgramTreeTestCase):
+    def get_programs(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/programs/', params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_full_tree_by_default(self):
+        _, data = self.get_programs()
+        exercise = data[0]['trainings'][0]['workouts'][0]['exercises'][0]['exercise']
+        self.assertEqual(exercise['name'], 'Bench Press')
+        self.assertIn('images', exercise)
+
+    def test_sparse_fieldsets(self):
+        _, data = self.get_programs(fields='id,name,trainings.name,trainings.workouts.exercises.exercise.name')
+        program = data[0]
+        self.assertEqual(set(program), {'id', 'name', 'trainings'})
+        self.assertEqual(set(program['trainings'][0]), {'name', 'workouts'})
+        self.assertEqual(program['trainings'][0]['workouts'][0], {'exercises': [{'exercise': {'name': 'Bench Press'}}]})
+
+    def test_unexpanded_relations_are_ids(self):
+        full_queries, _ = self.get_programs()
+        cache.clear()
+        queries, data = self.get_programs(expand='')
+        self.assertEqual(sorted(data[0]['trainings']), list(self.program.trainings.values_list('id', flat=True)))
+        self.assertLess(queries, full_queries)
+
+        cache.clear()
+        _, data = self.get_programs(expand='trainings.workouts')
+        workout = data[0]['trainings'][0]['workouts'][0]
+        self.assertEqual(workout['exercises'], list(WorkoutExercise.objects.filter(workout_id=workout['id']).values_list('id', flat=True)))
+
+
+class ConditionalGetTests(ProgramTreeTestCase):
+    def setUp(self):
+        # Flush the fixtures' cache invalidations so later saves start a new batch
+        with self.captureOnCommitCallbacks(execute=True):
+            super().setUp()
+
+    def test_workout_changes_invalidate_trainings_and_programs(self):
+        etags = {url: self.client.get(url)['ETag'] for url in ('/api/training/', '/api/programs/')}
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        workout = Workout.objects.filter(training_plan__program=self.program).first()
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise, sets=3, reps=12, rest_time=timedelta(seconds=60))
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_exercise_edits_change_the_etag(self):
+        etag = self.client.get('/api/training/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exercise.description = 'Keep the shoulder blades retracted.'
+            self.exercise.save()
+        self.assertEqual(self.client.get('/api/training/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ProgramInvalidationTests(ProgramTreeTestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            super().setUp()
+            self.other = self.create_program('Other')
+
+    def versions(self):
+        return {program.pk: current_versions('programs', program.pk) for program in (self.program, self.other)}
+
+    def test_workout_changes_bump_only_their_program(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            workout = Workout.objects.filter(training_plan__program=self.program).first()
+            workout.name = 'Dia 2'
+            workout.save()
+        after = self.versions()
+        self.assertNotEqual(after[self.program.pk], before[self.program.pk])
+        self.assertEqual(after[self.other.pk], before[self.other.pk])
+
+    def test_moving_a_training_bumps_both_programs(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            training = Training.objects.filter(program=self.program).first()
+            training.program = self.other
+            training.save()
+        after = self.versions()
+        self.assertNotEqual(after[self.program.pk], before[self.program.pk])
+        self.assertNotEqual(after[self.other.pk], before[self.other.pk])
+
+    def test_unrelated_users_leave_programs_cached(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(username='visitor', email='visitor@example.com')
+        self.assertEqual(self.versions(), before)
+
+
+class QueryBudgetTests(ProgramTreeTestCase):
+    def count_queries(self, url, **params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assert_budget(self, url, budget, **params):
+        self.assertEqual(self.count_queries(url, **params), budget)
+        for i in range(4):
+            self.create_program(f'P{i}', trainings=3)
+        self.assertEqual(self.count_queries(url, **params), budget)
+
+    def test_program_list(self):
+        # validators, programs + teachers, trainings + people + program,
+        # workouts, workout exercises, exercises, images
+        self.assert_budget('/api/programs/', 7)
+
+    def test_program_list_without_exercises(self):
+        # Workout exercises are only fetched as ids
+        self.assert_budget('/api/programs/', 5, expand='trainings.workouts')
+
+    def test_program_detail(self):
+        self.assert_budget(f'/api/programs/{self.program.pk}/', 7)
+
+    def test_training_list(self):
+        self.assert_budget('/api/training/', 6)
+
+    def test_training_detail(self):
+        training = self.program.trainings.first()
+        self.assert_budget(f'/api/training/{training.pk}/', 6)
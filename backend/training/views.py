@@ -5,7 +5,24 @@ from rest_framework.response import Response
 from .serializers import trainingSerializer, ProgramSerializer, WorkoutSerializer, WorkoutExerciseSerializer
 from rest_framework import permissions
 from .models import Training, Program, Workout, WorkoutExercise
-from django.db.models import Count, Q
+from django.db.models import Count, Exists, Min, OuterRef, Prefetch, Q
+from rest_framework.pagination import PageNumberPagination
+from core.caching import cache_response
+from core.conditional import conditional_response
+
+def plan_queryset(view, queryset):
+    """
+    Joins and prefetches for what the action renders: the tree selected by
+    ?fields/?expand for reads and updates, nothing for deletes.
+    """
+    if view.action == 'destroy':
+        return queryset
+    return view.get_serializer().query_plan(queryset)
+
+class GroupedTrainingPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
 
 class ProgramViewSet(viewsets.ModelViewSet):
     queryset = Program.objects.all()
@@ -17,7 +34,17 @@ class ProgramViewSet(viewsets.ModelViewSet):
         teacher_id = self.request.query_params.get('teacher')
         if teacher_id:
             queryset = queryset.filter(teacher_id=teacher_id)
-        return queryset
+        return plan_queryset(self, queryset)
+
+    @conditional_response('updated_at', namespace='programs')
+    @cache_response('programs', shared=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_response('updated_at', namespace='programs')
+    @cache_response('programs', per_object=True, shared=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 class TrainingViewSet(viewsets.ModelViewSet):
     queryset = Training.objects.all()
@@ -37,77 +64,98 @@ class TrainingViewSet(viewsets.ModelViewSet):
         if is_active is not None:
             queryset = queryset.filter(is_active=is_active.lower() == 'true')
         
-        return queryset
+        return plan_queryset(self, queryset)
+
+    @conditional_response('updated_at', namespace='programs')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_response('updated_at', namespace='programs')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def grouped_by_name(self, request):
         teacher_id = request.query_params.get('teacher')
+        name = request.query_params.get('name')
         
+        trainings = Training.objects.filter(is_active=True)
         if teacher_id:
-            trainings = Training.objects.filter(teacher_id=teacher_id, is_active=True)
-        else:
-            trainings = Training.objects.filter(is_active=True)
+            trainings = trainings.filter(teacher_id=teacher_id)
+        if name:
+            trainings = trainings.filter(base_name=name)
+        
+        # One row per base name; the representative is the first training, and
+        # workouts come from the first training that has any.
+        has_workouts = Exists(Workout.objects.filter(training_plan=OuterRef('pk')))
+        groups = trainings.values('base_name').annotate(
+            first_id=Min('id'),
+            workouts_source_id=Min('id', filter=Q(has_workouts)),
+            student_count=Count('id'),
+        ).order_by('first_id')
         
-        grouped_data = {}
+        paginator = GroupedTrainingPagination()
+        page = paginator.paginate_queryset(groups, request, view=self)
+        base_names = [group['base_name'] for group in page]
         
-        for training in trainings:
-            name = training.name
-            if ' - ' in name:
-                base_name = name.split(' - ')[-1].strip()
-            else:
-                base_name = name
-            
-            if base_name not in grouped_data:
-                grouped_data[base_name] = {
-                    'id': training.id,
-                    'name': base_name,  
-                    'full_name': training.name,  
-                    'description': training.description,
-                    'goal': training.goal,
-                    'category': training.get_goal_display(),
-                    'program_name': training.program.name if training.program else None,
-                    'student_count': 0,
-                    'student_ids': [],
-                    'training_ids': [],
-                    'workouts': [],
-                    'is_active': training.is_active,
-                    'start_date': training.start_date,
-                    'end_date': training.end_date,
-                }
-            
-            grouped_data[base_name]['student_count'] += 1
-            grouped_data[base_name]['student_ids'].append(training.student.id if training.student else None)
-            grouped_data[base_name]['training_ids'].append(training.id)
-            
-            if not grouped_data[base_name]['workouts'] and training.workouts.exists():
-                workouts_data = []
-                for workout in training.workouts.all():
-                    exercises = []
-                    for we in workout.workout_exercises.all():
-                        exercises.append({
-                            'id': we.id,
-                            'name': we.exercise.name if we.exercise else '',
-                            'sets': we.sets,
-                            'reps': we.reps,
-                            'rest_time': str(we.rest_time) if we.rest_time else '',
-                            'notes': we.notes,
-                        })
-                    workouts_data.append({
-                        'id': workout.id,
-                        'name': workout.name,
-                        'day_of_week': workout.day_of_week,
-                        'exercises': exercises,
-                    })
-                grouped_data[base_name]['workouts'] = workouts_data
+        representatives = Training.objects.select_related('program').in_bulk(
+            [group['first_id'] for group in page]
+        )
+        
+        members = {base_name: ([], []) for base_name in base_names}
+        for base_name, training_id, student_id in trainings.filter(base_name__in=base_names).order_by('id').values_list('base_name', 'id', 'student_id'):
+            members[base_name][0].append(student_id)
+            members[base_name][1].append(training_id)
+        
+        workouts_by_training = {}
+        workouts = Workout.objects.filter(
+            training_plan_id__in=[group['workouts_source_id'] for group in page if group['workouts_source_id']]
+        ).order_by('id').prefetch_related(
+            Prefetch('workout_exercises', queryset=WorkoutExercise.objects.select_related('exercise').order_by('id'))
+        )
+        for workout in workouts:
+            workouts_by_training.setdefault(workout.training_plan_id, []).append({
+                'id': workout.id,
+                'name': workout.name,
+                'day_of_week': workout.day_of_week,
+                'exercises': [
+                    {
+                        'id': we.id,
+                        'name': we.exercise.name if we.exercise else '',
+                        'sets': we.sets,
+                        'reps': we.reps,
+                        'rest_time': str(we.rest_time) if we.rest_time else '',
+                        'notes': we.notes,
+                    }
+                    for we in workout.workout_exercises.all()
+                ],
+            })
         
         result = []
-        for name, data in grouped_data.items():
-            total_exercises = sum(len(w['exercises']) for w in data['workouts'])
-            data['exercises'] = total_exercises
-            data['students'] = data['student_count']  
-            result.append(data)
+        for group in page:
+            training = representatives[group['first_id']]
+            student_ids, training_ids = members[group['base_name']]
+            workouts_data = workouts_by_training.get(group['workouts_source_id'], [])
+            result.append({
+                'id': training.id,
+                'name': group['base_name'],
+                'full_name': training.name,
+                'description': training.description,
+                'goal': training.goal,
+                'category': training.get_goal_display(),
+                'program_name': training.program.name if training.program else None,
+                'student_count': group['student_count'],
+                'student_ids': student_ids,
+                'training_ids': training_ids,
+                'workouts': workouts_data,
+                'is_active': training.is_active,
+                'start_date': training.start_date,
+                'end_date': training.end_date,
+                'exercises': sum(len(w['exercises']) for w in workouts_data),
+                'students': group['student_count'],
+            })
         
-        return Response(result)
+        return paginator.get_paginated_response(result)
 
 class WorkoutViewSet(viewsets.ModelViewSet):
     queryset = Workout.objects.all()
@@ -119,7 +167,7 @@ class WorkoutViewSet(viewsets.ModelViewSet):
         training_id = self.request.query_params.get('training_plan')
         if training_id:
             queryset = queryset.filter(training_plan_id=training_id)
-        return queryset
+        return plan_queryset(self, queryset)
 
 class WorkoutExerciseViewSet(viewsets.ModelViewSet):
     queryset = WorkoutExercise.objects.all()
@@ -131,4 +179,4 @@ class WorkoutExerciseViewSet(viewsets.ModelViewSet):
         workout_id = self.request.query_params.get('workout')
         if workout_id:
             queryset = queryset.filter(workout_id=workout_id)
-        return queryset
\ No newline at end of file
+        return plan_queryset(self, queryset)
\ No newline at end of file
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
+from core.pagination import TimeOrderedCursorPagination
 from .models import User 
 from .serializers import UserSerializer
 
@@ -12,9 +13,10 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]  
+    pagination_class = TimeOrderedCursorPagination
     
     def get_permissions(self):
-        if self.action in ['create', 'list']:  
+        if self.action == 'create':  
             return [AllowAny()]
         return [IsAuthenticated()]
 
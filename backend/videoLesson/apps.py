@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VideolessonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'videoLesson'
+
+    def ready(self):
+        import videoLesson.signals
@@ -0,0 +1,4 @@
+from core.caching import invalidate_on_change
+from videoLesson.models import VideoLesson
+
+invalidate_on_change('video-lessons', VideoLesson, object_ids=lambda lesson: [lesson.pk])
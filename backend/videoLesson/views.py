@@ -4,6 +4,7 @@ from .models import VideoLesson
 from .serializers import VideoLessonSerializer
 from rest_framework import filters
 from rest_framework import permissions
+from core.caching import cache_response
 
 class VideoLessonViewSet(viewsets.ModelViewSet):
     queryset = VideoLesson.objects.all()
@@ -12,4 +13,12 @@ class VideoLessonViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'category', 'teacher__name']
     ordering_fields = ['created_at', 'updated_at', 'title']
-    ordering = ['-created_at']  
\ No newline at end of file
+    ordering = ['-created_at']
+
+    @cache_response('video-lessons', shared=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('video-lessons', per_object=True, shared=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -138,11 +138,14 @@ export default function EditDietPage() {
       
       console.log('Current meals state:', meals)
       
+      // Saved meals and foods have numeric ids; new ones carry temporary string ids
       const mealsData = meals.map((meal) => ({
+        id: typeof meal.id === "number" ? meal.id : undefined,
         name: meal.name,
         time: meal.time,
         description: meal.description || "",
         foods: meal.foods.map((food) => ({
+          id: typeof food.id === "number" ? food.id : undefined,
           name: food.name,
           quantity: parseFloat(food.quantity) || 0,
           unit: food.unit,
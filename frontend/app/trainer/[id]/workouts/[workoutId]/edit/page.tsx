@@ -117,9 +117,11 @@ export default function EditWorkoutPage() {
           const teacher = teacherResponse.data[0]
           
           if (teacher) {
-            const response = await apiClient.get(`/training/grouped_by_name/?teacher=${teacher.id}`)
             const decodedWorkoutId = decodeURIComponent(workoutId)
-            const foundWorkout = response.data.find((w: any) => w.name === decodedWorkoutId)
+            const response = await apiClient.get(
+              `/training/grouped_by_name/?teacher=${teacher.id}&name=${encodeURIComponent(decodedWorkoutId)}`
+            )
+            const foundWorkout = response.data.results.find((w: any) => w.name === decodedWorkoutId)
             
             if (foundWorkout) {
               setWorkoutName(foundWorkout.name)
@@ -32,7 +32,7 @@ export default function WorkoutsPage() {
             console.log('Fetching workouts for teacher:', teacher.id)
             const response = await apiClient.get(`/training/grouped_by_name/?teacher=${teacher.id}`)
             console.log('Grouped workouts response:', response.data)
-            setWorkouts(response.data)
+            setWorkouts(response.data.results)
           } else {
             console.error('No teacher found for user')
           }
@@ -51,11 +51,11 @@ export function PhotosMeasurements({ studentId, userId }: { studentId: string; u
         setLoading(true)
         // Fetch measurements
         const measurementsResponse = await apiClient.get(`/analytics/body-measurements/?user=${userId}`)
-        setMeasurements(measurementsResponse.data)
+        setMeasurements(measurementsResponse.data.results)
         
         // Fetch photos
         const photosResponse = await apiClient.get(`/analytics/progress-photos/?user=${userId}`)
-        setPhotos(photosResponse.data)
+        setPhotos(photosResponse.data.results)
       } catch (error) {
         console.error('Error fetching data:', error)
       } finally {